@@ -0,0 +1,77 @@
+"""Measure the per-entry cost of the compiled file filter.
+
+Evaluates a realistic rule set (extensions, 3 include and 3 exclude globs,
+a minimum size) over synthetic names and stat results, comparing
+``FileFilter`` with the naive approach of ``Path.suffix`` plus one
+``fnmatch`` call per pattern. No files are created.
+
+Usage: python benchmarks/bench_filters.py [--entries N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import fnmatch
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from photo_mover.filters import FileFilter  # noqa: E402
+
+EXTENSIONS = ["jpg", "jpeg", "heic", "mp4", "mov"]
+INCLUDE = ["IMG_*", "DSC*", "PXL_*"]
+EXCLUDE = ["*_edited.*", "*.tmp", "._*"]
+MIN_SIZE = 4096
+NAMES = [
+    "IMG_{:06}.JPG",
+    "DSC{:05}.jpg",
+    "PXL_{:06}.mp4",
+    "._IMG_{:06}.jpg",
+    "notes{}.txt",
+]
+
+
+def naive(name: str, rel: str, st: os.stat_result) -> bool:
+    if Path(name).suffix.lstrip(".").lower() not in EXTENSIONS:
+        return False
+    lower = name.lower()
+    if any(fnmatch.fnmatch(lower, p.lower()) for p in EXCLUDE):
+        return False
+    if not any(fnmatch.fnmatch(lower, p.lower()) for p in INCLUDE):
+        return False
+    return st.st_size >= MIN_SIZE
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entries", type=int, default=500_000)
+    args = parser.parse_args()
+
+    entries = []
+    for i in range(args.entries):
+        name = NAMES[i % len(NAMES)].format(i)
+        st = os.stat_result((0o100644, 0, 0, 1, 0, 0, i % 10_000, 0, 0, 0))
+        entries.append((name, f"{i // 1000:05}/{name}", st))
+
+    compiled = FileFilter(
+        extensions=EXTENSIONS, include=INCLUDE, exclude=EXCLUDE, min_size=MIN_SIZE
+    )
+
+    def check(name, rel, st):
+        return compiled.match_name(name, rel) and compiled.match_stat(st)
+
+    results = {}
+    for label, predicate in (("naive", naive), ("compiled", check)):
+        start = time.perf_counter()
+        results[label] = [predicate(*e) for e in entries]
+        elapsed = time.perf_counter() - start
+        print(f"{label:<9} {elapsed * 1e9 / len(entries):7.0f} ns/entry")
+    assert results["naive"] == results["compiled"]
+    print(f"selected {sum(results['compiled'])} of {len(entries)}")
+
+
+if __name__ == "__main__":
+    main()
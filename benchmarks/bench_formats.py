@@ -0,0 +1,79 @@
+"""Compare write/load time and size of CSV vs the binary listing formats.
+
+Synthetic hashed records are written to a temporary file in each format
+and read back into ``MediaFileInfo`` objects (CSV rows are parsed the way
+a downstream loader would: ``int(size)`` and ``bytes.fromhex(digest)``).
+
+Usage: python benchmarks/bench_formats.py [--files N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import hashlib
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from photo_mover.binary_exporter import read_records, write_records  # noqa: E402
+from photo_mover.csv_exporter import MediaFileInfo, write_csv  # noqa: E402
+
+
+def records(files: int):
+    for i in range(files):
+        name = f"IMG_{i:07}.jpg"
+        yield MediaFileInfo(
+            filename=name,
+            extension="jpg",
+            relative_path=f"{i // 1000:05}/{name}",
+            size_bytes=3_000_000 + i,
+            sha256=hashlib.sha256(name.encode()).hexdigest(),
+        )
+
+
+def read_csv(path: Path):
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        next(reader)
+        for name, ext, rel, size, sha in reader:
+            bytes.fromhex(sha)
+            yield MediaFileInfo(name, ext, rel, int(size), sha)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=1_000_000)
+    parser.add_argument(
+        "--formats",
+        default="csv,binary",
+        help="Comma-separated, e.g. csv,binary,parquet",
+    )
+    args = parser.parse_args()
+
+    print(f"{'format':<8} {'MiB':>7} {'write s':>8} {'load s':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in args.formats.split(","):
+            path = Path(tmp) / f"listing.{fmt}"
+            t0 = time.perf_counter()
+            if fmt == "csv":
+                with open(path, "w", newline="", encoding="utf-8") as f:
+                    write_csv(records(args.files), f, include_hash=True)
+            else:
+                with open(path, "wb") as f:
+                    write_records(records(args.files), f, format=fmt, include_hash=True)
+            written = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            loader = read_csv if fmt == "csv" else read_records
+            count = sum(1 for _ in loader(path))
+            loaded = time.perf_counter() - t0
+            assert count == args.files
+            size = path.stat().st_size / 2**20
+            print(f"{fmt:<8} {size:7.1f} {written:8.2f} {loaded:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Hash throughput per algorithm and file-size class.
+
+For every available algorithm (see ``photo_mover.hashing.HASH_ALGORITHMS``)
+and size class, the files are hashed with plain ``f.read`` chunks (the old
+core) and with :func:`~photo_mover.hashing.hash_file`: ``readinto`` into a
+reused buffer (the default) and with ``use_mmap`` (``--hash-mmap``; mapped
+from ``MMAP_THRESHOLD`` up). Files are hashed once before timing, so the
+numbers are for a warm page cache.
+
+Usage: python benchmarks/bench_hash_algos.py [--total-mb MB] [--repeat N]
+       [--algo NAME ...]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from photo_mover.hashing import (  # noqa: E402
+    DEFAULT_CHUNK_SIZE,
+    MMAP_THRESHOLD,
+    available_hash_algos,
+    hash_file,
+    new_hash,
+)
+
+# (label, file size); each class gets about --total-mb of data.
+SIZE_CLASSES = (
+    ("16 KiB", 16 * 1024),
+    ("1 MiB", 1024 * 1024),
+    ("64 MiB", 64 * 1024 * 1024),
+)
+
+
+def read_chunks(path: Path, algo: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> str:
+    h = new_hash(algo)
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def make_files(root: Path, size: int, total: int) -> list[Path]:
+    block = os.urandom(min(size, 1 << 20))
+    paths = []
+    for i in range(max(1, total // size)):
+        path = root / f"{size}_{i:05}.bin"
+        with open(path, "wb") as f:
+            remaining = size
+            while remaining > 0:
+                f.write(block[:remaining])
+                remaining -= len(block)
+        paths.append(path)
+    return paths
+
+
+def hash_mapped(path: Path, algo: str) -> str:
+    return hash_file(path, algo, use_mmap=True)
+
+
+def measure(fn, paths: list[Path], algo: str, repeat: int) -> float:
+    """Best wall time of hashing all ``paths`` ``repeat`` times."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for path in paths:
+            fn(path, algo)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--total-mb", type=float, default=128)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--algo", action="append", choices=available_hash_algos())
+    args = parser.parse_args()
+
+    algos = args.algo or available_hash_algos()
+    total = int(args.total_mb * 1024 * 1024)
+    print(f"mmap threshold: {MMAP_THRESHOLD // (1024 * 1024)} MiB")
+    print(
+        f"{'algorithm':<10} {'size':>7} {'files':>6} {'read MB/s':>10} "
+        f"{'readinto MB/s':>14} {'mmap MB/s':>10}"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, size in SIZE_CLASSES:
+            paths = make_files(Path(tmp), size, total)
+            nbytes = size * len(paths)
+            for algo in algos:
+                for path in paths:
+                    hash_file(path, algo)
+                old = measure(read_chunks, paths, algo, args.repeat)
+                new = measure(hash_file, paths, algo, args.repeat)
+                mapped = measure(hash_mapped, paths, algo, args.repeat)
+                print(
+                    f"{algo:<10} {label:>7} {len(paths):>6} "
+                    f"{nbytes / old / 1e6:10.1f} {nbytes / new / 1e6:14.1f} "
+                    f"{nbytes / mapped / 1e6:10.1f}"
+                )
+            for path in paths:
+                path.unlink()
+
+
+if __name__ == "__main__":
+    main()
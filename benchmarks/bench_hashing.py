@@ -0,0 +1,66 @@
+"""Compare serial and pooled hashing throughput of ``scan_media``.
+
+Usage: python benchmarks/bench_hashing.py [--files N] [--size-mb MB]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from photo_mover.csv_exporter import scan_media  # noqa: E402
+
+
+def make_tree(root: Path, files: int, size: int) -> None:
+    block = os.urandom(min(size, 1 << 20))
+    for i in range(files):
+        with open(root / f"{i:05}.mov", "wb") as f:
+            remaining = size
+            while remaining > 0:
+                f.write(block[:remaining])
+                remaining -= len(block)
+
+
+def run(src: Path, label: str, **kwargs) -> None:
+    start = time.perf_counter()
+    total = 0
+    count = 0
+    for info in scan_media(src, include_hash=True, **kwargs):
+        total += info.size_bytes
+        count += 1
+    elapsed = time.perf_counter() - start
+    print(
+        f"{label:<28} {elapsed:8.3f}s {count / elapsed:10.1f} files/s "
+        f"{total / elapsed / 1e6:10.1f} MB/s"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=64)
+    parser.add_argument("--size-mb", type=float, default=16)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        src = Path(tmp)
+        make_tree(src, args.files, int(args.size_mb * 1024 * 1024))
+        run(src, "serial (8 KiB chunks)", hash_chunk_size=8192)
+        run(src, "serial (1 MiB chunks)")
+        run(src, f"thread x{args.workers}", hash_workers=args.workers)
+        run(
+            src,
+            f"process x{args.workers}",
+            hash_workers=args.workers,
+            hash_executor="process",
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Compare the memory held by N scan records in different representations.
+
+Synthetic records (1000 files per directory, 4 extensions, optional
+SHA-256 digests) are built in memory -- no files are created -- and the
+retained size is measured with tracemalloc for:
+
+  dataclass   the previous ``@dataclass`` with a per-instance ``__dict__``
+  slots       the current frozen, slotted ``MediaFileInfo`` in a list
+  table       a columnar ``MediaTable``
+
+Usage: python benchmarks/bench_memory.py [--files N] [--hash]
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import hashlib
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from photo_mover.csv_exporter import MediaFileInfo  # noqa: E402
+from photo_mover.media_table import MediaTable  # noqa: E402
+
+EXTS = ("jpg", "jpg", "heic", "mp4")
+
+
+@dataclass
+class DictMediaFileInfo:
+    filename: str
+    extension: str
+    relative_path: str
+    size_bytes: int
+    sha256: str | None = None
+
+
+def records(cls, files: int, with_hash: bool):
+    for i in range(files):
+        ext = EXTS[i % len(EXTS)]
+        name = f"IMG_{i:07}.{ext}"
+        sha = hashlib.sha256(name.encode()).hexdigest() if with_hash else None
+        yield cls(
+            filename=name,
+            extension=ext,
+            relative_path=f"{i // 1000 // 100:04}/{i // 1000:05}/{name}",
+            size_bytes=3_000_000 + i,
+            sha256=sha,
+        )
+
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    held = build()
+    elapsed = time.perf_counter() - t0
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return held, current, peak, elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=1_000_000)
+    parser.add_argument("--hash", action="store_true", help="Include digests")
+    args = parser.parse_args()
+
+    builds = {
+        "dataclass": lambda: list(records(DictMediaFileInfo, args.files, args.hash)),
+        "slots": lambda: list(records(MediaFileInfo, args.files, args.hash)),
+        "table": lambda: MediaTable(records(MediaFileInfo, args.files, args.hash)),
+    }
+    print(f"{'repr':<10} {'held MiB':>9} {'peak MiB':>9} {'B/file':>7} {'build s':>8}")
+    for label, build in builds.items():
+        held, current, peak, elapsed = measure(build)
+        print(
+            f"{label:<10} {current / 2**20:9.1f} {peak / 2**20:9.1f} "
+            f"{current / args.files:7.0f} {elapsed:8.2f}"
+        )
+        if isinstance(held, MediaTable):
+            t0 = time.perf_counter()
+            held.size_by_extension()
+            print(f"{'':<10} size_by_extension: {time.perf_counter() - t0:.3f}s")
+        del held
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Measure time-to-first-row and peak RSS of streaming CSV output.
+
+Builds a synthetic tree (1M empty files by default, 1000 per directory),
+then runs ``scan_media`` -> ``write_csv(flush_every=...)`` into /dev/null.
+
+Usage: python benchmarks/bench_stream.py [--files N] [--per-dir N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from photo_mover.csv_exporter import (  # noqa: E402
+    STREAM_FLUSH_ROWS,
+    scan_media,
+    write_csv,
+)
+
+
+class FirstWriteTimer:
+    def __init__(self, raw):
+        self.raw = raw
+        self.first_flush: float | None = None
+
+    def write(self, s: str) -> int:
+        return self.raw.write(s)
+
+    def flush(self) -> None:
+        if self.first_flush is None:
+            self.first_flush = time.perf_counter()
+        self.raw.flush()
+
+
+def make_tree(root: Path, files: int, per_dir: int) -> None:
+    for i in range(files):
+        if i % per_dir == 0:
+            d = root / f"{i // per_dir // 1000:04}" / f"{i // per_dir:07}"
+            d.mkdir(parents=True)
+        open(d / f"IMG_{i:07}.jpg", "wb").close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=1_000_000)
+    parser.add_argument("--per-dir", type=int, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        src = Path(tmp)
+        t0 = time.perf_counter()
+        make_tree(src, args.files, args.per_dir)
+        print(f"generated {args.files} files in {time.perf_counter() - t0:.1f}s")
+
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        with open(os.devnull, "w") as devnull:
+            out = FirstWriteTimer(devnull)
+            start = time.perf_counter()
+            write_csv(
+                scan_media(src, recursive=True),
+                out,
+                flush_every=STREAM_FLUSH_ROWS,
+            )
+            total = time.perf_counter() - start
+        rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+        print(f"time to first row: {(out.first_flush - start) * 1000:.1f} ms")
+        print(f"total:             {total:.2f} s")
+        print(f"peak RSS growth:   {(rss_after - rss_before) / 1024:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Compare ``transfer_file`` with ``shutil.move`` for large cross-device files.
+
+Pass two directories on different filesystems (e.g. a tmpfs and a loop
+mount); by default /dev/shm and the system temp dir are used.
+
+Usage: python benchmarks/bench_transfer.py [--src-dir D] [--dst-dir D]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from photo_mover.transfer import transfer_file  # noqa: E402
+
+
+def make_file(path: Path, size: int) -> None:
+    block = os.urandom(1 << 20)
+    with open(path, "wb") as f:
+        for _ in range(size // len(block)):
+            f.write(block)
+
+
+def run(label: str, move, src_dir: Path, dst_dir: Path, files: int, size: int):
+    sources = []
+    for i in range(files):
+        p = src_dir / f"bench_{i}.mov"
+        make_file(p, size)
+        sources.append(p)
+    methods: dict[str, int] = {}
+    start = time.perf_counter()
+    for p in sources:
+        method = move(p, dst_dir / p.name)
+        methods[method] = methods.get(method, 0) + 1
+    elapsed = time.perf_counter() - start
+    for p in sources:
+        (dst_dir / p.name).unlink()
+    mb = files * size / 1e6
+    print(f"{label:<14} {elapsed:8.3f}s {mb / elapsed:10.1f} MB/s  {methods}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--src-dir", default="/dev/shm")
+    parser.add_argument("--dst-dir", default=tempfile.gettempdir())
+    parser.add_argument("--files", type=int, default=4)
+    parser.add_argument("--size-mb", type=int, default=256)
+    args = parser.parse_args()
+
+    src_dev = os.stat(args.src_dir).st_dev
+    if src_dev == os.stat(args.dst_dir).st_dev:
+        print("warning: source and destination are on the same device")
+
+    with (
+        tempfile.TemporaryDirectory(dir=args.src_dir) as s,
+        tempfile.TemporaryDirectory(dir=args.dst_dir) as d,
+    ):
+        src_dir, dst_dir = Path(s), Path(d)
+        size = args.size_mb << 20
+
+        def with_shutil(p: Path, target: Path) -> str:
+            shutil.move(str(p), str(target))
+            return "shutil.move"
+
+        def with_transfer(p: Path, target: Path) -> str:
+            return transfer_file(p, target).method
+
+        run("shutil.move", with_shutil, src_dir, dst_dir, args.files, size)
+        run("transfer_file", with_transfer, src_dir, dst_dir, args.files, size)
+
+
+if __name__ == "__main__":
+    main()
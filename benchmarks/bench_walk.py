@@ -0,0 +1,104 @@
+"""Compare the legacy rglob/sorted/stat listing with the scandir walker.
+
+Each implementation runs in its own subprocess so that peak RSS is not
+shared. Syscall counts are collected with ``strace -c`` when it is installed.
+
+Usage: python benchmarks/bench_walk.py [--dirs N] [--files-per-dir N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+
+def legacy(src: Path) -> int:
+    count = 0
+    for p in sorted(src.rglob("*")):
+        if not p.is_file():
+            continue
+        p.relative_to(src)
+        p.stat().st_size
+        count += 1
+    return count
+
+
+def walker(src: Path) -> int:
+    from photo_mover.csv_exporter import scan_media
+
+    return sum(1 for _ in scan_media(src, recursive=True))
+
+
+def child(impl: str, src: Path) -> None:
+    start = time.perf_counter()
+    count = {"legacy": legacy, "walker": walker}[impl](src)
+    elapsed = time.perf_counter() - start
+    rss_kib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"{count} {elapsed:.6f} {rss_kib}")
+
+
+def make_tree(root: Path, dirs: int, files_per_dir: int) -> None:
+    for d in range(dirs):
+        sub = root / f"{d // 32:03}" / f"{d:05}"
+        sub.mkdir(parents=True)
+        for i in range(files_per_dir):
+            (sub / f"IMG_{i:05}.jpg").touch()
+
+
+def syscalls(impl: str, src: Path) -> str:
+    if shutil.which("strace") is None:
+        return "n/a"
+    out = subprocess.run(
+        ["strace", "-f", "-c", "-o", "/dev/stdout", sys.executable]
+        + [__file__, "--child", impl, str(src)],
+        capture_output=True,
+        text=True,
+    ).stdout
+    for line in out.splitlines():
+        if line.strip().endswith("total"):
+            return line.split()[2]
+    return "?"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dirs", type=int, default=200)
+    parser.add_argument("--files-per-dir", type=int, default=250)
+    parser.add_argument("--child", nargs=2, metavar=("IMPL", "SRC"))
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child[0], Path(args.child[1]))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        src = Path(tmp)
+        make_tree(src, args.dirs, args.files_per_dir)
+        print(f"{'impl':<8} {'files':>8} {'seconds':>9} {'peak RSS':>10} syscalls")
+        for impl in ("legacy", "walker"):
+            out = subprocess.run(
+                [sys.executable, __file__, "--child", impl, str(src)],
+                capture_output=True,
+                text=True,
+                check=True,
+                env={**os.environ, "PYTHONPATH": str(ROOT)},
+            ).stdout.split()
+            count, elapsed, rss = int(out[0]), float(out[1]), int(out[2])
+            print(
+                f"{impl:<8} {count:>8} {elapsed:>9.3f} {rss / 1024:>8.1f}MB "
+                f"{syscalls(impl, src)}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""Deterministic synthetic photo library generator for the benchmarks.
+
+The same spec and seed always produce the same tree: directory names,
+file names, sizes and contents. Files are spread over every level of a
+``depth``-deep tree with ``fanout`` subdirectories per directory, sizes
+follow a log-normal distribution around ``median_kb`` (capped at
+``max_kb``), and ``dup_ratio`` of the files repeat the content of an
+earlier file so duplicate detection and ``--on-duplicate`` have work.
+
+Usage: python benchmarks/synthetic.py DIR [--files N] [--depth D] [--fanout F]
+       [--median-kb KB] [--max-kb KB] [--dup-ratio R] [--seed S]
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import math
+import os
+import random
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+EXTENSIONS = ("jpg", "jpg", "jpg", "heic", "png", "mp4", "mov")
+
+# Contents are slices of one pseudo-random block, prefixed with a
+# per-content header so files differ without generating fresh random data.
+_BLOCK_SIZE = 1 << 20
+
+
+@dataclass(frozen=True)
+class SyntheticSpec:
+    files: int = 2000
+    depth: int = 2
+    fanout: int = 4
+    median_kb: float = 64
+    max_kb: float = 4096
+    dup_ratio: float = 0.1
+    seed: int = 1
+
+    def __post_init__(self):
+        if self.files < 0 or self.depth < 0 or self.fanout < 1:
+            raise ValueError(f"Invalid spec: {self}")
+        if not 0 <= self.dup_ratio < 1:
+            raise ValueError(f"dup_ratio must be in [0, 1): {self.dup_ratio}")
+
+
+@dataclass
+class Manifest:
+    files: int = 0
+    bytes: int = 0
+    dirs: int = 0
+    duplicates: int = 0
+    top_level_files: int = 0
+
+
+def directories(spec: SyntheticSpec) -> list[str]:
+    """Relative directory paths of the tree, root (``""``) first."""
+    dirs = [""]
+    level = [""]
+    for depth in range(spec.depth):
+        level = [
+            os.path.join(parent, f"d{depth}_{i:02}")
+            for parent in level
+            for i in range(spec.fanout)
+        ]
+        dirs.extend(level)
+    return dirs
+
+
+def plan_files(spec: SyntheticSpec) -> list[tuple[str, int, int]]:
+    """``(relative path, size, content id)`` of every file, in creation order."""
+    rng = random.Random(spec.seed)
+    dirs = directories(spec)
+    sigma = 1.0
+    files = []
+    contents: list[int] = []
+    for i in range(spec.files):
+        directory = dirs[i % len(dirs)]
+        ext = EXTENSIONS[rng.randrange(len(EXTENSIONS))]
+        if contents and rng.random() < spec.dup_ratio:
+            content = rng.choice(contents)
+            size = files[content][1]
+        else:
+            content = i
+            kb = min(spec.max_kb, rng.lognormvariate(math.log(spec.median_kb), sigma))
+            size = max(64, int(kb * 1024))
+            contents.append(i)
+        files.append((os.path.join(directory, f"IMG_{i:06}.{ext}"), size, content))
+    return files
+
+
+def generate(root: Path, spec: SyntheticSpec) -> Manifest:
+    """Create the tree described by ``spec`` under ``root``."""
+    root = Path(root)
+    block = random.Random(spec.seed).randbytes(_BLOCK_SIZE)
+    manifest = Manifest()
+    for rel in directories(spec):
+        (root / rel).mkdir(parents=True, exist_ok=True)
+        manifest.dirs += 1
+    for i, (rel, size, content) in enumerate(plan_files(spec)):
+        header = hashlib.sha256(b"%d:%d" % (spec.seed, content)).digest()
+        start = (content * 4099) % _BLOCK_SIZE
+        with open(root / rel, "wb") as f:
+            f.write(header[:size])
+            remaining = size - len(header)
+            while remaining > 0:
+                chunk = block[start : start + remaining]
+                f.write(chunk)
+                remaining -= len(chunk)
+                start = 0
+        manifest.files += 1
+        manifest.bytes += size
+        manifest.duplicates += content != i
+        manifest.top_level_files += os.sep not in rel
+    return manifest
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    defaults = SyntheticSpec()
+    parser.add_argument("--files", type=int, default=defaults.files)
+    parser.add_argument("--depth", type=int, default=defaults.depth)
+    parser.add_argument("--fanout", type=int, default=defaults.fanout)
+    parser.add_argument("--median-kb", type=float, default=defaults.median_kb)
+    parser.add_argument("--max-kb", type=float, default=defaults.max_kb)
+    parser.add_argument("--dup-ratio", type=float, default=defaults.dup_ratio)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+
+
+def spec_from_args(args: argparse.Namespace) -> SyntheticSpec:
+    return SyntheticSpec(
+        files=args.files,
+        depth=args.depth,
+        fanout=args.fanout,
+        median_kb=args.median_kb,
+        max_kb=args.max_kb,
+        dup_ratio=args.dup_ratio,
+        seed=args.seed,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("dir", type=Path)
+    add_arguments(parser)
+    args = parser.parse_args()
+    manifest = generate(args.dir, spec_from_args(args))
+    print(asdict(manifest))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,3 @@
-from .mover import move_media
+from .mover import MoveResult, iter_moves, move_media
 
-__all__ = ["move_media"]
+__all__ = ["MoveResult", "iter_moves", "move_media"]
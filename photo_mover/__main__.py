@@ -1,17 +1,55 @@
 from __future__ import annotations
 
 import argparse
+import contextlib
 from pathlib import Path
-from .mover import move_media
+from .binary_exporter import OUTPUT_FORMATS
+from .dest_index import ON_DUPLICATE_POLICIES
+from .hashing import (
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_HASH_ALGO,
+    EXECUTOR_KINDS,
+    HASH_ALGORITHMS,
+    MMAP_THRESHOLD,
+    new_hash,
+)
+from .filters import DEFAULT_PRUNE_DIRS, FileFilter, parse_newer_than, parse_size
+from .mover import (
+    DEFAULT_EXTENSIONS,
+    build_plan,
+    execute_plan,
+    iter_moves,
+    resume_moves,
+)
+from .naming import (
+    COLLISION_POLICIES,
+    DATE_SOURCES,
+    DEFAULT_LAYOUT,
+    LAYOUT_FIELDS,
+    validate_layout,
+)
+from .plan import MovePlan
+from .progress import Progress
 import logging
+import re
 import sys
 
 
+def _arg_type(parse):
+    def convert(text):
+        try:
+            return parse(text)
+        except ValueError as e:
+            raise argparse.ArgumentTypeError(str(e))
+
+    return convert
+
+
 def main(argv=None):
     parser = argparse.ArgumentParser(
         prog="photo_mover", description="Move photos/videos from source to destination"
     )
-    parser.add_argument("--src", required=True, help="Source directory")
+    parser.add_argument("--src", help="Source directory")
     parser.add_argument("--dst", help="Destination directory")
     parser.add_argument(
         "--recursive", action="store_true", help="Scan source recursively"
@@ -25,7 +63,172 @@ def main(argv=None):
         "--extensions",
         help="Comma-separated list of extensions to include (e.g. jpg,png,mp4)",
     )
+    parser.add_argument(
+        "--include",
+        action="append",
+        default=[],
+        metavar="GLOB",
+        help="Only files matching GLOB (case-insensitive; matched against the "
+        "name, or the path under --src if it contains /). Repeatable",
+    )
+    parser.add_argument(
+        "--exclude",
+        action="append",
+        default=[],
+        metavar="GLOB",
+        help="Skip files and directories matching GLOB. Repeatable",
+    )
+    parser.add_argument(
+        "--min-size",
+        type=_arg_type(parse_size),
+        help="Skip files smaller than this (e.g. 100K, 5M)",
+    )
+    parser.add_argument(
+        "--max-size",
+        type=_arg_type(parse_size),
+        help="Skip files larger than this (e.g. 2G)",
+    )
+    parser.add_argument(
+        "--newer-than",
+        type=_arg_type(parse_newer_than),
+        help="Only files modified after this: an age (7d, 12h) or ISO date",
+    )
+    parser.add_argument(
+        "--prune-dir",
+        action="append",
+        default=[],
+        metavar="NAME",
+        help="Never descend into directories called NAME (in addition to %s). "
+        "Repeatable" % ", ".join(DEFAULT_PRUNE_DIRS),
+    )
+    parser.add_argument(
+        "--no-default-prune",
+        action="store_true",
+        help="Also walk %s directories" % ", ".join(DEFAULT_PRUNE_DIRS),
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of concurrent cross-device moves",
+    )
+    parser.add_argument(
+        "--per-device",
+        type=int,
+        help="Maximum in-flight moves per device with --jobs (default: --jobs)",
+    )
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="Hash files while moving and verify the copy before deleting the source",
+    )
+    parser.add_argument(
+        "--on-duplicate",
+        choices=ON_DUPLICATE_POLICIES,
+        default="move",
+        help="What to do with files whose content already exists in --dst",
+    )
+    parser.add_argument(
+        "--layout",
+        default=DEFAULT_LAYOUT,
+        help="Target path template under --dst, e.g. {year}/{month}/{name} "
+        "(fields: %s)" % ", ".join(LAYOUT_FIELDS),
+    )
+    parser.add_argument(
+        "--layout-date",
+        choices=DATE_SOURCES,
+        default="mtime",
+        help="Source of {year}/{month}/{day} in --layout: the file mtime, or "
+        "the capture time from EXIF/video metadata (falls back to mtime)",
+    )
+    parser.add_argument(
+        "--on-collision",
+        choices=COLLISION_POLICIES,
+        default="suffix",
+        help="How to rename a file whose target name is taken",
+    )
+    parser.add_argument(
+        "--plan-out",
+        metavar="PATH",
+        help="Write the move plan to PATH for review instead of moving files",
+    )
+    parser.add_argument(
+        "--execute",
+        metavar="PLAN",
+        help="Apply a plan written by --plan-out (no --src/--dst)",
+    )
+    parser.add_argument(
+        "--journal",
+        metavar="PATH",
+        help="Write a write-ahead journal of the move so it can be resumed",
+    )
+    parser.add_argument(
+        "--resume",
+        metavar="JOURNAL",
+        help="Continue an interrupted move from its journal (no --src/--dst)",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and move files as they arrive in --src (inotify on "
+        "Linux, with periodic rescans as a fallback)",
+    )
+    parser.add_argument(
+        "--watch-debounce",
+        type=float,
+        default=2.0,
+        metavar="SECONDS",
+        help="With --watch, move a batch once no new file arrived for SECONDS",
+    )
+    parser.add_argument(
+        "--reconcile-interval",
+        type=float,
+        default=300.0,
+        metavar="SECONDS",
+        help="With --watch, rescan --src this often to pick up missed files",
+    )
+    parser.add_argument(
+        "--io-concurrency",
+        type=int,
+        default=1,
+        help="Directory listings/stats kept in flight while walking --src "
+        "(raise for SMB/NFS mounts)",
+    )
+    parser.add_argument(
+        "--walk-workers",
+        type=int,
+        default=1,
+        help="Processes walking --src in shards for --csv/--find-duplicates "
+        "with --recursive (very large trees; output order is unchanged)",
+    )
     parser.add_argument("--verbose", action="store_true")
+    parser.add_argument(
+        "--no-progress",
+        action="store_true",
+        help="Do not write progress lines (counts, throughput, ETA) to stderr "
+        "(never written for --csv/--find-duplicates when stdout is a terminal)",
+    )
+    parser.add_argument(
+        "--stats-json",
+        metavar="PATH",
+        help="Write a JSON summary of counts, throughput and per-device "
+        "transfer rates to PATH when the run finishes",
+    )
+    parser.add_argument(
+        "--trace",
+        metavar="FILE",
+        help="Record per-file spans (list, stat, hash, csv.write, move ...) as "
+        "Chrome trace-event JSON (open in Perfetto) and log per-phase totals "
+        "and the slowest files",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="FILE",
+        nargs="?",
+        const="photo_mover.prof",
+        help="Run under cProfile and tracemalloc, save the profile to FILE "
+        "(default photo_mover.prof) and log the top functions and allocations",
+    )
     parser.add_argument(
         "--csv",
         action="store_true",
@@ -34,15 +237,184 @@ def main(argv=None):
     parser.add_argument(
         "--csv-include-hash",
         action="store_true",
-        help="Include SHA256 hash column in CSV output (requires --csv)",
+        help="Include a hash column (named after --hash-algo) in CSV output "
+        "(requires --csv)",
+    )
+    parser.add_argument(
+        "--csv-include-metadata",
+        action="store_true",
+        help="Include capture time and pixel size columns read from "
+        "EXIF/video headers (requires --csv)",
+    )
+    parser.add_argument(
+        "--find-duplicates",
+        action="store_true",
+        help="List groups of files with identical content (does not move files)",
+    )
+    parser.add_argument(
+        "--duplicates-format",
+        choices=["csv", "json"],
+        default="csv",
+        help="Output format for --find-duplicates",
+    )
+    parser.add_argument(
+        "--format",
+        choices=OUTPUT_FORMATS,
+        default="csv",
+        help="Listing format for --csv: text CSV, a compact built-in binary "
+        "format, or Arrow IPC / Parquet (requires pyarrow)",
+    )
+    parser.add_argument(
+        "--incremental",
+        metavar="SNAPSHOT",
+        help="With --csv, list only files added/removed/modified since SNAPSHOT "
+        "(a snapshot file, updated after the scan, or a previous CSV/binary "
+        "listing used as a read-only baseline)",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Flush CSV rows periodically while scanning (requires --csv)",
+    )
+    parser.add_argument(
+        "--hash-workers",
+        type=int,
+        default=1,
+        help="Number of files hashed concurrently with --csv-include-hash",
+    )
+    parser.add_argument(
+        "--hash-executor",
+        choices=EXECUTOR_KINDS,
+        default="thread",
+        help="Worker pool type used when --hash-workers > 1",
+    )
+    parser.add_argument(
+        "--hash-chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help="Read buffer size in bytes used while hashing",
+    )
+    parser.add_argument(
+        "--hash-mmap",
+        action="store_true",
+        help="Hash files of %d MiB or more through mmap with "
+        "--csv-include-hash/--find-duplicates (faster on a warm page cache; "
+        "a file truncated while being hashed kills the process with SIGBUS, "
+        "so not for sources still being written to)" % (MMAP_THRESHOLD >> 20),
+    )
+    parser.add_argument(
+        "--hash-algo",
+        choices=list(HASH_ALGORITHMS),
+        default=DEFAULT_HASH_ALGO,
+        help="Hash used by --csv-include-hash and --find-duplicates (blake2b "
+        "beats sha256 on CPUs without SHA instructions; blake3 and the "
+        "non-cryptographic xxh3_128 need the blake3 / xxhash packages)",
+    )
+    parser.add_argument(
+        "--hash-cache",
+        metavar="PATH",
+        help="SQLite file caching hashes of unchanged files between runs "
+        "(also used as trusted digests by --verify)",
     )
 
     args = parser.parse_args(argv)
 
+    if args.resume and args.execute:
+        parser.error("--resume and --execute are mutually exclusive")
+    if not args.src and not (args.resume or args.execute):
+        parser.error("--src is required")
+    if (args.resume or args.execute) and (
+        args.csv or args.find_duplicates or args.plan_out
+    ):
+        parser.error(
+            "--resume/--execute cannot be combined with "
+            "--csv/--find-duplicates/--plan-out"
+        )
+    if args.resume and args.journal:
+        parser.error("--resume continues its own journal; drop --journal")
     if args.csv_include_hash and not args.csv:
         parser.error("--csv-include-hash requires --csv")
-    if not args.csv and not args.dst:
+    if args.csv_include_metadata and not args.csv:
+        parser.error("--csv-include-metadata requires --csv")
+    if args.csv and args.find_duplicates:
+        parser.error("--csv and --find-duplicates are mutually exclusive")
+    standalone = args.csv or args.find_duplicates or args.resume or args.execute
+    if not standalone and not args.dst:
         parser.error("--dst is required when not using --csv mode")
+    if args.format != "csv" and not args.csv:
+        parser.error("--format requires --csv")
+    if args.incremental and not (args.csv and args.format == "csv"):
+        parser.error("--incremental requires --csv with --format csv")
+    if args.incremental and args.csv_include_metadata:
+        parser.error("--incremental does not support --csv-include-metadata")
+    filtering = bool(
+        args.include
+        or args.exclude
+        or args.min_size is not None
+        or args.max_size is not None
+        or args.newer_than is not None
+        or args.prune_dir
+        or args.no_default_prune
+    )
+    if filtering and args.incremental:
+        parser.error("--incremental only supports --extensions filtering")
+    if args.watch and (standalone or args.plan_out or args.journal or args.incremental):
+        parser.error(
+            "--watch cannot be combined with --csv/--find-duplicates/--plan-out/"
+            "--execute/--resume/--journal"
+        )
+    if args.watch_debounce < 0:
+        parser.error("--watch-debounce must be >= 0")
+    if args.reconcile_interval <= 0:
+        parser.error("--reconcile-interval must be > 0")
+    if args.stream and not args.csv:
+        parser.error("--stream requires --csv")
+    if args.hash_algo != DEFAULT_HASH_ALGO:
+        if not (args.csv_include_hash or args.find_duplicates):
+            parser.error("--hash-algo requires --csv-include-hash or --find-duplicates")
+        if args.format != "csv" or args.incremental:
+            parser.error(
+                "--format and --incremental store SHA-256 digests; " "drop --hash-algo"
+            )
+        try:
+            new_hash(args.hash_algo)
+        except ValueError as e:
+            parser.error(str(e))
+    if args.hash_mmap and not (args.csv_include_hash or args.find_duplicates):
+        parser.error("--hash-mmap requires --csv-include-hash or --find-duplicates")
+    if args.hash_cache and not (
+        args.csv_include_hash
+        or args.csv_include_metadata
+        or args.verify
+        or args.plan_out
+        or args.on_duplicate != "move"
+        or args.layout_date != "mtime"
+    ):
+        parser.error(
+            "--hash-cache requires --csv-include-hash, --csv-include-metadata, "
+            "--verify, --plan-out, --on-duplicate or --layout-date"
+        )
+    try:
+        validate_layout(args.layout)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.jobs < 1:
+        parser.error("--jobs must be >= 1")
+    if args.per_device is not None and args.per_device < 1:
+        parser.error("--per-device must be >= 1")
+    if args.io_concurrency < 1:
+        parser.error("--io-concurrency must be >= 1")
+    if args.walk_workers < 1:
+        parser.error("--walk-workers must be >= 1")
+    if args.walk_workers > 1:
+        if not (args.csv or args.find_duplicates) or args.incremental:
+            parser.error("--walk-workers requires --csv or --find-duplicates")
+        if args.io_concurrency > 1:
+            parser.error("--walk-workers and --io-concurrency are mutually exclusive")
+    if args.hash_workers < 1:
+        parser.error("--hash-workers must be >= 1")
+    if args.hash_chunk_size < 1:
+        parser.error("--hash-chunk-size must be >= 1")
 
     logging.basicConfig(
         level=logging.DEBUG if args.verbose else logging.INFO, format="%(message)s"
@@ -51,32 +423,291 @@ def main(argv=None):
     exts = None
     if args.extensions:
         exts = [e.strip() for e in args.extensions.split(",") if e.strip()]
+    file_filter = None
+    if filtering:
+        moving = not (args.csv or args.find_duplicates)
+        try:
+            file_filter = FileFilter(
+                extensions=DEFAULT_EXTENSIONS if exts is None and moving else exts,
+                include=args.include,
+                exclude=args.exclude,
+                min_size=args.min_size,
+                max_size=args.max_size,
+                newer_than=args.newer_than,
+                prune_dirs=(() if args.no_default_prune else DEFAULT_PRUNE_DIRS)
+                + tuple(args.prune_dir),
+            )
+        except (ValueError, re.error) as e:
+            parser.error(f"Invalid filter: {e}")
+        exts = None
+
+    # A status line redrawn on stderr would garble a listing written to the
+    # same terminal, so listings only get one when stdout is redirected.
+    listing_on_tty = (args.csv or args.find_duplicates) and sys.stdout.isatty()
+    progress = None
+    if args.stats_json or not args.no_progress:
+        progress = Progress(render=not (args.no_progress or listing_on_tty))
+    extra_stats = {}
 
     try:
-        if args.csv:
-            from .csv_exporter import scan_media, write_csv
-
-            records = scan_media(
-                Path(args.src),
-                recursive=args.recursive,
-                extensions=exts,
-                include_hash=args.csv_include_hash,
-            )
-            write_csv(records, include_hash=args.csv_include_hash)
-        else:
-            moved = move_media(
-                Path(args.src),
-                Path(args.dst),
-                recursive=args.recursive,
-                dry_run=args.dry_run or True,
-                extensions=exts,
-            )
-            if args.dry_run:
-                print("Dry run: files that would be moved:")
+        with contextlib.ExitStack() as stack:
+            if args.trace:
+                from .tracing import tracing
+
+                stack.enter_context(tracing(Path(args.trace)))
+            if args.profile:
+                from .tracing import profiling
+
+                stack.enter_context(profiling(Path(args.profile)))
+            cache = None
+            if args.hash_cache:
+                from .hash_cache import HashCache
+
+                cache = stack.enter_context(HashCache(Path(args.hash_cache)))
+            if args.csv and args.incremental:
+                from .incremental import (
+                    Snapshot,
+                    is_snapshot_file,
+                    scan_changes,
+                    write_changes_csv,
+                )
+
+                snapshot_path = Path(args.incremental)
+                previous = None
+                if snapshot_path.exists():
+                    previous = Snapshot.load(snapshot_path)
+                current = Snapshot()
+                write_changes_csv(
+                    scan_changes(
+                        Path(args.src),
+                        previous,
+                        recursive=args.recursive,
+                        extensions=exts,
+                        include_hash=args.csv_include_hash,
+                        current=current,
+                    ),
+                    include_hash=args.csv_include_hash,
+                )
+                if previous is None or is_snapshot_file(snapshot_path):
+                    current.save(snapshot_path)
+            elif args.csv:
+                from .csv_exporter import STREAM_FLUSH_ROWS, scan_media, write_csv
+
+                records = scan_media(
+                    Path(args.src),
+                    recursive=args.recursive,
+                    extensions=exts,
+                    include_hash=args.csv_include_hash,
+                    hash_workers=args.hash_workers,
+                    hash_executor=args.hash_executor,
+                    hash_chunk_size=args.hash_chunk_size,
+                    hash_cache=cache,
+                    io_concurrency=args.io_concurrency,
+                    file_filter=file_filter,
+                    include_metadata=args.csv_include_metadata,
+                    progress=progress,
+                    hash_algo=args.hash_algo,
+                    walk_workers=args.walk_workers,
+                    hash_mmap=args.hash_mmap,
+                )
+                if args.format == "csv":
+                    write_csv(
+                        records,
+                        include_hash=args.csv_include_hash,
+                        flush_every=STREAM_FLUSH_ROWS if args.stream else None,
+                        include_metadata=args.csv_include_metadata,
+                        hash_algo=args.hash_algo,
+                    )
+                else:
+                    from .binary_exporter import write_records
+
+                    write_records(
+                        records,
+                        format=args.format,
+                        include_hash=args.csv_include_hash,
+                        include_metadata=args.csv_include_metadata,
+                    )
+            elif args.find_duplicates:
+                from .csv_exporter import scan_media
+                from .duplicates import (
+                    DuplicateStats,
+                    find_duplicates,
+                    write_duplicates_csv,
+                    write_duplicates_json,
+                )
+
+                stats = DuplicateStats()
+                groups = find_duplicates(
+                    scan_media(
+                        Path(args.src),
+                        recursive=args.recursive,
+                        extensions=exts,
+                        io_concurrency=args.io_concurrency,
+                        file_filter=file_filter,
+                        progress=progress,
+                        walk_workers=args.walk_workers,
+                    ),
+                    Path(args.src),
+                    stats=stats,
+                    hash_algo=args.hash_algo,
+                    use_mmap=args.hash_mmap,
+                )
+                if args.duplicates_format == "json":
+                    write_duplicates_json(groups, hash_algo=args.hash_algo)
+                else:
+                    write_duplicates_csv(groups, hash_algo=args.hash_algo)
+                logging.getLogger(__name__).info(
+                    "duplicates: %(files)d files, %(unique_size)d unique by size, "
+                    "%(unique_partial)d by partial hash, %(unique_full)d by full "
+                    "hash, %(duplicates)d duplicates, %(bytes_read)d bytes read, "
+                    "%(unreadable)d unreadable",
+                    vars(stats),
+                )
+                extra_stats["duplicates"] = vars(stats)
+            elif args.watch:
+                from .watch import watch_media
+
+                if progress is not None:
+                    progress.render = False
+
+                def report(moved: list[Path]) -> None:
+                    for p in moved:
+                        print(" - ", p, flush=True)
+
+                print(
+                    (
+                        "Dry run: watching for files to move:"
+                        if args.dry_run
+                        else "Watching for files to move:"
+                    ),
+                    flush=True,
+                )
+                try:
+                    watch_media(
+                        Path(args.src),
+                        Path(args.dst),
+                        recursive=args.recursive,
+                        debounce=args.watch_debounce,
+                        reconcile_interval=args.reconcile_interval,
+                        on_batch=report,
+                        dry_run=args.dry_run,
+                        extensions=exts,
+                        jobs=args.jobs,
+                        per_device=args.per_device,
+                        verify=args.verify,
+                        hash_cache=cache,
+                        on_duplicate=args.on_duplicate,
+                        layout=args.layout,
+                        on_collision=args.on_collision,
+                        file_filter=file_filter,
+                        layout_date=args.layout_date,
+                        progress=progress,
+                    )
+                except KeyboardInterrupt:
+                    pass
+            elif args.plan_out:
+                plan = build_plan(
+                    Path(args.src),
+                    Path(args.dst),
+                    recursive=args.recursive,
+                    extensions=exts,
+                    hash_cache=cache,
+                    on_duplicate=args.on_duplicate,
+                    layout=args.layout,
+                    on_collision=args.on_collision,
+                    io_concurrency=args.io_concurrency,
+                    file_filter=file_filter,
+                    layout_date=args.layout_date,
+                    progress=progress,
+                )
+                plan.save(Path(args.plan_out))
+                if progress is not None:
+                    progress.clear()
+                print(
+                    f"Plan written to {args.plan_out}: {len(plan)} operations, "
+                    f"{plan.total_bytes} bytes to move"
+                )
             else:
-                print("Moved files:")
-            for p in moved:
-                print(" - ", p)
+                heading = (
+                    "Dry run: files that would be moved:"
+                    if args.dry_run
+                    else "Moved files:"
+                )
+
+                def show(target: Path, sha256: str | None) -> None:
+                    if progress is not None:
+                        progress.clear()
+                    if sha256 is None:
+                        print(" - ", target)
+                    else:
+                        print(" - ", target, sha256)
+
+                digests: dict[Path, str] = {}
+                if args.execute:
+                    moved = execute_plan(
+                        MovePlan.load(Path(args.execute)),
+                        dry_run=args.dry_run,
+                        jobs=args.jobs,
+                        per_device=args.per_device,
+                        verify=args.verify,
+                        digests=digests,
+                        hash_cache=cache,
+                        journal=Path(args.journal) if args.journal else None,
+                        progress=progress,
+                    )
+                elif args.resume:
+                    moved = resume_moves(
+                        Path(args.resume),
+                        dry_run=args.dry_run,
+                        jobs=args.jobs,
+                        per_device=args.per_device,
+                        verify=args.verify,
+                        digests=digests,
+                        hash_cache=cache,
+                        progress=progress,
+                    )
+                else:
+                    results = iter_moves(
+                        Path(args.src),
+                        Path(args.dst),
+                        recursive=args.recursive,
+                        dry_run=args.dry_run,
+                        extensions=exts,
+                        jobs=args.jobs,
+                        per_device=args.per_device,
+                        verify=args.verify,
+                        hash_cache=cache,
+                        on_duplicate=args.on_duplicate,
+                        layout=args.layout,
+                        on_collision=args.on_collision,
+                        journal=Path(args.journal) if args.journal else None,
+                        io_concurrency=args.io_concurrency,
+                        file_filter=file_filter,
+                        layout_date=args.layout_date,
+                        progress=progress,
+                    )
+                    # Print each target as soon as it is moved.
+                    print(heading)
+                    for result in results:
+                        if result.placed:
+                            show(result.target, result.sha256)
+                if args.execute or args.resume:
+                    if progress is not None:
+                        progress.finish()
+                    print(heading)
+                    for p in moved:
+                        show(p, digests.get(p))
+            if cache is not None:
+                logging.getLogger(__name__).info(
+                    "hash cache: %(hits)d hits, %(misses)d misses, "
+                    "%(stored)d stored, %(pruned)d pruned",
+                    cache.stats(),
+                )
+                extra_stats["hash_cache"] = cache.stats()
+        if progress is not None:
+            progress.finish()
+            if args.stats_json:
+                progress.write_json(Path(args.stats_json), **extra_stats)
     except Exception as e:
         print("Error:", e)
         sys.exit(2)
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, AsyncIterator, Iterator
+
+if TYPE_CHECKING:
+    from .filters import FileFilter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_IO_CONCURRENCY = 16
+
+
+@dataclass(frozen=True, slots=True)
+class StatEntry:
+    """A walked file with its ``stat`` already fetched.
+
+    Quacks like the ``os.DirEntry`` objects :func:`walk_files` yields
+    (``name``, ``path``, ``stat()``), so callers can take either.
+    """
+
+    name: str
+    path: str
+    st: os.stat_result
+
+    def stat(self) -> os.stat_result:
+        return self.st
+
+
+async def awalk_files(
+    root: Path,
+    *,
+    recursive: bool = False,
+    concurrency: int = DEFAULT_IO_CONCURRENCY,
+    file_filter: FileFilter | None = None,
+) -> AsyncIterator[StatEntry]:
+    """Async variant of :func:`~photo_mover.walker.walk_files`.
+
+    Entries come out in exactly the same order, but directory listings and
+    file stats run on ``concurrency`` threads: entering a directory
+    immediately queues the listings of its subdirectories and the stats of
+    its files, so on a high-latency mount up to ``concurrency`` round trips
+    are in flight while entries are consumed in order. ``file_filter`` name
+    checks run before a file is stat'ed and pruned directories are never
+    listed.
+    """
+    async for batch in _awalk_batches(root, recursive, concurrency, file_filter):
+        for entry in batch:
+            yield entry
+
+
+def walk_files_concurrent(
+    root: Path,
+    *,
+    recursive: bool = False,
+    concurrency: int = DEFAULT_IO_CONCURRENCY,
+    file_filter: FileFilter | None = None,
+) -> Iterator[StatEntry]:
+    """Synchronous wrapper around :func:`awalk_files` for non-async callers.
+
+    Runs a private event loop, resuming it once per run of files in a
+    directory rather than once per file.
+    """
+    loop = asyncio.new_event_loop()
+    batches = _awalk_batches(root, recursive, concurrency, file_filter)
+    try:
+        while True:
+            try:
+                batch = loop.run_until_complete(anext(batches))
+            except StopAsyncIteration:
+                return
+            yield from batch
+    finally:
+        loop.run_until_complete(batches.aclose())
+        loop.close()
+
+
+async def _awalk_batches(
+    root: Path,
+    recursive: bool,
+    concurrency: int,
+    file_filter: FileFilter | None,
+) -> AsyncIterator[list[StatEntry]]:
+    if concurrency < 1:
+        raise ValueError(f"concurrency must be >= 1: {concurrency}")
+    loop = asyncio.get_running_loop()
+    pool = ThreadPoolExecutor(concurrency, thread_name_prefix="walk")
+
+    prefix = len(os.path.join(root, ""))
+
+    def enter(listing: list[tuple[str, str, bool]]) -> Iterator[tuple]:
+        items = []
+        for name, path, is_dir in listing:
+            if is_dir:
+                if recursive and not (
+                    file_filter is not None and file_filter.prune(name, path[prefix:])
+                ):
+                    items.append((name, path, True, submit(_list_dir, path)))
+            elif file_filter is None or file_filter.match_name(name, path[prefix:]):
+                items.append((name, path, False, submit(os.stat, path)))
+        return iter(items)
+
+    def submit(fn, *args) -> asyncio.Future:
+        return loop.run_in_executor(pool, fn, *args)
+
+    stack: list[Iterator[tuple]] = []
+    try:
+        stack.append(enter(await submit(_list_dir, str(root))))
+        batch: list[StatEntry] = []
+        while stack:
+            item = next(stack[-1], None)
+            if item is None:
+                stack.pop()
+                continue
+            name, path, is_dir, future = item
+            if is_dir and batch:
+                yield batch
+                batch = []
+            try:
+                result = await future
+            except OSError as e:
+                logger.warning(
+                    "Cannot %s %s: %s", "list" if is_dir else "stat", path, e
+                )
+                continue
+            if is_dir:
+                stack.append(enter(result))
+            elif file_filter is None or file_filter.match_stat(result):
+                batch.append(StatEntry(name, path, result))
+        if batch:
+            yield batch
+    finally:
+        for items in stack:
+            for *_, future in items:
+                _discard(future)
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _list_dir(path: str) -> list[tuple[str, str, bool]]:
+    """Sorted (name, path, is_dir) of the files and directories in ``path``."""
+    with os.scandir(path) as it:
+        entries = sorted(it, key=lambda e: e.name)
+    listing = []
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            listing.append((entry.name, entry.path, True))
+        elif entry.is_file():
+            listing.append((entry.name, entry.path, False))
+    return listing
+
+
+def _discard(future: asyncio.Future) -> None:
+    if future.done():
+        if not future.cancelled():
+            future.exception()
+    else:
+        future.cancel()
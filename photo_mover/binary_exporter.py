@@ -0,0 +1,323 @@
+from __future__ import annotations
+
+import struct
+import sys
+from array import array
+from itertools import islice
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator
+
+from .csv_exporter import MediaFileInfo
+
+OUTPUT_FORMATS = ("csv", "binary", "arrow", "parquet")
+
+# Rows per batch: each batch is encoded and written (and flushed) on its
+# own, so memory stays bounded and readers can start before the scan ends.
+BATCH_ROWS = 65536
+
+# Stdlib format: MAGIC, a version byte and a flags byte, then batches of
+# ``<I row count`` followed by the columns; a zero row count ends the file.
+MAGIC = b"PMTB"
+VERSION = 1
+_FLAG_HASH = 1
+_FLAG_METADATA = 2
+_DIGEST_SIZE = 32
+_STRING_COLUMNS = ("filename", "extension", "relative_path")
+
+
+def iter_batches(
+    records: Iterable[MediaFileInfo], rows: int = BATCH_ROWS
+) -> Iterator[list[MediaFileInfo]]:
+    if rows < 1:
+        raise ValueError(f"rows must be >= 1: {rows}")
+    it = iter(records)
+    while batch := list(islice(it, rows)):
+        yield batch
+
+
+def write_binary(
+    records: Iterable[MediaFileInfo],
+    output: BinaryIO | None = None,
+    *,
+    include_hash: bool = False,
+    batch_rows: int = BATCH_ROWS,
+    include_metadata: bool = False,
+) -> None:
+    """Write ``records`` in the stdlib columnar format read by :func:`read_binary`.
+
+    Strings are stored as little-endian ``uint32`` lengths plus one UTF-8
+    blob per column, sizes as ``uint64`` and digests as 32 raw bytes with a
+    presence byte per row. Metadata adds ``taken_at`` as a string column
+    (empty when unknown) and ``uint32`` width/height (0 when unknown).
+    """
+    if output is None:
+        output = sys.stdout.buffer
+    flags = (_FLAG_HASH if include_hash else 0) | (
+        _FLAG_METADATA if include_metadata else 0
+    )
+    output.write(MAGIC + bytes([VERSION, flags]))
+    for batch in iter_batches(records, batch_rows):
+        output.write(_encode_batch(batch, include_hash, include_metadata))
+        output.flush()
+    output.write(struct.pack("<I", 0))
+    output.flush()
+
+
+def read_binary(input: BinaryIO) -> Iterator[MediaFileInfo]:
+    """Yield the records of a :func:`write_binary` stream, one batch at a time."""
+    header = _read_exact(input, len(MAGIC) + 2)
+    if header[: len(MAGIC)] != MAGIC:
+        raise ValueError("Not a photo_mover binary listing")
+    if header[len(MAGIC)] != VERSION:
+        raise ValueError(f"Unsupported binary listing version: {header[4]}")
+    flags = header[len(MAGIC) + 1]
+    include_hash = bool(flags & _FLAG_HASH)
+    include_metadata = bool(flags & _FLAG_METADATA)
+    while True:
+        (n,) = struct.unpack("<I", _read_exact(input, 4))
+        if n == 0:
+            return
+        yield from _decode_batch(input, n, include_hash, include_metadata)
+
+
+def write_arrow(
+    records: Iterable[MediaFileInfo],
+    output: BinaryIO | None = None,
+    *,
+    include_hash: bool = False,
+    batch_rows: int = BATCH_ROWS,
+    parquet: bool = False,
+    include_metadata: bool = False,
+) -> None:
+    """Write ``records`` as an Arrow IPC stream (or Parquet) using pyarrow."""
+    pa = _import_pyarrow()
+    if output is None:
+        output = sys.stdout.buffer
+    schema = _arrow_schema(pa, include_hash, include_metadata)
+    if parquet:
+        import pyarrow.parquet as pq
+
+        writer = pq.ParquetWriter(output, schema)
+    else:
+        writer = pa.ipc.new_stream(output, schema)
+    with writer:
+        for batch in iter_batches(records, batch_rows):
+            columns = [
+                pa.array([r.filename for r in batch], pa.string()),
+                pa.array([r.extension for r in batch], pa.string()),
+                pa.array([r.relative_path for r in batch], pa.string()),
+                pa.array([r.size_bytes for r in batch], pa.uint64()),
+            ]
+            if include_hash:
+                columns.append(
+                    pa.array(
+                        [_digest(r) for r in batch],
+                        pa.binary(_DIGEST_SIZE),
+                    )
+                )
+            if include_metadata:
+                columns += [
+                    pa.array([r.taken_at for r in batch], pa.string()),
+                    pa.array([r.width for r in batch], pa.uint32()),
+                    pa.array([r.height for r in batch], pa.uint32()),
+                ]
+            writer.write_batch(pa.record_batch(columns, schema=schema))
+            output.flush()
+
+
+def read_arrow(input: BinaryIO, *, parquet: bool = False) -> Iterator[MediaFileInfo]:
+    pa = _import_pyarrow()
+    if parquet:
+        import pyarrow.parquet as pq
+
+        batches = pq.ParquetFile(input).iter_batches()
+    else:
+        batches = pa.ipc.open_stream(input)
+    for batch in batches:
+        columns = batch.to_pydict()
+        missing = [None] * batch.num_rows
+        for name, ext, rel, size, digest, taken_at, width, height in zip(
+            columns["filename"],
+            columns["extension"],
+            columns["relative_path"],
+            columns["size_bytes"],
+            columns.get("sha256", missing),
+            columns.get("taken_at", missing),
+            columns.get("width", missing),
+            columns.get("height", missing),
+        ):
+            yield MediaFileInfo(
+                filename=name,
+                extension=ext,
+                relative_path=rel,
+                size_bytes=size,
+                sha256=digest.hex() if digest is not None else None,
+                taken_at=taken_at,
+                width=width,
+                height=height,
+            )
+
+
+def write_records(
+    records: Iterable[MediaFileInfo],
+    output: BinaryIO | None = None,
+    *,
+    format: str = "binary",
+    include_hash: bool = False,
+    batch_rows: int = BATCH_ROWS,
+    include_metadata: bool = False,
+) -> None:
+    """Write ``records`` in one of the binary :data:`OUTPUT_FORMATS`."""
+    if format == "binary":
+        write_binary(
+            records,
+            output,
+            include_hash=include_hash,
+            batch_rows=batch_rows,
+            include_metadata=include_metadata,
+        )
+    elif format in ("arrow", "parquet"):
+        write_arrow(
+            records,
+            output,
+            include_hash=include_hash,
+            batch_rows=batch_rows,
+            parquet=format == "parquet",
+            include_metadata=include_metadata,
+        )
+    else:
+        raise ValueError(
+            f"Unknown binary format: {format!r} (choose from {OUTPUT_FORMATS[1:]})"
+        )
+
+
+def read_records(path: Path) -> Iterator[MediaFileInfo]:
+    """Read a listing written by :func:`write_records`, detecting its format."""
+    with open(path, "rb") as f:
+        magic = f.read(4)
+        f.seek(0)
+        if magic == MAGIC:
+            yield from read_binary(f)
+        elif magic == b"PAR1":
+            yield from read_arrow(f, parquet=True)
+        else:
+            yield from read_arrow(f)
+
+
+def _encode_batch(
+    batch: list[MediaFileInfo], include_hash: bool, include_metadata: bool
+) -> bytes:
+    parts = [struct.pack("<I", len(batch))]
+    for column in _STRING_COLUMNS:
+        encoded = [getattr(r, column).encode("utf-8", "surrogateescape") for r in batch]
+        parts.append(_le(array("I", map(len, encoded))))
+        parts.append(b"".join(encoded))
+    parts.append(_le(array("Q", (r.size_bytes for r in batch))))
+    if include_hash:
+        parts.append(bytes(1 if r.sha256 else 0 for r in batch))
+        parts.append(b"".join(_digest(r) or bytes(_DIGEST_SIZE) for r in batch))
+    if include_metadata:
+        taken = [(r.taken_at or "").encode("ascii") for r in batch]
+        parts.append(_le(array("I", map(len, taken))))
+        parts.append(b"".join(taken))
+        parts.append(_le(array("I", (r.width or 0 for r in batch))))
+        parts.append(_le(array("I", (r.height or 0 for r in batch))))
+    return b"".join(parts)
+
+
+def _digest(r: MediaFileInfo) -> bytes | None:
+    # Both formats store fixed-size SHA-256 digests; anything else would
+    # shift every later column.
+    if not r.sha256:
+        return None
+    digest = bytes.fromhex(r.sha256)
+    if len(digest) != _DIGEST_SIZE:
+        raise ValueError(f"Not a SHA-256 digest: {r.sha256!r}")
+    return digest
+
+
+def _decode_batch(
+    input: BinaryIO, n: int, include_hash: bool, include_metadata: bool
+) -> Iterator[MediaFileInfo]:
+    strings = [_read_strings(input, n) for _ in _STRING_COLUMNS]
+    sizes = _read_array(input, "Q", n)
+    if include_hash:
+        present = _read_exact(input, n)
+        digests = _read_exact(input, n * _DIGEST_SIZE)
+    if include_metadata:
+        taken = _read_strings(input, n)
+        widths = _read_array(input, "I", n)
+        heights = _read_array(input, "I", n)
+    for i in range(n):
+        sha256 = None
+        if include_hash and present[i]:
+            sha256 = digests[i * _DIGEST_SIZE : (i + 1) * _DIGEST_SIZE].hex()
+        yield MediaFileInfo(
+            filename=strings[0][i],
+            extension=strings[1][i],
+            relative_path=strings[2][i],
+            size_bytes=sizes[i],
+            sha256=sha256,
+            taken_at=(taken[i] or None) if include_metadata else None,
+            width=(widths[i] or None) if include_metadata else None,
+            height=(heights[i] or None) if include_metadata else None,
+        )
+
+
+def _read_strings(input: BinaryIO, n: int) -> list[str]:
+    lengths = _read_array(input, "I", n)
+    blob = _read_exact(input, sum(lengths))
+    values, pos = [], 0
+    for length in lengths:
+        values.append(blob[pos : pos + length].decode("utf-8", "surrogateescape"))
+        pos += length
+    return values
+
+
+def _le(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values.tobytes()
+
+
+def _read_array(input: BinaryIO, typecode: str, n: int) -> array:
+    values = array(typecode)
+    values.frombytes(_read_exact(input, n * values.itemsize))
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+def _read_exact(input: BinaryIO, n: int) -> bytes:
+    data = input.read(n)
+    if len(data) != n:
+        raise ValueError("Truncated binary listing")
+    return data
+
+
+def _arrow_schema(pa, include_hash: bool, include_metadata: bool = False):
+    fields = [
+        pa.field("filename", pa.string(), nullable=False),
+        pa.field("extension", pa.string(), nullable=False),
+        pa.field("relative_path", pa.string(), nullable=False),
+        pa.field("size_bytes", pa.uint64(), nullable=False),
+    ]
+    if include_hash:
+        fields.append(pa.field("sha256", pa.binary(_DIGEST_SIZE)))
+    if include_metadata:
+        fields.append(pa.field("taken_at", pa.string()))
+        fields.append(pa.field("width", pa.uint32()))
+        fields.append(pa.field("height", pa.uint32()))
+    return pa.schema(fields)
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc  # noqa: F401
+    except ImportError:
+        raise RuntimeError(
+            "Arrow/Parquet output requires pyarrow (pip install pyarrow); "
+            "use --format binary for the built-in format"
+        ) from None
+    return pyarrow
@@ -1,32 +1,50 @@
 from __future__ import annotations
 
 import csv
-import hashlib
 import logging
-from dataclasses import dataclass
+import os
+from dataclasses import dataclass, replace
 from pathlib import Path
 from typing import Iterable, Iterator, TextIO
 
 import sys
 
+from .filters import FileFilter
+from .hash_cache import HashCache
+from .hashing import (
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_HASH_ALGO,
+    compute_sha256,  # noqa: F401 (re-exported)
+    hash_file,
+    iter_map,
+    make_executor,
+    new_hash,
+)
+from .metadata import METADATA_FIELDS, MediaMetadata, read_metadata
+from .progress import Progress
+from .tracing import span, traced
+from .walker import extension_of, walk_files
+
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class MediaFileInfo:
+    """One listed file.
+
+    ``sha256`` holds the hex digest of whichever algorithm the scan used
+    (``hash_algo``; SHA-256 by default). A CSV listing records the
+    algorithm as the name of its hash column.
+    """
+
     filename: str
     extension: str
     relative_path: str
     size_bytes: int
     sha256: str | None = None
-
-
-def compute_sha256(path: Path, chunk_size: int = 8192) -> str:
-    h = hashlib.sha256()
-    with open(path, "rb") as f:
-        while chunk := f.read(chunk_size):
-            h.update(chunk)
-    return h.hexdigest()
+    taken_at: str | None = None
+    width: int | None = None
+    height: int | None = None
 
 
 def scan_media(
@@ -35,36 +53,220 @@ def scan_media(
     recursive: bool = False,
     extensions: Iterable[str] | None = None,
     include_hash: bool = False,
+    hash_workers: int = 1,
+    hash_executor: str = "thread",
+    hash_chunk_size: int = DEFAULT_CHUNK_SIZE,
+    hash_cache: HashCache | None = None,
+    io_concurrency: int = 1,
+    file_filter: FileFilter | None = None,
+    include_metadata: bool = False,
+    progress: Progress | None = None,
+    hash_algo: str = DEFAULT_HASH_ALGO,
+    walk_workers: int = 1,
+    hash_mmap: bool = False,
 ) -> Iterator[MediaFileInfo]:
-    if extensions is not None:
-        exts: set[str] | None = {e.lower().lstrip(".") for e in extensions}
-    else:
-        exts = None
+    """Yield a :class:`MediaFileInfo` for every file under ``src``, sorted.
+
+    With ``include_hash`` and ``hash_workers > 1`` files are hashed on a
+    thread or process pool; records are still yielded in sorted order.
+    Files whose size, mtime and inode match ``hash_cache`` are not read.
+    ``io_concurrency > 1`` keeps that many directory listings and stats in
+    flight (see :func:`~photo_mover.async_walker.awalk_files`), and a
+    recursive scan with ``walk_workers > 1`` walks the tree on that many
+    processes (see :func:`~photo_mover.sharded_walker.walk_files_sharded`);
+    either way the records come out in the same order.
+
+    ``file_filter`` selects files by glob, size and mtime and prunes
+    directories; without one, only ``extensions`` (and the default pruned
+    directories) apply.
+
+    ``include_metadata`` fills ``taken_at``, ``width`` and ``height`` from
+    the file header (see :func:`~photo_mover.metadata.read_metadata`). It
+    runs in the same job as hashing, on the same pool, and is cached in
+    ``hash_cache`` per size and mtime.
+
+    ``progress`` counts files seen, filtered and hashed, and bytes hashed.
+
+    ``hash_algo`` selects the hash (see
+    :data:`~photo_mover.hashing.HASH_ALGORITHMS`); its hex digest is stored
+    in the ``sha256`` field whatever the algorithm. ``hash_mmap`` hashes
+    large files through mmap (see :func:`~photo_mover.hashing.hash_file`);
+    only use it when no file under ``src`` is being written to.
+    """
+    if hash_workers < 1:
+        raise ValueError(f"hash_workers must be >= 1: {hash_workers}")
+    if walk_workers < 1:
+        raise ValueError(f"walk_workers must be >= 1: {walk_workers}")
+    if include_hash:
+        new_hash(hash_algo)
+    if file_filter is None:
+        file_filter = FileFilter(extensions=extensions)
+    elif extensions is not None:
+        raise ValueError("Pass extensions through file_filter when giving one")
 
     src = Path(src)
     if not src.exists():
         raise FileNotFoundError(f"Source not found: {src}")
 
-    iterator = src.rglob("*") if recursive else src.iterdir()
+    if progress is not None:
+        progress.watch(file_filter)
+    found = _iter_files(
+        src, recursive, file_filter, io_concurrency, progress, walk_workers
+    )
 
-    for p in sorted(iterator):
-        if not p.is_file():
-            continue
-        if exts is not None and p.suffix.lstrip(".").lower() not in exts:
-            continue
-        rel = p.relative_to(src)
-        sha = compute_sha256(p) if include_hash else None
-        yield MediaFileInfo(
-            filename=p.name,
-            extension=p.suffix.lstrip(".").lower(),
-            relative_path=str(rel),
-            size_bytes=p.stat().st_size,
-            sha256=sha,
+    if not (include_hash or include_metadata):
+        for _, _, info in found:
+            yield info
+        return
+
+    jobs = _pending_work(
+        found,
+        hash_cache,
+        include_hash,
+        include_metadata,
+        hash_chunk_size,
+        hash_algo,
+        hash_mmap,
+    )
+    if hash_workers == 1:
+        for (p, st, info), args in jobs:
+            result = None if args is None else inspect_file(*args)
+            yield _complete(p, st, info, result, hash_cache, progress, hash_algo)
+    else:
+        with make_executor(hash_executor, hash_workers) as pool:
+            for (p, st, info), result in iter_map(
+                jobs, inspect_file, pool, window=hash_workers * 2
+            ):
+                yield _complete(p, st, info, result, hash_cache, progress, hash_algo)
+
+    if hash_cache is not None:
+        hash_cache.prune(src)
+
+
+def _iter_files(
+    src: Path,
+    recursive: bool,
+    file_filter: FileFilter,
+    io_concurrency: int = 1,
+    progress: Progress | None = None,
+    walk_workers: int = 1,
+) -> Iterator[tuple[Path, os.stat_result, MediaFileInfo]]:
+    prefix = len(os.path.join(src, ""))
+    for entry in walk_files(
+        src,
+        recursive=recursive,
+        file_filter=file_filter,
+        concurrency=io_concurrency,
+        workers=walk_workers,
+    ):
+        with span("stat", path=entry.path):
+            st = entry.stat()
+        if progress is not None:
+            progress.add("seen")
+        yield Path(entry.path), st, MediaFileInfo(
+            filename=entry.name,
+            extension=extension_of(entry.name),
+            relative_path=entry.path[prefix:],
+            size_bytes=st.st_size,
         )
 
 
+def inspect_file(
+    path: Path,
+    chunk_size: int,
+    want_hash: bool,
+    want_metadata: bool,
+    hash_algo: str = DEFAULT_HASH_ALGO,
+    use_mmap: bool = False,
+) -> tuple[str | None, MediaMetadata | None]:
+    """The per-file work of :func:`scan_media`, run inline or on a pool."""
+    sha = metadata = None
+    if want_hash:
+        with span("hash", path=path):
+            sha = hash_file(path, hash_algo, chunk_size, use_mmap)
+    if want_metadata:
+        with span("metadata", path=path):
+            metadata = read_metadata(path)
+    return sha, metadata
+
+
+def _pending_work(
+    found: Iterator[tuple[Path, os.stat_result, MediaFileInfo]],
+    cache: HashCache | None,
+    want_hash: bool,
+    want_metadata: bool,
+    chunk_size: int,
+    hash_algo: str = DEFAULT_HASH_ALGO,
+    use_mmap: bool = False,
+) -> Iterator[tuple[tuple[Path, os.stat_result, MediaFileInfo], tuple | None]]:
+    """Pair each file with the :func:`inspect_file` args still needed."""
+    for p, st, info in found:
+        need_hash, need_metadata = want_hash, want_metadata
+        if cache is not None:
+            if want_hash and (sha := cache.lookup(p, st, hash_algo)) is not None:
+                info = replace(info, sha256=sha)
+                need_hash = False
+            if want_metadata and (meta := cache.lookup_metadata(p, st)) is not None:
+                info = _with_metadata(info, meta)
+                need_metadata = False
+        args = None
+        if need_hash or need_metadata:
+            args = (p, chunk_size, need_hash, need_metadata, hash_algo, use_mmap)
+        yield (p, st, info), args
+
+
+def _complete(
+    p: Path,
+    st: os.stat_result,
+    info: MediaFileInfo,
+    result: tuple[str | None, MediaMetadata | None] | None,
+    cache: HashCache | None,
+    progress: Progress | None = None,
+    hash_algo: str = DEFAULT_HASH_ALGO,
+) -> MediaFileInfo:
+    if result is None:
+        return info
+    sha, metadata = result
+    if sha is not None:
+        info = replace(info, sha256=sha)
+        if cache is not None:
+            cache.store(p, st, sha, hash_algo)
+        if progress is not None:
+            progress.add("hashed", nbytes=st.st_size)
+    if metadata is not None:
+        info = _with_metadata(info, metadata)
+        if cache is not None:
+            cache.store_metadata(p, st, metadata)
+    return info
+
+
+def _with_metadata(info: MediaFileInfo, metadata: MediaMetadata) -> MediaFileInfo:
+    return replace(
+        info,
+        taken_at=metadata.taken_at,
+        width=metadata.width,
+        height=metadata.height,
+    )
+
+
 _CSV_COLUMNS_BASE = ["filename", "extension", "relative_path", "size_bytes"]
-_CSV_COLUMNS_HASH = _CSV_COLUMNS_BASE + ["sha256"]
+
+# Rows between flushes in streaming mode (the header and first row are
+# always flushed immediately so consumers see output right away).
+STREAM_FLUSH_ROWS = 256
+
+
+def csv_columns(
+    *,
+    include_hash: bool = False,
+    include_metadata: bool = False,
+    hash_algo: str = DEFAULT_HASH_ALGO,
+):
+    """CSV header; the hash column is named after ``hash_algo``."""
+    columns = _CSV_COLUMNS_BASE + [hash_algo] if include_hash else _CSV_COLUMNS_BASE
+    if include_metadata:
+        columns = columns + list(METADATA_FIELDS)
+    return columns
 
 
 def write_csv(
@@ -72,12 +274,28 @@ def write_csv(
     output: TextIO | None = None,
     *,
     include_hash: bool = False,
+    flush_every: int | None = None,
+    include_metadata: bool = False,
+    hash_algo: str = DEFAULT_HASH_ALGO,
 ) -> None:
+    """Write ``records`` as CSV.
+
+    With ``flush_every`` the output is flushed after the first row and then
+    every ``flush_every`` rows, so piped output appears while the scan runs.
+    ``include_metadata`` appends the ``taken_at``, ``width`` and ``height``
+    columns (empty when unknown). The hash column is named ``hash_algo``.
+    """
     if output is None:
         output = sys.stdout
-    columns = _CSV_COLUMNS_HASH if include_hash else _CSV_COLUMNS_BASE
+    columns = csv_columns(
+        include_hash=include_hash,
+        include_metadata=include_metadata,
+        hash_algo=hash_algo,
+    )
     writer = csv.writer(output, lineterminator="\n")
     writer.writerow(columns)
+    write_row = traced("csv.write", writer.writerow)
+    rows = 0
     for record in records:
         row = [
             record.filename,
@@ -87,4 +305,54 @@ def write_csv(
         ]
         if include_hash:
             row.append(record.sha256 or "")
-        writer.writerow(row)
+        if include_metadata:
+            row.append(record.taken_at or "")
+            row.append("" if record.width is None else str(record.width))
+            row.append("" if record.height is None else str(record.height))
+        write_row(row)
+        if flush_every is not None:
+            rows += 1
+            if rows == 1 or rows % flush_every == 0:
+                output.flush()
+    if flush_every is not None:
+        output.flush()
+
+
+def read_csv(input: TextIO, *, hash_algo: str | None = None) -> Iterator[MediaFileInfo]:
+    """Parse a listing written by :func:`write_csv` back into records.
+
+    The digest is read into ``sha256`` whatever its algorithm; the hash
+    column may name any algorithm, including one added with
+    :func:`~photo_mover.hashing.register_hash` that is not registered in
+    the reading process. With ``hash_algo`` a hash column naming another
+    algorithm is a ValueError.
+    """
+    reader = csv.reader(input)
+    header = next(reader, [])
+    hash_column = header[4] if len(header) in (5, 8) else None
+    expected = csv_columns(
+        include_hash=hash_column is not None,
+        include_metadata=len(header) > 6,
+        hash_algo=hash_column or DEFAULT_HASH_ALGO,
+    )
+    if header != expected or not (
+        hash_column is None
+        or (hash_column.isidentifier() and hash_column not in METADATA_FIELDS)
+    ):
+        raise ValueError(f"Not a photo_mover CSV listing: {header}")
+    if hash_algo is not None and hash_column not in (None, hash_algo):
+        raise ValueError(
+            f"Listing digests are {hash_column}, expected {hash_algo}: {header}"
+        )
+    for row in reader:
+        values = dict(zip(header, row))
+        yield MediaFileInfo(
+            filename=values["filename"],
+            extension=values["extension"],
+            relative_path=values["relative_path"],
+            size_bytes=int(values["size_bytes"]),
+            sha256=values.get(hash_column) or None,
+            taken_at=values.get("taken_at") or None,
+            width=int(values["width"]) if values.get("width") else None,
+            height=int(values["height"]) if values.get("height") else None,
+        )
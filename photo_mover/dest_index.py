@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import logging
+import os
+from collections import defaultdict
+from pathlib import Path
+
+from .hash_cache import HashCache
+from .hashing import compute_sha256
+from .walker import walk_files
+
+logger = logging.getLogger(__name__)
+
+ON_DUPLICATE_POLICIES = ("move", "skip", "hardlink", "delete")
+
+
+class DestinationIndex:
+    """Size-bucketed content index of the files already in a destination.
+
+    The tree is walked once (one stat per file); digests are only computed
+    for destination files whose size matches a candidate, and are read from
+    / written to ``hash_cache`` when one is given so later runs skip them.
+    """
+
+    def __init__(self, root: Path, *, hash_cache: HashCache | None = None):
+        self.root = Path(root)
+        self._cache = hash_cache
+        self._by_size: dict[int, list[Path]] = defaultdict(list)
+        self._digests: dict[Path, str] = {}
+        # Planned targets not created yet -> the source to read instead.
+        self._sources: dict[Path, Path] = {}
+        if self.root.exists():
+            for entry in walk_files(self.root, recursive=True):
+                self._by_size[entry.stat().st_size].append(Path(entry.path))
+
+    def __len__(self) -> int:
+        return sum(len(paths) for paths in self._by_size.values())
+
+    def digest(self, path: Path, st: os.stat_result | None = None) -> str:
+        digest = self._digests.get(path)
+        if digest is not None:
+            return digest
+        source = self._sources.get(path)
+        if source is not None:
+            try:
+                digest = self._compute(source, None)
+            except FileNotFoundError:
+                # Moved to its target in the meantime.
+                digest = self._compute(path, st)
+        else:
+            digest = self._compute(path, st)
+        self._digests[path] = digest
+        return digest
+
+    def _compute(self, path: Path, st: os.stat_result | None) -> str:
+        if st is None:
+            st = path.stat()
+        digest = None
+        if self._cache is not None:
+            digest = self._cache.lookup(path, st)
+        if digest is None:
+            digest = compute_sha256(path)
+            if self._cache is not None:
+                self._cache.store(path, st, digest)
+        return digest
+
+    def find(self, path: Path, st: os.stat_result) -> Path | None:
+        """Return an indexed file with the same content as ``path``, if any.
+
+        Files whose size matches nothing in the index are never read.
+        """
+        same_size = self._by_size.get(st.st_size)
+        if not same_size:
+            return None
+        digest = self.digest(path, st)
+        for candidate in same_size:
+            try:
+                if self.digest(candidate) == digest:
+                    return candidate
+            except OSError as e:
+                logger.warning("Cannot hash %s: %s", candidate, e)
+        return None
+
+    def add(
+        self,
+        path: Path,
+        size: int,
+        digest: str | None = None,
+        *,
+        source: Path | None = None,
+    ) -> None:
+        """Index ``path``; with ``source`` it is a planned target that does
+        not exist yet and is read from ``source`` until :meth:`placed`."""
+        self._by_size[size].append(path)
+        if digest is not None:
+            self._digests[path] = digest
+        if source is not None:
+            self._sources[path] = source
+
+    def placed(self, path: Path) -> None:
+        """The planned target ``path`` now exists."""
+        self._sources.pop(path, None)
+
+    def discard(self, path: Path, size: int) -> None:
+        """Drop a planned target that will not be created after all."""
+        paths = self._by_size.get(size)
+        if paths and path in paths:
+            paths.remove(path)
+        self._sources.pop(path, None)
+        self._digests.pop(path, None)
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import csv
+import json
+import logging
+import sys
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, TextIO
+
+from .csv_exporter import MediaFileInfo
+from .hashing import DEFAULT_HASH_ALGO, hash_file, new_hash
+
+logger = logging.getLogger(__name__)
+
+# Bytes hashed from each end of a file in the partial-hash stage.
+PARTIAL_BLOCK = 64 * 1024
+
+
+@dataclass
+class DuplicateStats:
+    files: int = 0
+    unique_size: int = 0
+    unique_partial: int = 0
+    unique_full: int = 0
+    duplicates: int = 0
+    bytes_read: int = 0
+    unreadable: int = 0
+
+
+@dataclass
+class DuplicateGroup:
+    """Files with identical content; ``sha256`` holds the full digest of
+    the algorithm :func:`find_duplicates` ran with."""
+
+    size_bytes: int
+    sha256: str
+    files: list[MediaFileInfo] = field(default_factory=list)
+
+
+def partial_hash(
+    path: Path, size: int, block: int = PARTIAL_BLOCK, algo: str = DEFAULT_HASH_ALGO
+) -> str:
+    """Hash (SHA-256 by default) of the first and last ``block`` bytes of a file."""
+    h = new_hash(algo)
+    with open(path, "rb") as f:
+        h.update(f.read(block))
+        if size > block:
+            f.seek(max(block, size - block))
+            h.update(f.read(block))
+    return h.hexdigest()
+
+
+def find_duplicates(
+    records: Iterable[MediaFileInfo],
+    root: Path,
+    *,
+    stats: DuplicateStats | None = None,
+    block: int = PARTIAL_BLOCK,
+    hash_algo: str = DEFAULT_HASH_ALGO,
+    use_mmap: bool = False,
+) -> list[DuplicateGroup]:
+    """Group files with identical content.
+
+    Candidates are narrowed by size, then by a hash of both ends of the
+    file, and only files that still collide are hashed in full. Files no
+    larger than ``2 * block`` are read completely by the partial stage, so
+    that hash is already final for them. Groups and their members keep
+    scan order. Both hash stages use ``hash_algo``; ``use_mmap`` maps large
+    files for the full hash (see :func:`~photo_mover.hashing.hash_file`).
+    Files that vanish or cannot be read before they are hashed are logged,
+    counted in ``stats.unreadable`` and left out.
+    """
+    new_hash(hash_algo)
+    if stats is None:
+        stats = DuplicateStats()
+    root = Path(root)
+
+    all_records = list(records)
+    by_size: dict[int, list[MediaFileInfo]] = defaultdict(list)
+    for info in all_records:
+        stats.files += 1
+        by_size[info.size_bytes].append(info)
+
+    groups: list[DuplicateGroup] = []
+    for size, same_size in by_size.items():
+        if len(same_size) < 2:
+            stats.unique_size += len(same_size)
+            continue
+        exact = size <= 2 * block
+        by_partial: dict[str, list[MediaFileInfo]] = defaultdict(list)
+        for info in same_size:
+            path = root / info.relative_path
+            try:
+                digest = partial_hash(path, size, block, hash_algo)
+            except OSError as e:
+                _unreadable(stats, path, e)
+                continue
+            by_partial[digest].append(info)
+            stats.bytes_read += min(size, 2 * block)
+        for digest, same_partial in by_partial.items():
+            if len(same_partial) < 2:
+                stats.unique_partial += len(same_partial)
+                continue
+            if exact:
+                groups.append(DuplicateGroup(size, digest, same_partial))
+                continue
+            by_full: dict[str, list[MediaFileInfo]] = defaultdict(list)
+            for info in same_partial:
+                path = root / info.relative_path
+                try:
+                    digest = hash_file(path, hash_algo, use_mmap=use_mmap)
+                except OSError as e:
+                    _unreadable(stats, path, e)
+                    continue
+                by_full[digest].append(info)
+                stats.bytes_read += size
+            for full, same_full in by_full.items():
+                if len(same_full) < 2:
+                    stats.unique_full += len(same_full)
+                    continue
+                groups.append(DuplicateGroup(size, full, same_full))
+
+    position = {id(info): i for i, info in enumerate(all_records)}
+    groups.sort(key=lambda g: position[id(g.files[0])])
+    for group in groups:
+        stats.duplicates += len(group.files) - 1
+    return groups
+
+
+def _unreadable(stats: DuplicateStats, path: Path, error: OSError) -> None:
+    logger.warning("Cannot hash %s: %s", path, error)
+    stats.unreadable += 1
+
+
+def write_duplicates_csv(
+    groups: Iterable[DuplicateGroup],
+    output: TextIO | None = None,
+    *,
+    hash_algo: str = DEFAULT_HASH_ALGO,
+) -> None:
+    if output is None:
+        output = sys.stdout
+    writer = csv.writer(output, lineterminator="\n")
+    writer.writerow(["group", hash_algo, "size_bytes", "relative_path"])
+    for n, group in enumerate(groups, 1):
+        for info in group.files:
+            writer.writerow(
+                [n, group.sha256, str(group.size_bytes), info.relative_path]
+            )
+
+
+def write_duplicates_json(
+    groups: Iterable[DuplicateGroup],
+    output: TextIO | None = None,
+    *,
+    hash_algo: str = DEFAULT_HASH_ALGO,
+) -> None:
+    if output is None:
+        output = sys.stdout
+    data = [
+        {
+            hash_algo: group.sha256,
+            "size_bytes": group.size_bytes,
+            "files": [info.relative_path for info in group.files],
+        }
+        for group in groups
+    ]
+    json.dump(data, output, ensure_ascii=False, indent=2)
+    output.write("\n")
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import fnmatch
+import os
+import re
+import time
+from datetime import datetime
+from typing import Iterable
+
+from .walker import extension_of
+
+# Directory names never descended into unless pruning is disabled:
+# thumbnail caches (freedesktop, Synology) and VCS metadata.
+DEFAULT_PRUNE_DIRS = (".thumbnails", "@eaDir", ".git")
+
+_SIZE_UNITS = {"": 1, "K": 1024, "M": 1024**2, "G": 1024**3, "T": 1024**4}
+_AGE_UNITS = {"m": 60, "h": 3600, "d": 86400, "w": 7 * 86400}
+
+
+class FileFilter:
+    """All file selection rules compiled into one cheap predicate.
+
+    Glob patterns are folded into a single case-insensitive regex (one for
+    patterns matched against the file name, one for patterns containing
+    ``/`` matched against the path relative to the walk root). Checks run
+    cheapest first: extension set lookup, name regexes, path regexes, and
+    only then the size/mtime checks, which need a ``stat``; walkers skip the
+    stat entirely when :attr:`needs_stat` is false. Directories matching
+    ``prune_dirs`` or an exclude pattern are never descended into.
+    :attr:`rejected` counts the files turned down so far.
+    """
+
+    def __init__(
+        self,
+        *,
+        extensions: Iterable[str] | None = None,
+        include: Iterable[str] = (),
+        exclude: Iterable[str] = (),
+        min_size: int | None = None,
+        max_size: int | None = None,
+        newer_than: float | None = None,
+        prune_dirs: Iterable[str] = DEFAULT_PRUNE_DIRS,
+    ):
+        self.extensions = (
+            None if extensions is None else {e.lower().lstrip(".") for e in extensions}
+        )
+        self._include_name, self._include_path = _compile_globs(include)
+        self._exclude_name, self._exclude_path = _compile_globs(exclude)
+        self._has_include = bool(self._include_name or self._include_path)
+        self.min_size = min_size
+        self.max_size = max_size
+        self.newer_than_ns = None if newer_than is None else int(newer_than * 1e9)
+        self.prune_dirs = frozenset(prune_dirs)
+        self.needs_stat = (
+            min_size is not None or max_size is not None or newer_than is not None
+        )
+        self.rejected = 0
+
+    def match_name(self, name: str, rel: str) -> bool:
+        """Checks that need only the file name and relative path."""
+        if self._match_name(name, rel):
+            return True
+        self.rejected += 1
+        return False
+
+    def match_stat(self, st: os.stat_result) -> bool:
+        """Checks that need the file's ``stat``."""
+        if self._match_stat(st):
+            return True
+        self.rejected += 1
+        return False
+
+    def _match_name(self, name: str, rel: str) -> bool:
+        if self.extensions is not None and extension_of(name) not in self.extensions:
+            return False
+        if self._exclude_name and self._exclude_name(name):
+            return False
+        if self._exclude_path and self._exclude_path(_slashes(rel)):
+            return False
+        if self._has_include:
+            return bool(
+                (self._include_name and self._include_name(name))
+                or (self._include_path and self._include_path(_slashes(rel)))
+            )
+        return True
+
+    def _match_stat(self, st: os.stat_result) -> bool:
+        if self.min_size is not None and st.st_size < self.min_size:
+            return False
+        if self.max_size is not None and st.st_size > self.max_size:
+            return False
+        if self.newer_than_ns is not None and st.st_mtime_ns <= self.newer_than_ns:
+            return False
+        return True
+
+    def prune(self, name: str, rel: str) -> bool:
+        """Whether the directory ``name`` at ``rel`` should not be walked."""
+        if name in self.prune_dirs:
+            return True
+        if self._exclude_name and self._exclude_name(name):
+            return True
+        return bool(self._exclude_path and self._exclude_path(_slashes(rel)))
+
+
+def _compile_globs(patterns: Iterable[str]):
+    by_name, by_path = [], []
+    for pattern in patterns:
+        if not pattern:
+            raise ValueError("Empty glob pattern")
+        regex = fnmatch.translate(pattern.strip("/"))
+        (by_path if "/" in pattern.strip("/") else by_name).append(regex)
+    return tuple(
+        (
+            re.compile("|".join(f"(?:{r})" for r in regexes), re.IGNORECASE).match
+            if regexes
+            else None
+        )
+        for regexes in (by_name, by_path)
+    )
+
+
+def _slashes(rel: str) -> str:
+    return rel if os.sep == "/" else rel.replace(os.sep, "/")
+
+
+def parse_size(text: str) -> int:
+    """Parse a byte count such as ``"500"``, ``"10K"`` or ``"1.5G"`` (1024-based)."""
+    m = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMGT]?)(?:i?B)?\s*", text, re.IGNORECASE)
+    if not m:
+        raise ValueError(f"Invalid size: {text!r}")
+    return int(float(m.group(1)) * _SIZE_UNITS[m.group(2).upper()])
+
+
+def parse_newer_than(text: str, *, now: float | None = None) -> float:
+    """Parse an age (``"7d"``, ``"12h"``) or an ISO date/time into epoch seconds."""
+    m = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([mhdw])\s*", text)
+    if m:
+        if now is None:
+            now = time.time()
+        return now - float(m.group(1)) * _AGE_UNITS[m.group(2)]
+    try:
+        return datetime.fromisoformat(text.strip()).timestamp()
+    except ValueError:
+        raise ValueError(
+            f"Invalid time: {text!r} (use e.g. 7d, 12h or 2024-01-31)"
+        ) from None
@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+from pathlib import Path
+
+from .metadata import MediaMetadata
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS hashes (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    sha256 TEXT NOT NULL
+)
+"""
+
+# Digests of other algorithms than SHA-256 (see --hash-algo).
+_DIGESTS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS digests (
+    path TEXT NOT NULL,
+    algo TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    digest TEXT NOT NULL,
+    PRIMARY KEY (path, algo)
+)
+"""
+
+_METADATA_SCHEMA = """
+CREATE TABLE IF NOT EXISTS metadata (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    taken_at TEXT,
+    width INTEGER,
+    height INTEGER
+)
+"""
+
+# Commit in batches so that a cold cache does not fsync once per file.
+_COMMIT_EVERY = 1000
+
+
+class HashCache:
+    """On-disk SHA-256 cache keyed on ``(path, size, mtime_ns, inode)``.
+
+    A lookup only hits when all three stat fields still match, so a changed
+    file is simply re-hashed and its row overwritten. Digests of other
+    algorithms are kept per ``algo`` next to the SHA-256 ones. Extracted
+    :class:`~photo_mover.metadata.MediaMetadata` is cached alongside, keyed
+    on ``(path, size, mtime_ns)``.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._conn = sqlite3.connect(str(self.path))
+        self._conn.execute(_SCHEMA)
+        self._conn.execute(_DIGESTS_SCHEMA)
+        self._conn.execute(_METADATA_SCHEMA)
+        self._pending = 0
+        self._seen: set[str] = set()
+        self.hits = 0
+        self.misses = 0
+        self.stored = 0
+        self.pruned = 0
+
+    def __enter__(self) -> HashCache:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    @staticmethod
+    def _key(path: Path) -> str:
+        return os.path.abspath(path)
+
+    def lookup(
+        self, path: Path, st: os.stat_result, algo: str = "sha256"
+    ) -> str | None:
+        key = self._key(path)
+        self._seen.add(key)
+        if algo == "sha256":
+            row = self._conn.execute(
+                "SELECT size, mtime_ns, inode, sha256 FROM hashes WHERE path = ?",
+                (key,),
+            ).fetchone()
+        else:
+            row = self._conn.execute(
+                "SELECT size, mtime_ns, inode, digest FROM digests "
+                "WHERE path = ? AND algo = ?",
+                (key, algo),
+            ).fetchone()
+        if row is not None and row[:3] == (st.st_size, st.st_mtime_ns, st.st_ino):
+            self.hits += 1
+            return row[3]
+        self.misses += 1
+        return None
+
+    def store(
+        self, path: Path, st: os.stat_result, sha256: str, algo: str = "sha256"
+    ) -> None:
+        """Cache ``sha256``, or the digest of ``algo`` when given."""
+        key = self._key(path)
+        self._seen.add(key)
+        if algo == "sha256":
+            self._conn.execute(
+                "INSERT OR REPLACE INTO hashes VALUES (?, ?, ?, ?, ?)",
+                (key, st.st_size, st.st_mtime_ns, st.st_ino, sha256),
+            )
+        else:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO digests VALUES (?, ?, ?, ?, ?, ?)",
+                (key, algo, st.st_size, st.st_mtime_ns, st.st_ino, sha256),
+            )
+        self.stored += 1
+        self._pending += 1
+        if self._pending >= _COMMIT_EVERY:
+            self.commit()
+
+    def lookup_metadata(self, path: Path, st: os.stat_result) -> MediaMetadata | None:
+        key = self._key(path)
+        self._seen.add(key)
+        row = self._conn.execute(
+            "SELECT size, mtime_ns, taken_at, width, height FROM metadata "
+            "WHERE path = ?",
+            (key,),
+        ).fetchone()
+        if row is not None and row[:2] == (st.st_size, st.st_mtime_ns):
+            self.hits += 1
+            return MediaMetadata(*row[2:])
+        self.misses += 1
+        return None
+
+    def store_metadata(
+        self, path: Path, st: os.stat_result, metadata: MediaMetadata
+    ) -> None:
+        key = self._key(path)
+        self._seen.add(key)
+        self._conn.execute(
+            "INSERT OR REPLACE INTO metadata VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                key,
+                st.st_size,
+                st.st_mtime_ns,
+                metadata.taken_at,
+                metadata.width,
+                metadata.height,
+            ),
+        )
+        self.stored += 1
+        self._pending += 1
+        if self._pending >= _COMMIT_EVERY:
+            self.commit()
+
+    def invalidate(self, path: Path) -> None:
+        key = self._key(path)
+        self._conn.execute("DELETE FROM hashes WHERE path = ?", (key,))
+        self._conn.execute("DELETE FROM digests WHERE path = ?", (key,))
+        self._conn.execute("DELETE FROM metadata WHERE path = ?", (key,))
+        self._pending += 1
+
+    def prune(self, root: Path) -> int:
+        """Drop entries under ``root`` whose file no longer exists.
+
+        Paths looked up or stored since the cache was opened are known to
+        exist and are not stat'ed again.
+        """
+        prefix = os.path.join(self._key(root), "")
+        rows = self._conn.execute(
+            "SELECT path FROM hashes WHERE substr(path, 1, ?) = ? "
+            "UNION SELECT path FROM digests WHERE substr(path, 1, ?) = ? "
+            "UNION SELECT path FROM metadata WHERE substr(path, 1, ?) = ?",
+            (len(prefix), prefix) * 3,
+        ).fetchall()
+        gone = [
+            (key,)
+            for (key,) in rows
+            if key not in self._seen and not os.path.lexists(key)
+        ]
+        self._conn.executemany("DELETE FROM hashes WHERE path = ?", gone)
+        self._conn.executemany("DELETE FROM digests WHERE path = ?", gone)
+        self._conn.executemany("DELETE FROM metadata WHERE path = ?", gone)
+        self.pruned += len(gone)
+        self.commit()
+        return len(gone)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stored": self.stored,
+            "pruned": self.pruned,
+        }
+
+    def commit(self) -> None:
+        self._conn.commit()
+        self._pending = 0
+
+    def close(self) -> None:
+        self.commit()
+        self._conn.close()
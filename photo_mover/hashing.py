@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import hashlib
+import mmap
+import os
+import threading
+from collections import deque
+from concurrent.futures import (
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# 1 MiB keeps the number of read() syscalls low on large media files while
+# staying small enough that several workers can have a buffer in flight.
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+# Files at least this large are hashed through mmap when the caller opts in.
+MMAP_THRESHOLD = 8 * 1024 * 1024
+
+EXECUTOR_KINDS = ("thread", "process")
+
+DEFAULT_HASH_ALGO = "sha256"
+
+
+def _blake3() -> Any:
+    from blake3 import blake3
+
+    return blake3()
+
+
+def _xxh3_128() -> Any:
+    import xxhash
+
+    return xxhash.xxh3_128()
+
+
+# Hash algorithm name -> factory of a hashlib-style object (``update`` and
+# ``hexdigest``). ``blake3`` and ``xxh3_128`` need the optional packages of
+# the same name; ``xxh3_128`` is not cryptographic, which is fine for
+# finding duplicates and changes but not against deliberate collisions.
+# Extra algorithms must be registered at import time to be usable from a
+# process pool.
+HASH_ALGORITHMS: dict[str, Callable[[], Any]] = {
+    "sha256": hashlib.sha256,
+    "blake2b": hashlib.blake2b,
+    "blake3": _blake3,
+    "xxh3_128": _xxh3_128,
+}
+
+
+def register_hash(name: str, factory: Callable[[], Any]) -> None:
+    """Make ``factory`` available as hash algorithm ``name``."""
+    if not name.isidentifier():
+        raise ValueError(f"Hash algorithm name must be an identifier: {name!r}")
+    HASH_ALGORITHMS[name] = factory
+
+
+def new_hash(algo: str = DEFAULT_HASH_ALGO) -> Any:
+    """A fresh hash object for ``algo``.
+
+    Raises ValueError for unknown algorithms and for those whose optional
+    package is not installed.
+    """
+    try:
+        factory = HASH_ALGORITHMS[algo]
+    except KeyError:
+        raise ValueError(
+            f"Unknown hash algorithm: {algo!r} (choose from {sorted(HASH_ALGORITHMS)})"
+        ) from None
+    try:
+        return factory()
+    except ImportError as e:
+        raise ValueError(
+            f"Hash algorithm {algo!r} needs the {e.name or algo} package"
+        ) from None
+
+
+def available_hash_algos() -> list[str]:
+    """Registered algorithms that can be used here, in registration order."""
+    available = []
+    for algo in HASH_ALGORITHMS:
+        try:
+            new_hash(algo)
+        except ValueError:
+            continue
+        available.append(algo)
+    return available
+
+
+_buffers = threading.local()
+
+
+def _read_buffer(size: int) -> bytearray:
+    # One buffer per thread, reused for every file that thread hashes.
+    buf = getattr(_buffers, "buf", None)
+    if buf is None or len(buf) != size:
+        buf = _buffers.buf = bytearray(size)
+    return buf
+
+
+def hash_file(
+    path: Path,
+    algo: str = DEFAULT_HASH_ALGO,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    use_mmap: bool = False,
+) -> str:
+    """Hex digest of the contents of ``path`` with hash algorithm ``algo``.
+
+    The file is read with ``readinto`` into a buffer reused by the calling
+    thread, so no bytes object is allocated per chunk. With ``use_mmap``,
+    files of at least :data:`MMAP_THRESHOLD` bytes are mapped instead and
+    fed to the hash in ``chunk_size`` slices straight from the page cache.
+    That is only for scans of files nobody is writing to: a mapped file
+    truncated while it is hashed kills the process with SIGBUS, where the
+    read path raises a catchable error.
+    """
+    h = new_hash(algo)
+    with open(path, "rb", buffering=0) as f:
+        size = os.fstat(f.fileno()).st_size
+        if use_mmap and size >= MMAP_THRESHOLD:
+            mapped = _map(f.fileno())
+            if mapped is not None:
+                with mapped:
+                    if hasattr(mmap, "MADV_SEQUENTIAL"):
+                        mapped.madvise(mmap.MADV_SEQUENTIAL)
+                    with memoryview(mapped) as view:
+                        for start in range(0, len(view), chunk_size):
+                            h.update(view[start : start + chunk_size])
+                return h.hexdigest()
+        buf = _read_buffer(chunk_size)
+        with memoryview(buf) as view:
+            while n := f.readinto(buf):
+                h.update(view[:n])
+    return h.hexdigest()
+
+
+def _map(fd: int) -> mmap.mmap | None:
+    try:
+        return mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+    except OSError:
+        # Not mappable (e.g. some FUSE or special files): read it.
+        return None
+    except ValueError:
+        # Emptied since it was stat'ed.
+        return None
+
+
+def compute_sha256(path: Path, chunk_size: int = DEFAULT_CHUNK_SIZE) -> str:
+    return hash_file(path, "sha256", chunk_size)
+
+
+def make_executor(kind: str, workers: int) -> Executor:
+    if workers < 1:
+        raise ValueError(f"workers must be >= 1: {workers}")
+    if kind == "thread":
+        return ThreadPoolExecutor(max_workers=workers)
+    if kind == "process":
+        return ProcessPoolExecutor(max_workers=workers)
+    raise ValueError(f"Unknown executor kind: {kind!r} (choose from {EXECUTOR_KINDS})")
+
+
+def iter_map(
+    items: Iterable[tuple[T, tuple | None]],
+    fn: Callable[..., R],
+    executor: Executor,
+    *,
+    window: int,
+) -> Iterator[tuple[T, R | None]]:
+    """Run ``fn(*args)`` on ``executor`` for ``(tag, args)`` pairs and
+    yield ``(tag, result)``.
+
+    Results come back in input order; at most ``window`` calls are in
+    flight. Pairs whose args are ``None`` keep their position and yield
+    ``None``.
+    """
+    pending: deque = deque()
+    for tag, args in items:
+        fut = None if args is None else executor.submit(fn, *args)
+        pending.append((tag, fut))
+        if len(pending) >= window:
+            yield _resolve(*pending.popleft())
+    while pending:
+        yield _resolve(*pending.popleft())
+
+
+def _resolve(tag: T, fut: Future | None) -> tuple[T, object]:
+    return tag, (None if fut is None else fut.result())
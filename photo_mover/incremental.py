@@ -0,0 +1,342 @@
+from __future__ import annotations
+
+import csv
+import json
+import logging
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Iterator, TextIO
+
+from .csv_exporter import MediaFileInfo, read_csv
+from .filters import DEFAULT_PRUNE_DIRS, FileFilter
+from .hashing import compute_sha256
+from .walker import extension_of
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+CHANGE_KINDS = ("added", "removed", "modified")
+
+# A directory modified this close to the time its snapshot was taken may
+# have changed again within the filesystem's timestamp granularity (2 s on
+# FAT/exFAT cards), so it is listed again instead of trusted.
+RACY_WINDOW_NS = 2_000_000_000
+
+
+@dataclass(frozen=True, slots=True)
+class FileState:
+    size: int
+    mtime_ns: int | None = None
+    sha256: str | None = None
+
+
+@dataclass
+class DirState:
+    mtime_ns: int | None = None
+    files: dict[str, FileState] = field(default_factory=dict)
+    subdirs: list[str] = field(default_factory=list)
+
+
+@dataclass(frozen=True, slots=True)
+class MediaChange:
+    kind: str
+    info: MediaFileInfo
+
+
+class Snapshot:
+    """Per-directory state of a scanned tree, keyed by relative directory.
+
+    Directory mtimes let :func:`scan_changes` reuse the listing of any
+    directory that has not gained, lost or renamed an entry. A snapshot
+    built from a plain listing (:meth:`from_records`) has no mtimes, so
+    every directory is listed and files are compared by size (and digest).
+    """
+
+    def __init__(self, taken_ns: int | None = None):
+        self.taken_ns = taken_ns
+        self.dirs: dict[str, DirState] = {}
+
+    def __len__(self) -> int:
+        return sum(len(d.files) for d in self.dirs.values())
+
+    @classmethod
+    def from_records(cls, records: Iterable[MediaFileInfo]) -> Snapshot:
+        snapshot = cls()
+        snapshot.dirs[""] = DirState()
+        for info in records:
+            parent, _, name = info.relative_path.rpartition(os.sep)
+            snapshot._dir(parent).files[name] = FileState(
+                info.size_bytes, sha256=info.sha256
+            )
+        for state in snapshot.dirs.values():
+            state.subdirs.sort()
+        return snapshot
+
+    def _dir(self, rel: str) -> DirState:
+        state = self.dirs.get(rel)
+        if state is None:
+            state = self.dirs[rel] = DirState()
+            parent, _, name = rel.rpartition(os.sep)
+            self._dir(parent).subdirs.append(name)
+        return state
+
+    def save(self, path: Path) -> None:
+        tmp = Path(f"{path}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            header = {"snapshot": SNAPSHOT_VERSION, "taken_ns": self.taken_ns}
+            f.write(json.dumps(header) + "\n")
+            for rel, state in self.dirs.items():
+                files = [
+                    [name, s.size, s.mtime_ns, s.sha256]
+                    for name, s in state.files.items()
+                ]
+                row = [rel, state.mtime_ns, files, state.subdirs]
+                f.write(json.dumps(row, ensure_ascii=False) + "\n")
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path) -> Snapshot:
+        """Load a snapshot file, or a CSV / binary listing as a baseline."""
+        with open(path, "rb") as f:
+            head = f.read(1)
+        if head != b"{":
+            return cls._load_listing(path)
+        with open(path, encoding="utf-8") as f:
+            header = json.loads(f.readline())
+            if header.get("snapshot") != SNAPSHOT_VERSION:
+                raise ValueError(f"Unsupported snapshot version: {header}")
+            snapshot = cls(header["taken_ns"])
+            for line in f:
+                if not line.strip():
+                    continue
+                rel, mtime_ns, files, subdirs = json.loads(line)
+                snapshot.dirs[rel] = DirState(
+                    mtime_ns,
+                    {name: FileState(*rest) for name, *rest in files},
+                    subdirs,
+                )
+        return snapshot
+
+    @classmethod
+    def _load_listing(cls, path: Path) -> Snapshot:
+        with open(path, "rb") as f:
+            is_csv = f.read(9) == b"filename,"
+        if is_csv:
+            with open(path, newline="", encoding="utf-8") as f:
+                return cls.from_records(read_csv(f, hash_algo="sha256"))
+        from .binary_exporter import read_records
+
+        return cls.from_records(read_records(path))
+
+
+def is_snapshot_file(path: Path) -> bool:
+    with open(path, "rb") as f:
+        return f.read(1) == b"{"
+
+
+def scan_changes(
+    src: Path,
+    previous: Snapshot | None = None,
+    *,
+    recursive: bool = False,
+    extensions: Iterable[str] | None = None,
+    include_hash: bool = False,
+    current: Snapshot | None = None,
+    prune_dirs: Iterable[str] = DEFAULT_PRUNE_DIRS,
+) -> Iterator[MediaChange]:
+    """Yield the files under ``src`` added, removed or modified since ``previous``.
+
+    Only directories are stat'ed up front: a directory whose mtime matches
+    the snapshot is not listed again and its files are not stat'ed, so an
+    unchanged tree costs one ``stat`` per directory. Editing a file in
+    place does not change its directory's mtime and is only noticed once
+    the directory is listed again. Changes come out in the same order as
+    :func:`~photo_mover.csv_exporter.scan_media` records. ``current``, if
+    given, is filled with the new state of the tree for the next run.
+    Directories named in ``prune_dirs`` are skipped as in ``scan_media``;
+    files a previous snapshot still has under them are reported removed.
+    """
+    exts = {e.lower().lstrip(".") for e in extensions} if extensions else None
+    src = Path(src)
+    if not src.exists():
+        raise FileNotFoundError(f"Source not found: {src}")
+    if previous is None:
+        previous = Snapshot()
+    if current is None:
+        current = Snapshot()
+    current.taken_ns = time.time_ns()
+    scan = _ChangeScan(
+        src,
+        previous,
+        current,
+        recursive,
+        exts,
+        include_hash,
+        FileFilter(prune_dirs=prune_dirs),
+    )
+    stack = [scan.diff_dir("")]
+    while stack:
+        item = next(stack[-1], None)
+        if item is None:
+            stack.pop()
+        elif isinstance(item, str):
+            stack.append(scan.diff_dir(item))
+        else:
+            yield item
+
+
+class _ChangeScan:
+    def __init__(
+        self, src, previous, current, recursive, exts, include_hash, file_filter
+    ):
+        self.src = src
+        self.previous = previous
+        self.current = current
+        self.recursive = recursive
+        self.exts = exts
+        self.include_hash = include_hash
+        self.file_filter = file_filter
+
+    def diff_dir(self, rel: str) -> Iterator[MediaChange | str]:
+        """Yield changes in directory ``rel`` and the subdirectories to visit."""
+        path = os.path.join(self.src, rel)
+        old = self.previous.dirs.get(rel)
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+            if self._unchanged(old, mtime_ns) and not any(
+                self.file_filter.prune(name, _join(rel, name)) for name in old.subdirs
+            ):
+                self.current.dirs[rel] = DirState(mtime_ns, old.files, old.subdirs)
+                if self.recursive:
+                    for name in old.subdirs:
+                        yield _join(rel, name)
+                return
+            with os.scandir(path) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError as e:
+            if rel and not os.path.lexists(path):
+                yield from self._removed_tree(rel)
+                return
+            logger.warning("Cannot list %s: %s", path, e)
+            if old is not None:
+                self.current.dirs[rel] = old
+            return
+
+        state = self.current.dirs[rel] = DirState(mtime_ns)
+        old_files = old.files if old is not None else {}
+        old_subdirs = set(old.subdirs) if old is not None else set()
+        listed = {entry.name: entry for entry in entries}
+        for name in sorted(listed.keys() | old_files.keys() | old_subdirs):
+            entry = listed.get(name)
+            is_dir = entry is not None and entry.is_dir(follow_symlinks=False)
+            if is_dir and self.file_filter.prune(name, _join(rel, name)):
+                entry, is_dir = None, False
+            if name in old_files and (entry is None or is_dir):
+                yield from self._emit("removed", rel, name, old_files[name])
+            if name in old_subdirs and not is_dir:
+                yield from self._removed_tree(_join(rel, name))
+            if is_dir:
+                state.subdirs.append(name)
+                if self.recursive:
+                    yield _join(rel, name)
+                continue
+            if entry is None or not entry.is_file():
+                continue
+            st = entry.stat()
+            before = old_files.get(name)
+            if before is not None and self._same(before, st, entry.path):
+                state.files[name] = FileState(st.st_size, st.st_mtime_ns, before.sha256)
+                continue
+            sha256 = None
+            if self.include_hash and self._wanted(name):
+                sha256 = compute_sha256(Path(entry.path))
+                if before is not None and before.sha256 == sha256:
+                    state.files[name] = FileState(st.st_size, st.st_mtime_ns, sha256)
+                    continue
+            state.files[name] = FileState(st.st_size, st.st_mtime_ns, sha256)
+            kind = "added" if before is None else "modified"
+            yield from self._emit(kind, rel, name, state.files[name])
+
+    def _unchanged(self, old: DirState | None, mtime_ns: int) -> bool:
+        return (
+            old is not None
+            and old.mtime_ns == mtime_ns
+            and self.previous.taken_ns is not None
+            and mtime_ns < self.previous.taken_ns - RACY_WINDOW_NS
+        )
+
+    def _same(self, before: FileState, st: os.stat_result, path: str) -> bool:
+        if before.size != st.st_size:
+            return False
+        if before.mtime_ns is not None:
+            return before.mtime_ns == st.st_mtime_ns
+        # Baseline from a listing: size only, or the digest when it has one.
+        if self.include_hash and before.sha256 is not None:
+            return compute_sha256(Path(path)) == before.sha256
+        return True
+
+    def _removed_tree(self, rel: str) -> Iterator[MediaChange]:
+        old = self.previous.dirs.get(rel)
+        if old is None or not self.recursive:
+            return
+        names = sorted(
+            [(n, False) for n in old.files] + [(n, True) for n in old.subdirs]
+        )
+        for name, is_dir in names:
+            if is_dir:
+                yield from self._removed_tree(_join(rel, name))
+            else:
+                yield from self._emit("removed", rel, name, old.files[name])
+
+    def _emit(
+        self, kind: str, rel: str, name: str, state: FileState
+    ) -> Iterator[MediaChange]:
+        if self._wanted(name):
+            yield MediaChange(
+                kind,
+                MediaFileInfo(
+                    filename=name,
+                    extension=extension_of(name),
+                    relative_path=_join(rel, name),
+                    size_bytes=state.size,
+                    sha256=state.sha256 if self.include_hash else None,
+                ),
+            )
+
+    def _wanted(self, name: str) -> bool:
+        return self.exts is None or extension_of(name) in self.exts
+
+
+def _join(rel: str, name: str) -> str:
+    return f"{rel}{os.sep}{name}" if rel else name
+
+
+def write_changes_csv(
+    changes: Iterable[MediaChange],
+    output: TextIO | None = None,
+    *,
+    include_hash: bool = False,
+) -> None:
+    """Write ``changes`` as CSV: a ``change`` column followed by the listing columns."""
+    if output is None:
+        output = sys.stdout
+    columns = ["change", "filename", "extension", "relative_path", "size_bytes"]
+    if include_hash:
+        columns.append("sha256")
+    writer = csv.writer(output, lineterminator="\n")
+    writer.writerow(columns)
+    for change in changes:
+        info = change.info
+        row = [
+            change.kind,
+            info.filename,
+            info.extension,
+            info.relative_path,
+            str(info.size_bytes),
+        ]
+        if include_hash:
+            row.append(info.sha256 or "")
+        writer.writerow(row)
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from .plan import PlannedMove
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_VERSION = 1
+
+# Progress records are fsynced in batches: losing the tail of the journal
+# only means resume re-checks those files on disk, which is idempotent.
+FSYNC_EVERY = 256
+
+
+@dataclass
+class JournalState:
+    dst: Path
+    ops: list[PlannedMove] = field(default_factory=list)
+    status: dict[int, str] = field(default_factory=dict)
+    complete: bool = False
+
+    def pending(self) -> Iterator[tuple[int, PlannedMove]]:
+        for i, op in enumerate(self.ops):
+            if self.status.get(i) != "done":
+                yield i, op
+
+
+class MoveJournal:
+    """Append-only JSON-lines write-ahead log of a move run.
+
+    The full plan is written (and fsynced) before any file is touched, so
+    an interrupted run can be resumed from the journal without walking the
+    source tree again.
+    """
+
+    def __init__(self, path: Path, *, fsync_every: int = FSYNC_EVERY):
+        self.path = Path(path)
+        self._f = open(self.path, "a", encoding="utf-8")
+        self._fsync_every = fsync_every
+        self._unsynced = 0
+
+    def __enter__(self) -> MoveJournal:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _write(self, record: dict, *, sync: bool = False) -> None:
+        self._f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._unsynced += 1
+        if sync or self._unsynced >= self._fsync_every:
+            self.sync()
+
+    def begin(self, dst: Path) -> None:
+        self._write({"op": "begin", "v": JOURNAL_VERSION, "dst": str(dst)})
+
+    def record_plan(self, ops: Iterable[PlannedMove]) -> list[PlannedMove]:
+        planned = []
+        for op in ops:
+            self._write({"op": "plan", "id": len(planned), **_encode(op)})
+            planned.append(op)
+        self._write({"op": "planned", "count": len(planned)}, sync=True)
+        return planned
+
+    def start(self, op_id: int) -> None:
+        self._write({"op": "start", "id": op_id})
+
+    def done(self, op_id: int) -> None:
+        self._write({"op": "done", "id": op_id})
+
+    def failed(self, op_id: int, error: str) -> None:
+        self._write({"op": "fail", "id": op_id, "error": error})
+
+    def sync(self) -> None:
+        self._f.flush()
+        os.fsync(self._f.fileno())
+        self._unsynced = 0
+
+    def close(self) -> None:
+        self.sync()
+        self._f.close()
+
+
+def load_journal(path: Path) -> JournalState:
+    """Read a journal, ignoring a torn last line from a crash mid-write."""
+    state: JournalState | None = None
+    with open(path, encoding="utf-8") as f:
+        lines = f.read().split("\n")
+    for n, line in enumerate(lines):
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            if n == len(lines) - 1:
+                logger.warning("Ignoring truncated last journal record")
+                break
+            raise ValueError(f"Corrupt journal record at line {n + 1}: {path}")
+        op = record["op"]
+        if op == "begin":
+            if record.get("v") != JOURNAL_VERSION:
+                raise ValueError(f"Unsupported journal version: {record.get('v')}")
+            state = JournalState(dst=Path(record["dst"]))
+        elif state is None:
+            raise ValueError(f"Journal does not start with a begin record: {path}")
+        elif op == "plan":
+            state.ops.append(_decode(record))
+        elif op == "planned":
+            state.complete = True
+        elif op in ("start", "done", "fail"):
+            state.status[record["id"]] = op
+    if state is None:
+        raise ValueError(f"Empty journal: {path}")
+    return state
+
+
+def _encode(op: PlannedMove) -> dict:
+    record = {
+        "a": op.action,
+        "src": str(op.source),
+        "size": op.size,
+        "dev": op.device,
+    }
+    if op.target is not None:
+        record["dst"] = str(op.target)
+    if op.existing is not None:
+        record["existing"] = str(op.existing)
+    if op.sha256 is not None:
+        record["sha256"] = op.sha256
+    return record
+
+
+def _decode(record: dict) -> PlannedMove:
+    return PlannedMove(
+        source=Path(record["src"]),
+        target=Path(record["dst"]) if "dst" in record else None,
+        size=record["size"],
+        device=record["dev"],
+        action=record["a"],
+        existing=Path(record["existing"]) if "existing" in record else None,
+        sha256=record.get("sha256"),
+    )
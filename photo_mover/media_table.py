@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+from array import array
+from typing import Iterable, Iterator
+
+from .csv_exporter import MediaFileInfo
+
+_DIGEST_SIZE = 32
+
+
+class MediaTable:
+    """Columnar, append-only store of :class:`MediaFileInfo` records.
+
+    A list of records costs several Python objects per file; here each file
+    is a few machine words. Extensions and parent directories are interned
+    into small pools and referenced by index, file names live in one UTF-8
+    buffer, sizes in an ``array('Q')`` and SHA-256 digests as 32 raw bytes.
+    Capture times share a second UTF-8 buffer and pixel sizes are
+    ``array('I')`` columns; as in the binary listing format, an empty
+    ``taken_at`` and a zero width or height read back as None.
+    Rows are materialised as :class:`MediaFileInfo` only when read, so the
+    table can be passed anywhere an iterable of records is expected.
+
+    ``relative_path`` must end with ``filename`` (as produced by
+    :func:`~photo_mover.csv_exporter.scan_media`); the directory part is
+    what gets pooled.
+    """
+
+    def __init__(self, records: Iterable[MediaFileInfo] = ()):
+        self._exts: list[str] = []
+        self._ext_ids: dict[str, int] = {}
+        self._dirs: list[str] = []
+        self._dir_ids: dict[str, int] = {}
+        self._ext = array("I")
+        self._dir = array("I")
+        self._names = bytearray()
+        self._name_end = array("Q")
+        self._sizes = array("Q")
+        self._digests = bytearray()
+        self._has_digest = bytearray()
+        self._taken = bytearray()
+        self._taken_end = array("Q")
+        self._width = array("I")
+        self._height = array("I")
+        self.extend(records)
+
+    def __len__(self) -> int:
+        return len(self._sizes)
+
+    def __iter__(self) -> Iterator[MediaFileInfo]:
+        for i in range(len(self)):
+            yield self._row(i)
+
+    def __getitem__(self, i: int) -> MediaFileInfo:
+        return self._row(self._index(i))
+
+    def append(self, info: MediaFileInfo) -> None:
+        rel = info.relative_path
+        if not rel.endswith(info.filename):
+            raise ValueError(
+                f"relative_path does not end with filename: {rel!r}, "
+                f"{info.filename!r}"
+            )
+        parent = rel[: len(rel) - len(info.filename)]
+        digest = bytes.fromhex(info.sha256) if info.sha256 else None
+        if digest is not None and len(digest) != _DIGEST_SIZE:
+            raise ValueError(f"Not a SHA-256 digest: {info.sha256!r}")
+        self._ext.append(_intern(info.extension, self._exts, self._ext_ids))
+        self._dir.append(_intern(parent, self._dirs, self._dir_ids))
+        self._names += info.filename.encode("utf-8", "surrogateescape")
+        self._name_end.append(len(self._names))
+        self._sizes.append(info.size_bytes)
+        self._digests += digest or bytes(_DIGEST_SIZE)
+        self._has_digest.append(digest is not None)
+        self._taken += (info.taken_at or "").encode("utf-8")
+        self._taken_end.append(len(self._taken))
+        self._width.append(info.width or 0)
+        self._height.append(info.height or 0)
+
+    def extend(self, records: Iterable[MediaFileInfo]) -> None:
+        for info in records:
+            self.append(info)
+
+    def digest(self, i: int) -> bytes | None:
+        """Raw 32-byte SHA-256 of row ``i``, or None if it was not hashed."""
+        i = self._index(i)
+        if not self._has_digest[i]:
+            return None
+        return bytes(self._digests[i * _DIGEST_SIZE : (i + 1) * _DIGEST_SIZE])
+
+    def total_size(self) -> int:
+        return sum(self._sizes)
+
+    def count_by_extension(self) -> dict[str, int]:
+        counts = [0] * len(self._exts)
+        for code in self._ext:
+            counts[code] += 1
+        return dict(zip(self._exts, counts))
+
+    def size_by_extension(self) -> dict[str, int]:
+        totals = [0] * len(self._exts)
+        for code, size in zip(self._ext, self._sizes):
+            totals[code] += size
+        return dict(zip(self._exts, totals))
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the column buffers (excluding pools)."""
+        columns = (
+            self._ext,
+            self._dir,
+            self._name_end,
+            self._sizes,
+            self._taken_end,
+            self._width,
+            self._height,
+        )
+        return (
+            sum(c.itemsize * len(c) for c in columns)
+            + len(self._names)
+            + len(self._digests)
+            + len(self._has_digest)
+            + len(self._taken)
+        )
+
+    def _index(self, i: int) -> int:
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("MediaTable index out of range")
+        return i
+
+    def _row(self, i: int) -> MediaFileInfo:
+        start = self._name_end[i - 1] if i else 0
+        name = self._names[start : self._name_end[i]].decode("utf-8", "surrogateescape")
+        sha256 = None
+        if self._has_digest[i]:
+            sha256 = self._digests[i * _DIGEST_SIZE : (i + 1) * _DIGEST_SIZE].hex()
+        start = self._taken_end[i - 1] if i else 0
+        taken_at = self._taken[start : self._taken_end[i]].decode("utf-8")
+        return MediaFileInfo(
+            filename=name,
+            extension=self._exts[self._ext[i]],
+            relative_path=self._dirs[self._dir[i]] + name,
+            size_bytes=self._sizes[i],
+            sha256=sha256,
+            taken_at=taken_at or None,
+            width=self._width[i] or None,
+            height=self._height[i] or None,
+        )
+
+
+def _intern(value: str, pool: list[str], ids: dict[str, int]) -> int:
+    code = ids.get(value)
+    if code is None:
+        code = ids[value] = len(pool)
+        pool.append(value)
+    return code
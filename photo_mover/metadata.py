@@ -0,0 +1,409 @@
+from __future__ import annotations
+
+import logging
+import struct
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO
+
+logger = logging.getLogger(__name__)
+
+# Bytes read from the start of every file. JPEG APP1 (EXIF) segments are
+# capped at 64 KiB and HEIC/MP4 files written by cameras keep their
+# metadata boxes near the start, so one read usually answers everything.
+HEADER_BYTES = 64 * 1024
+
+# Upper bound for the few follow-up reads (a HEIC Exif item stored in
+# mdat, an MP4 moov box at the end of the file).
+MAX_EXTRA_READ = 256 * 1024
+
+# Top-level boxes skipped over (header reads only) when looking for moov.
+_MAX_TOP_LEVEL_BOXES = 64
+
+METADATA_FIELDS = ("taken_at", "width", "height")
+
+
+@dataclass(frozen=True, slots=True)
+class MediaMetadata:
+    """Capture time (naive local ISO 8601) and pixel dimensions, if known."""
+
+    taken_at: str | None = None
+    width: int | None = None
+    height: int | None = None
+
+
+def read_metadata(path: Path) -> MediaMetadata:
+    """Extract :class:`MediaMetadata` from a JPEG, PNG, HEIC/HEIF or MP4/MOV.
+
+    The format is detected from the file's magic bytes. Only the first
+    :data:`HEADER_BYTES` are read, plus at most a couple of bounded reads
+    at offsets found in that header; the rest of the file is never loaded.
+    Unknown formats and malformed headers give an empty result.
+    """
+    with open(path, "rb") as f:
+        head = f.read(HEADER_BYTES)
+        try:
+            if head.startswith(b"\xff\xd8"):
+                return _jpeg(head)
+            if head.startswith(b"\x89PNG\r\n\x1a\n"):
+                return _png(head)
+            if head[4:8] == b"ftyp":
+                brand = head[8:12]
+                if brand in (b"heic", b"heix", b"mif1", b"msf1", b"heim", b"avif"):
+                    return _heif(f, head)
+                return _mp4(f, head)
+        except (struct.error, ValueError, IndexError) as e:
+            logger.debug("Cannot parse metadata of %s: %s", path, e)
+    return MediaMetadata()
+
+
+def _read_at(f: BinaryIO, offset: int, size: int) -> bytes:
+    f.seek(offset)
+    return f.read(min(size, MAX_EXTRA_READ))
+
+
+# --- EXIF / TIFF ---------------------------------------------------------
+
+_TAG_EXIF_IFD = 0x8769
+_TAG_DATETIME = 0x0132
+_TAG_DATETIME_ORIGINAL = 0x9003
+_TAG_PIXEL_X = 0xA002
+_TAG_PIXEL_Y = 0xA003
+_TYPE_SIZES = {1: 1, 2: 1, 3: 2, 4: 4, 5: 8, 7: 1, 9: 4, 10: 8}
+
+
+def parse_exif(tiff: bytes) -> MediaMetadata:
+    """Capture time and pixel size from a TIFF-structured EXIF block."""
+    if tiff[:2] == b"II":
+        endian = "<"
+    elif tiff[:2] == b"MM":
+        endian = ">"
+    else:
+        raise ValueError("Not a TIFF header")
+    (ifd0,) = struct.unpack_from(endian + "I", tiff, 4)
+    tags = _ifd(tiff, ifd0, endian)
+    if _TAG_EXIF_IFD in tags:
+        tags.update(_ifd(tiff, tags[_TAG_EXIF_IFD], endian))
+    taken = tags.get(_TAG_DATETIME_ORIGINAL) or tags.get(_TAG_DATETIME)
+    return MediaMetadata(
+        taken_at=_exif_time(taken) if isinstance(taken, str) else None,
+        width=_positive(tags.get(_TAG_PIXEL_X)),
+        height=_positive(tags.get(_TAG_PIXEL_Y)),
+    )
+
+
+def _ifd(tiff: bytes, offset: int, endian: str) -> dict[int, object]:
+    wanted = (
+        _TAG_EXIF_IFD,
+        _TAG_DATETIME,
+        _TAG_DATETIME_ORIGINAL,
+        _TAG_PIXEL_X,
+        _TAG_PIXEL_Y,
+    )
+    (count,) = struct.unpack_from(endian + "H", tiff, offset)
+    tags: dict[int, object] = {}
+    for i in range(count):
+        tag, typ, n, raw = struct.unpack_from(
+            endian + "HHI4s", tiff, offset + 2 + 12 * i
+        )
+        if tag not in wanted:
+            continue
+        size = _TYPE_SIZES.get(typ, 1) * n
+        if size > 4:
+            (pointer,) = struct.unpack(endian + "I", raw)
+            raw = tiff[pointer : pointer + size]
+        if typ == 2:
+            tags[tag] = raw[:size].split(b"\0", 1)[0].decode("ascii", "replace")
+        elif typ == 3:
+            tags[tag] = struct.unpack_from(endian + "H", raw)[0]
+        elif typ == 4:
+            tags[tag] = struct.unpack_from(endian + "I", raw)[0]
+    return tags
+
+
+def _exif_time(value: str) -> str | None:
+    """``"2023:07:14 09:30:00"`` -> ``"2023-07-14T09:30:00"``."""
+    value = value.strip()
+    try:
+        parsed = time.strptime(value[:19], "%Y:%m:%d %H:%M:%S")
+    except ValueError:
+        return None
+    return time.strftime("%Y-%m-%dT%H:%M:%S", parsed)
+
+
+def _positive(value: object) -> int | None:
+    return value if isinstance(value, int) and value > 0 else None
+
+
+# --- JPEG ----------------------------------------------------------------
+
+_SOF_MARKERS = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def _jpeg(head: bytes) -> MediaMetadata:
+    exif = MediaMetadata()
+    pos = 2
+    while pos + 4 <= len(head):
+        if head[pos] != 0xFF:
+            break
+        marker = head[pos + 1]
+        if marker == 0xFF:
+            pos += 1
+            continue
+        if marker in (0xD9, 0xDA):  # end of image / start of scan
+            break
+        (length,) = struct.unpack_from(">H", head, pos + 2)
+        segment = head[pos + 4 : pos + 2 + length]
+        if marker == 0xE1 and segment.startswith(b"Exif\0\0"):
+            exif = parse_exif(segment[6:])
+        elif marker in _SOF_MARKERS and len(segment) >= 5:
+            height, width = struct.unpack_from(">HH", segment, 1)
+            return MediaMetadata(exif.taken_at, width, height)
+        pos += 2 + length
+    return exif
+
+
+# --- PNG -----------------------------------------------------------------
+
+
+def _png(head: bytes) -> MediaMetadata:
+    width, height = struct.unpack_from(">II", head, 16)
+    taken_at = None
+    pos = 8
+    while pos + 8 <= len(head):
+        length, kind = struct.unpack_from(">I4s", head, pos)
+        if kind == b"eXIf":
+            taken_at = parse_exif(head[pos + 8 : pos + 8 + length]).taken_at
+            break
+        if kind in (b"IDAT", b"IEND"):
+            break
+        pos += 12 + length
+    return MediaMetadata(taken_at, width, height)
+
+
+# --- ISO base media (HEIF, MP4/MOV) --------------------------------------
+
+
+def _boxes(data: bytes, start: int = 0, end: int | None = None):
+    """Yield ``(type, payload_start, box_end)`` for the boxes in ``data``."""
+    end = len(data) if end is None else min(end, len(data))
+    pos = start
+    while pos + 8 <= end:
+        size, kind = struct.unpack_from(">I4s", data, pos)
+        header = 8
+        if size == 1:
+            (size,) = struct.unpack_from(">Q", data, pos + 8)
+            header = 16
+        elif size == 0:
+            size = end - pos
+        if size < header:
+            return
+        yield kind, pos + header, pos + size
+        pos += size
+
+
+def _child(data: bytes, kind: bytes, start: int, end: int) -> tuple[int, int] | None:
+    for k, payload, box_end in _boxes(data, start, end):
+        if k == kind:
+            return payload, box_end
+    return None
+
+
+def _heif(f: BinaryIO, head: bytes) -> MediaMetadata:
+    meta = _child(head, b"meta", 0, len(head))
+    if meta is None:
+        return MediaMetadata()
+    start, end = meta[0] + 4, meta[1]  # meta is a full box
+    primary = None
+    exif_item = None
+    locations: dict[int, tuple[int, int]] = {}
+    sizes: list[tuple[int, int] | None] = []
+    associations: dict[int, list[int]] = {}
+    for kind, payload, box_end in _boxes(head, start, end):
+        if kind == b"pitm":
+            version = head[payload]
+            fmt = ">H" if version == 0 else ">I"
+            (primary,) = struct.unpack_from(fmt, head, payload + 4)
+        elif kind == b"iinf":
+            exif_item = _heif_exif_item(head, payload, box_end)
+        elif kind == b"iloc":
+            locations = _heif_locations(head, payload)
+        elif kind == b"iprp":
+            sizes, associations = _heif_properties(head, payload, box_end)
+
+    width = height = None
+    for index in associations.get(primary, []):
+        if 0 < index <= len(sizes) and sizes[index - 1] is not None:
+            width, height = sizes[index - 1]
+            break
+    taken_at = None
+    if exif_item in locations:
+        offset, length = locations[exif_item]
+        block = head[offset : offset + length]
+        if len(block) < length:
+            block = _read_at(f, offset, length)
+        (skip,) = struct.unpack_from(">I", block, 0)
+        taken_at = parse_exif(block[4 + skip :]).taken_at
+    return MediaMetadata(taken_at, width, height)
+
+
+def _heif_exif_item(data: bytes, payload: int, end: int) -> int | None:
+    version = data[payload]
+    pos = payload + (6 if version == 0 else 8)
+    for kind, infe, _ in _boxes(data, pos, end):
+        if kind != b"infe" or data[infe] < 2:
+            continue
+        if data[infe] == 2:
+            item_id, _, item_type = struct.unpack_from(">HH4s", data, infe + 4)
+        else:
+            item_id, _, item_type = struct.unpack_from(">IH4s", data, infe + 4)
+        if item_type == b"Exif":
+            return item_id
+    return None
+
+
+def _heif_locations(data: bytes, payload: int) -> dict[int, tuple[int, int]]:
+    version = data[payload]
+    pos = payload + 4
+    offset_size, length_size = data[pos] >> 4, data[pos] & 15
+    base_size, index_size = data[pos + 1] >> 4, data[pos + 1] & 15
+    pos += 2
+    if version < 2:
+        (count,) = struct.unpack_from(">H", data, pos)
+        pos += 2
+    else:
+        (count,) = struct.unpack_from(">I", data, pos)
+        pos += 4
+    locations = {}
+    for _ in range(count):
+        if version < 2:
+            (item_id,) = struct.unpack_from(">H", data, pos)
+            pos += 2
+        else:
+            (item_id,) = struct.unpack_from(">I", data, pos)
+            pos += 4
+        method = 0
+        if version in (1, 2):
+            method = struct.unpack_from(">H", data, pos)[0] & 15
+            pos += 2
+        pos += 2  # data_reference_index
+        base = _uint(data, pos, base_size)
+        pos += base_size
+        (extents,) = struct.unpack_from(">H", data, pos)
+        pos += 2
+        first = None
+        for _ in range(extents):
+            if version in (1, 2):
+                pos += index_size
+            offset = _uint(data, pos, offset_size)
+            length = _uint(data, pos + offset_size, length_size)
+            pos += offset_size + length_size
+            if first is None:
+                first = (base + offset, length)
+        if method == 0 and first is not None:
+            locations[item_id] = first
+    return locations
+
+
+def _heif_properties(
+    data: bytes, payload: int, end: int
+) -> tuple[list[tuple[int, int] | None], dict[int, list[int]]]:
+    sizes: list[tuple[int, int] | None] = []
+    associations: dict[int, list[int]] = {}
+    for kind, start, box_end in _boxes(data, payload, end):
+        if kind == b"ipco":
+            for prop, prop_start, _ in _boxes(data, start, box_end):
+                if prop == b"ispe":
+                    sizes.append(struct.unpack_from(">II", data, prop_start + 4))
+                else:
+                    sizes.append(None)
+        elif kind == b"ipma":
+            version, flags = data[start], int.from_bytes(data[start + 1 : start + 4])
+            (count,) = struct.unpack_from(">I", data, start + 4)
+            pos = start + 8
+            for _ in range(count):
+                if version < 1:
+                    (item_id,) = struct.unpack_from(">H", data, pos)
+                    pos += 2
+                else:
+                    (item_id,) = struct.unpack_from(">I", data, pos)
+                    pos += 4
+                n = data[pos]
+                pos += 1
+                indexes = []
+                for _ in range(n):
+                    if flags & 1:
+                        indexes.append(struct.unpack_from(">H", data, pos)[0] & 0x7FFF)
+                        pos += 2
+                    else:
+                        indexes.append(data[pos] & 0x7F)
+                        pos += 1
+                associations[item_id] = indexes
+    return sizes, associations
+
+
+def _uint(data: bytes, pos: int, size: int) -> int:
+    return int.from_bytes(data[pos : pos + size]) if size else 0
+
+
+# Seconds between the MP4 epoch (1904-01-01) and the Unix epoch.
+_MP4_EPOCH_OFFSET = 2082844800
+# 9999-12-31T23:59:59 UTC; a 64-bit mvhd time can be far beyond that.
+_MAX_UNIX_TIME = 253402300799
+
+
+def _mp4(f: BinaryIO, head: bytes) -> MediaMetadata:
+    moov = None
+    offset = 0
+    for _ in range(_MAX_TOP_LEVEL_BOXES):
+        header = head[offset : offset + 16]
+        if len(header) < 16:
+            header = _read_at(f, offset, 16)
+        if len(header) < 8:
+            break
+        size, kind = struct.unpack_from(">I4s", header)
+        if size == 1:
+            (size,) = struct.unpack_from(">Q", header, 8)
+        if kind == b"moov":
+            if size == 0 or offset + size > len(head):
+                moov = _read_at(f, offset, size or MAX_EXTRA_READ)
+            else:
+                moov = head[offset : offset + size]
+            break
+        if size < 8:
+            break
+        offset += size
+    if moov is None:
+        return MediaMetadata()
+
+    taken_at = width = height = None
+    start = 16 if struct.unpack_from(">I", moov)[0] == 1 else 8
+    for kind, payload, end in _boxes(moov, start):
+        if kind == b"mvhd":
+            if moov[payload] == 1:
+                (created,) = struct.unpack_from(">Q", moov, payload + 4)
+            else:
+                (created,) = struct.unpack_from(">I", moov, payload + 4)
+            taken_at = _mp4_time(created)
+        elif kind == b"trak" and width is None:
+            tkhd = _child(moov, b"tkhd", payload, end)
+            if tkhd is not None:
+                pos = tkhd[0] + (88 if moov[tkhd[0]] == 1 else 76)
+                w, h = struct.unpack_from(">II", moov, pos)
+                if w and h:
+                    width, height = w >> 16, h >> 16
+    return MediaMetadata(taken_at, width, height)
+
+
+def _mp4_time(created: int) -> str | None:
+    seconds = created - _MP4_EPOCH_OFFSET
+    if not 0 < seconds <= _MAX_UNIX_TIME:
+        return None
+    try:
+        tm = time.localtime(seconds)
+    except OverflowError:
+        return None  # beyond this platform's time_t
+    except OSError:
+        return None  # beyond what localtime() accepts (e.g. on Windows)
+    return time.strftime("%Y-%m-%dT%H:%M:%S", tm)
@@ -1,9 +1,30 @@
 from __future__ import annotations
 
-import shutil
+import contextlib
+from collections import deque
+from concurrent.futures import Future, wait
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Iterable, List
+from typing import Callable, Dict, Iterable, Iterator, List
 import logging
+import os
+import stat
+import time
+
+from .async_walker import StatEntry
+from .dest_index import ON_DUPLICATE_POLICIES, DestinationIndex
+from .filters import FileFilter
+from .hash_cache import HashCache
+from .hashing import compute_sha256
+from .journal import MoveJournal, load_journal
+from .plan import MovePlan, PlannedMove
+from .progress import Progress
+from .metadata import read_metadata
+from .naming import DATE_SOURCES, DEFAULT_LAYOUT, TargetAllocator
+from .scheduler import DeviceScheduler, completed
+from .tracing import span
+from .transfer import TransferResult, partial_path, transfer_file
+from .walker import walk_files
 
 logger = logging.getLogger(__name__)
 
@@ -22,45 +43,921 @@ def move_media(
     recursive: bool = False,
     dry_run: bool = True,
     extensions: Iterable[str] | None = None,
+    jobs: int = 1,
+    per_device: int | None = None,
+    verify: bool = False,
+    digests: Dict[Path, str] | None = None,
+    hash_cache: HashCache | None = None,
+    on_duplicate: str = "move",
+    layout: str = DEFAULT_LAYOUT,
+    on_collision: str = "suffix",
+    journal: Path | None = None,
+    io_concurrency: int = 1,
+    file_filter: FileFilter | None = None,
+    layout_date: str = "mtime",
+    progress: Progress | None = None,
 ) -> List[Path]:
     """Move media files from src into dst.
 
-    Returns list of files that would be/was moved (destination paths).
+    Returns list of files that would be/was moved (destination paths), in
+    walk order; skipped, deleted and failed files are not part of it.
+    Verified target digests are stored in ``digests`` (keyed by destination
+    path) when given. The other options are those of :func:`iter_moves`.
     """
-    if extensions is None:
-        extensions = DEFAULT_EXTENSIONS
-    else:
-        extensions = {e.lower().lstrip(".") for e in extensions}
+    return _targets(
+        iter_moves(
+            src,
+            dst,
+            recursive=recursive,
+            dry_run=dry_run,
+            extensions=extensions,
+            jobs=jobs,
+            per_device=per_device,
+            verify=verify,
+            hash_cache=hash_cache,
+            on_duplicate=on_duplicate,
+            layout=layout,
+            on_collision=on_collision,
+            journal=journal,
+            io_concurrency=io_concurrency,
+            file_filter=file_filter,
+            layout_date=layout_date,
+            progress=progress,
+        ),
+        digests,
+    )
+
+
+@dataclass(frozen=True)
+class MoveResult:
+    """What happened to one source file, as yielded by :func:`iter_moves`.
+
+    ``status`` is ``"moved"``, ``"linked"`` (a duplicate whose target was
+    hardlinked to the existing copy), ``"skipped"``, ``"deleted"`` (a
+    duplicate source removed) or ``"failed"`` with the reason in ``error``;
+    in a dry run it is what would have happened. ``target`` is None for
+    skipped and deleted files and for files that failed before a target
+    was chosen (e.g. an unreadable file). ``size`` is the source size in bytes,
+    ``seconds`` the time spent on the file, ``method`` how it was moved (see
+    :class:`~photo_mover.transfer.TransferResult`) and ``sha256`` the
+    verified digest, when one was computed.
+    """
+
+    source: Path
+    target: Path | None
+    size: int
+    seconds: float
+    status: str
+    method: str | None = None
+    sha256: str | None = None
+    error: str | None = None
+
+    @property
+    def placed(self) -> bool:
+        """True when the file is (or would be) at ``target`` now."""
+        return self.status in ("moved", "linked")
+
+
+# Result status of each planned action that did not fail.
+_STATUSES = {
+    "move": "moved",
+    "hardlink": "linked",
+    "skip": "skipped",
+    "delete": "deleted",
+}
+
+
+def iter_moves(
+    src: Path,
+    dst: Path,
+    *,
+    recursive: bool = False,
+    dry_run: bool = True,
+    extensions: Iterable[str] | None = None,
+    jobs: int = 1,
+    per_device: int | None = None,
+    verify: bool = False,
+    hash_cache: HashCache | None = None,
+    on_duplicate: str = "move",
+    layout: str = DEFAULT_LAYOUT,
+    on_collision: str = "suffix",
+    journal: Path | None = None,
+    io_concurrency: int = 1,
+    file_filter: FileFilter | None = None,
+    layout_date: str = "mtime",
+    progress: Progress | None = None,
+) -> Iterator[MoveResult]:
+    """Move media files from src into dst, yielding a :class:`MoveResult`
+    for every file as soon as it is done.
+
+    Results come in walk order, and nothing is kept per file once it has
+    been yielded, so memory stays flat however large the source is. Options
+    are checked when this is called; the walk and the moves run while the
+    iterator is consumed. Stopping early lets the files already in flight
+    finish; with ``journal`` the rest can be continued with
+    :func:`resume_moves`.
+
+    With ``jobs > 1`` same-device moves are still renamed inline, while
+    cross-device copies run on a pool with at most ``per_device`` files in
+    flight per source/destination device.
+
+    With ``verify`` every copy is hashed while it is written and checked
+    before the source is removed (see :func:`transfer_file`). A source
+    digest found in ``hash_cache`` is trusted instead of reading the copy
+    back, and the target digests are stored in the cache.
+
+    ``on_duplicate`` decides what happens to a file whose content already
+    exists somewhere in ``dst``: ``"move"`` it anyway, ``"skip"`` it,
+    ``"hardlink"`` the existing copy to the target name and delete the
+    source, or just ``"delete"`` the source.
+
+    Targets are placed according to ``layout`` (e.g.
+    ``"{year}/{month}/{name}"``) and never overwrite an existing or earlier
+    target: clashing names get a ``_N`` suffix, or a content-hash suffix with
+    ``on_collision="hash"`` (see :class:`TargetAllocator`). With
+    ``layout_date="taken"`` the layout's date fields use the capture time
+    from the file's EXIF/container metadata (cached in ``hash_cache``),
+    falling back to the mtime; metadata is only read when the layout has a
+    date field.
+
+    ``progress`` counts files seen, filtered, moved, handled as duplicates
+    and failed, bytes moved and per-device transfer times; with
+    ``journal`` the plan is complete before moving starts, so it also gets
+    totals for an ETA.
+
+    With ``journal`` the whole plan is written to a write-ahead journal
+    before any file is touched, and progress is appended as files complete,
+    so an interrupted run can be continued with :func:`resume_moves`.
+
+    ``io_concurrency > 1`` walks ``src`` with that many directory listings
+    and stats in flight, for sources on high-latency network mounts.
+    ``file_filter`` replaces ``extensions`` with a full
+    :class:`~photo_mover.filters.FileFilter` (globs, size, mtime, pruning).
+    """
+    if jobs < 1:
+        raise ValueError(f"jobs must be >= 1: {jobs}")
+    dst = Path(dst)
+    index, planned = _start_plan(
+        src,
+        dst,
+        recursive=recursive,
+        extensions=extensions,
+        on_duplicate=on_duplicate,
+        layout=layout,
+        on_collision=on_collision,
+        hash_cache=hash_cache if verify else None,
+        index_cache=hash_cache,
+        io_concurrency=io_concurrency,
+        file_filter=file_filter,
+        layout_date=layout_date,
+        progress=progress,
+    )
+    return _run_moves(
+        planned,
+        dst,
+        journal=journal,
+        dry_run=dry_run,
+        jobs=jobs,
+        per_device=per_device,
+        verify=verify,
+        hash_cache=hash_cache,
+        index=index,
+        progress=progress,
+    )
+
+
+def _run_moves(
+    planned: Iterable[PlannedMove | _PlanError],
+    dst: Path,
+    *,
+    journal: Path | None,
+    progress: Progress | None,
+    **options,
+) -> Iterator[MoveResult]:
+    dst.mkdir(parents=True, exist_ok=True)
+    with contextlib.ExitStack() as stack:
+        log = None
+        if journal is not None:
+            log = stack.enter_context(MoveJournal(journal))
+            log.begin(dst)
+            planned = list(planned)
+            recorded = log.record_plan(
+                op for op in planned if isinstance(op, PlannedMove)
+            )
+            if progress is not None:
+                _expect(progress, recorded)
+        yield from _iter_execute(
+            _numbered(planned), dst, journal=log, progress=progress, **options
+        )
+
+
+def build_plan(
+    src: Path,
+    dst: Path,
+    *,
+    recursive: bool = False,
+    extensions: Iterable[str] | None = None,
+    hash_cache: HashCache | None = None,
+    on_duplicate: str = "move",
+    layout: str = DEFAULT_LAYOUT,
+    on_collision: str = "suffix",
+    io_concurrency: int = 1,
+    file_filter: FileFilter | None = None,
+    layout_date: str = "mtime",
+    progress: Progress | None = None,
+) -> MovePlan:
+    """Walk ``src`` once and return the moves :func:`move_media` would make.
 
+    Nothing is moved and ``dst`` is not created. Source digests found in
+    ``hash_cache`` are stored in the plan and used as trusted digests when
+    it is executed with ``verify``.
+    """
     src = Path(src)
     dst = Path(dst)
-    moved: List[Path] = []
+    _, planned = _start_plan(
+        src,
+        dst,
+        recursive=recursive,
+        extensions=extensions,
+        on_duplicate=on_duplicate,
+        layout=layout,
+        on_collision=on_collision,
+        hash_cache=hash_cache,
+        index_cache=hash_cache,
+        io_concurrency=io_concurrency,
+        file_filter=file_filter,
+        layout_date=layout_date,
+        progress=progress,
+    )
+    return MovePlan(src, dst, [op for op in planned if isinstance(op, PlannedMove)])
+
+
+def execute_plan(
+    plan: MovePlan,
+    *,
+    dry_run: bool = True,
+    jobs: int = 1,
+    per_device: int | None = None,
+    verify: bool = False,
+    digests: Dict[Path, str] | None = None,
+    hash_cache: HashCache | None = None,
+    journal: Path | None = None,
+    progress: Progress | None = None,
+) -> List[Path]:
+    """Apply a :class:`MovePlan` without walking the source again.
+
+    Operations run grouped by device and directory (see
+    :meth:`MovePlan.execution_order`) and all target directories are
+    created up front; the result is in execution order.
+    """
+    if jobs < 1:
+        raise ValueError(f"jobs must be >= 1: {jobs}")
+    ordered = plan.execution_order()
+    if progress is not None:
+        _expect(progress, plan.ops)
+    made_dirs: set[Path] = set()
+    if not dry_run:
+        plan.dst.mkdir(parents=True, exist_ok=True)
+        for d in plan.target_dirs():
+            d.mkdir(parents=True, exist_ok=True)
+            made_dirs.add(d)
+
+    with contextlib.ExitStack() as stack:
+        log = None
+        if journal is not None:
+            log = stack.enter_context(MoveJournal(journal))
+            log.begin(plan.dst)
+            log.record_plan(op for _, op in ordered)
+            ordered = list(enumerate(op for _, op in ordered))
+        return _execute(
+            ordered,
+            plan.dst,
+            dry_run=dry_run,
+            jobs=jobs,
+            per_device=per_device,
+            verify=verify,
+            digests=digests,
+            hash_cache=hash_cache,
+            index=None,
+            journal=log,
+            made_dirs=made_dirs,
+            progress=progress,
+        )
+
+
+def resume_moves(
+    journal: Path,
+    *,
+    dry_run: bool = True,
+    jobs: int = 1,
+    per_device: int | None = None,
+    verify: bool = False,
+    digests: Dict[Path, str] | None = None,
+    hash_cache: HashCache | None = None,
+    progress: Progress | None = None,
+) -> List[Path]:
+    """Continue an interrupted :func:`move_media` run from its journal.
+
+    The source tree is not walked again. Operations without a ``done``
+    record are checked against the filesystem first: leftover partial
+    copies are removed, moves whose target was already renamed into place
+    are completed by removing the source once both hash the same (a
+    different file at the target fails the operation), and the rest are
+    executed again.
+    Returns the targets handled by this call.
+    """
+    journal = Path(journal)
+    state = load_journal(journal)
+    if not state.complete:
+        raise ValueError(
+            f"Journal {journal} has no complete plan (the run stopped while "
+            "scanning); start the move again instead"
+        )
+
+    with MoveJournal(journal) as log:
+        todo = []
+        for op_id, op in state.pending():
+            status, error = _reconcile(op, dry_run)
+            if status == "redo":
+                todo.append((op_id, op))
+            elif dry_run:
+                continue
+            elif status == "done":
+                log.done(op_id)
+            else:
+                logger.error("Cannot resume %s: %s", op.source, error)
+                log.failed(op_id, error)
+        if progress is not None:
+            _expect(progress, [op for _, op in todo])
+        return _execute(
+            todo,
+            state.dst,
+            dry_run=dry_run,
+            jobs=jobs,
+            per_device=per_device,
+            verify=verify,
+            digests=digests,
+            hash_cache=hash_cache,
+            index=None,
+            journal=log,
+            progress=progress,
+        )
+
+
+def _start_plan(
+    src: Path,
+    dst: Path,
+    *,
+    recursive: bool,
+    extensions: Iterable[str] | None,
+    on_duplicate: str,
+    layout: str,
+    on_collision: str,
+    hash_cache: HashCache | None,
+    index_cache: HashCache | None,
+    io_concurrency: int = 1,
+    file_filter: FileFilter | None = None,
+    layout_date: str = "mtime",
+    progress: Progress | None = None,
+) -> tuple[DestinationIndex | None, Iterator[PlannedMove]]:
+    file_filter = _check_options(extensions, file_filter, on_duplicate, layout_date)
 
+    src = Path(src)
     if not src.exists():
         raise FileNotFoundError(f"Source not found: {src}")
-    dst.mkdir(parents=True, exist_ok=True)
 
-    if recursive:
-        it = src.rglob("*")
-    else:
-        it = src.iterdir()
+    allocator = TargetAllocator(dst, layout, on_collision=on_collision)
+    index = None
+    if on_duplicate != "move":
+        index = DestinationIndex(dst, hash_cache=index_cache)
+
+    if progress is not None:
+        progress.watch(file_filter)
+    candidates = walk_files(
+        src,
+        recursive=recursive,
+        file_filter=file_filter,
+        concurrency=io_concurrency,
+    )
+    planned = _plan(
+        candidates,
+        allocator,
+        index,
+        on_duplicate=on_duplicate,
+        hash_cache=hash_cache,
+        taken_dates=layout_date == "taken" and allocator.uses_dates,
+        metadata_cache=index_cache,
+        progress=progress,
+    )
+    return index, planned
+
+
+def _check_options(
+    extensions: Iterable[str] | None,
+    file_filter: FileFilter | None,
+    on_duplicate: str,
+    layout_date: str,
+) -> FileFilter:
+    """Validate the shared move options and return the filter to use."""
+    if file_filter is None:
+        file_filter = FileFilter(
+            extensions=DEFAULT_EXTENSIONS if extensions is None else extensions
+        )
+    elif extensions is not None:
+        raise ValueError("Pass extensions through file_filter when giving one")
+    if on_duplicate not in ON_DUPLICATE_POLICIES:
+        raise ValueError(
+            f"Unknown on_duplicate policy: {on_duplicate!r} "
+            f"(choose from {ON_DUPLICATE_POLICIES})"
+        )
+    if layout_date not in DATE_SOURCES:
+        raise ValueError(
+            f"Unknown layout_date: {layout_date!r} (choose from {DATE_SOURCES})"
+        )
+    return file_filter
+
+
+class BatchMover:
+    """Moves files from ``src`` into ``dst`` in batches, as they turn up.
+
+    ``dst`` is listed once, when the mover is created: the target allocator
+    and the duplicate index are kept between batches, so a batch only
+    stats its own files. Options are those of :func:`move_media`; this is
+    what :func:`~photo_mover.watch.watch_media` runs for every batch of
+    events. In a dry run files stay in place, so each source is only
+    planned once.
+    """
+
+    def __init__(
+        self,
+        src: Path,
+        dst: Path,
+        *,
+        recursive: bool = False,
+        dry_run: bool = True,
+        extensions: Iterable[str] | None = None,
+        jobs: int = 1,
+        per_device: int | None = None,
+        verify: bool = False,
+        hash_cache: HashCache | None = None,
+        on_duplicate: str = "move",
+        layout: str = DEFAULT_LAYOUT,
+        on_collision: str = "suffix",
+        file_filter: FileFilter | None = None,
+        layout_date: str = "mtime",
+        progress: Progress | None = None,
+    ):
+        if jobs < 1:
+            raise ValueError(f"jobs must be >= 1: {jobs}")
+        self.file_filter = _check_options(
+            extensions, file_filter, on_duplicate, layout_date
+        )
+        self.src = Path(src)
+        self.dst = Path(dst)
+        self.recursive = recursive
+        self.dry_run = dry_run
+        self.jobs = jobs
+        self.per_device = per_device
+        self.verify = verify
+        self.hash_cache = hash_cache
+        self.on_duplicate = on_duplicate
+        self.progress = progress
+        self._allocator = TargetAllocator(self.dst, layout, on_collision=on_collision)
+        self._index = None
+        if on_duplicate != "move":
+            self._index = DestinationIndex(self.dst, hash_cache=hash_cache)
+        self._taken_dates = layout_date == "taken" and self._allocator.uses_dates
+        self._prefix = os.path.join(self.src, "")
+        self._planned: set[str] | None = set() if dry_run else None
+        if progress is not None:
+            progress.watch(self.file_filter)
+
+    def move(
+        self,
+        paths: Iterable[Path] | None = None,
+        *,
+        settle: float = 0,
+        digests: Dict[Path, str] | None = None,
+    ) -> List[Path]:
+        """Move ``paths`` (or everything under ``src`` when None).
+
+        Paths outside ``src``, below it without ``recursive``, rejected by
+        the filter or no longer there are ignored. With ``settle`` files
+        modified within the last ``settle`` seconds are left alone, since
+        they may still be being written. Returns the targets in order.
+        """
+        if paths is None:
+            entries: Iterable = walk_files(
+                self.src, recursive=self.recursive, file_filter=self.file_filter
+            )
+        else:
+            entries = self._entries(paths)
+        if settle > 0:
+            entries = _settled(entries, time.time() - settle)
+        if self._planned is not None:
+            entries = self._unplanned(entries)
+        planned = _plan(
+            entries,
+            self._allocator,
+            self._index,
+            on_duplicate=self.on_duplicate,
+            hash_cache=self.hash_cache if self.verify else None,
+            taken_dates=self._taken_dates,
+            metadata_cache=self.hash_cache,
+            progress=self.progress,
+        )
+        if not self.dry_run:
+            self.dst.mkdir(parents=True, exist_ok=True)
+        return _execute(
+            enumerate(planned),
+            self.dst,
+            dry_run=self.dry_run,
+            jobs=self.jobs,
+            per_device=self.per_device,
+            verify=self.verify,
+            digests=digests,
+            hash_cache=self.hash_cache,
+            index=self._index,
+            journal=None,
+            progress=self.progress,
+        )
+
+    def _unplanned(self, entries: Iterable) -> Iterator:
+        for entry in entries:
+            if entry.path not in self._planned:
+                self._planned.add(entry.path)
+                yield entry
+
+    def _entries(self, paths: Iterable[Path]) -> Iterator[StatEntry]:
+        file_filter = self.file_filter
+        for path in sorted({str(p) for p in paths}):
+            if not path.startswith(self._prefix):
+                continue
+            rel = path[len(self._prefix) :]
+            *parents, name = rel.split(os.sep)
+            if parents and not self.recursive:
+                continue
+            if any(
+                file_filter.prune(part, os.path.join(*parents[: i + 1]))
+                for i, part in enumerate(parents)
+            ):
+                continue
+            if not file_filter.match_name(name, rel):
+                continue
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            except OSError as e:
+                logger.warning("Cannot stat %s: %s", path, e)
+                continue
+            if not stat.S_ISREG(st.st_mode):
+                continue
+            if file_filter.needs_stat and not file_filter.match_stat(st):
+                continue
+            yield StatEntry(name, path, st)
+
+
+def _settled(entries: Iterable, cutoff: float) -> Iterator:
+    for entry in entries:
+        try:
+            if entry.stat().st_mtime <= cutoff:
+                yield entry
+        except OSError:
+            continue
+
 
-    for p in it:
+def _plan(
+    entries: Iterable[os.DirEntry],
+    allocator: TargetAllocator,
+    index: DestinationIndex | None,
+    *,
+    on_duplicate: str,
+    hash_cache: HashCache | None,
+    taken_dates: bool = False,
+    metadata_cache: HashCache | None = None,
+    progress: Progress | None = None,
+) -> Iterator[PlannedMove | _PlanError]:
+    for entry in entries:
+        p = Path(entry.path)
+        if progress is not None:
+            progress.add("seen")
+        st = None
         try:
-            if is_media(p, extensions):
-                rel = p.relative_to(src)
-                target = dst.joinpath(rel.name)
-                if dry_run:
-                    logger.info("DRY RUN: move %s -> %s", p, target)
-                    moved.append(target)
-                else:
-                    logger.info("Moving %s -> %s", p, target)
-                    target_parent = target.parent
-                    target_parent.mkdir(parents=True, exist_ok=True)
-                    # Use shutil.move which handles cross-device moves
-                    shutil.move(str(p), str(target))
-                    moved.append(target)
-        except Exception:
+            with span("stat", path=p):
+                st = entry.stat()
+            taken_at = None
+            if taken_dates:
+                taken_at = _taken_at(p, st, metadata_cache)
+            existing = None
+            if index is not None:
+                with span("dedup", path=p):
+                    existing = index.find(p, st)
+            if existing is not None:
+                target = None
+                if on_duplicate == "hardlink":
+                    target = allocator.allocate(
+                        entry.name, st, _hasher(p), taken_at=taken_at
+                    )
+                yield PlannedMove(
+                    p, target, st.st_size, st.st_dev, on_duplicate, existing
+                )
+                continue
+            sha = hash_cache.lookup(p, st) if hash_cache is not None else None
+            target = allocator.allocate(entry.name, st, _hasher(p), taken_at=taken_at)
+        except OSError as e:
             logger.exception("Error processing %s", p)
+            size = 0 if st is None else st.st_size
+            yield _PlanError(p, size, str(e) or type(e).__name__)
+            continue
+        if index is not None:
+            # Later duplicates within the same import are matched against
+            # the target (read from the source until the move is done), so
+            # a hardlink points into dst whenever the plan is executed.
+            index.add(target, st.st_size, source=p)
+        yield PlannedMove(p, target, st.st_size, st.st_dev, sha256=sha)
+
+
+@dataclass(frozen=True)
+class _PlanError:
+    """A file that could not be planned, reported as a failed result."""
+
+    source: Path
+    size: int
+    error: str
+
+
+def _numbered(
+    planned: Iterable[PlannedMove | _PlanError],
+) -> Iterator[tuple[int | None, PlannedMove | _PlanError]]:
+    # Journal ids count planned moves only; planning errors are not journaled.
+    op_id = 0
+    for op in planned:
+        if isinstance(op, _PlanError):
+            yield None, op
+        else:
+            yield op_id, op
+            op_id += 1
+
+
+def _taken_at(p: Path, st: os.stat_result, cache: HashCache | None) -> str | None:
+    metadata = cache.lookup_metadata(p, st) if cache is not None else None
+    if metadata is None:
+        with span("metadata", path=p):
+            metadata = read_metadata(p)
+        if cache is not None:
+            cache.store_metadata(p, st, metadata)
+    return metadata.taken_at
+
+
+def _hasher(p: Path) -> Callable[[], str]:
+    def digest() -> str:
+        with span("hash", path=p):
+            return compute_sha256(p)
+
+    return digest
+
+
+def _expect(progress: Progress, ops: Iterable[PlannedMove]) -> None:
+    files = nbytes = 0
+    for op in ops:
+        files += 1
+        if op.action == "move":
+            nbytes += op.size
+    progress.expect(files, nbytes)
+
 
+def _targets(
+    results: Iterable[MoveResult], digests: Dict[Path, str] | None
+) -> List[Path]:
+    moved: List[Path] = []
+    for result in results:
+        if not result.placed:
+            continue
+        moved.append(result.target)
+        if digests is not None and result.sha256 is not None:
+            digests[result.target] = result.sha256
     return moved
+
+
+def _execute(
+    ops: Iterable[tuple[int, PlannedMove]],
+    dst: Path,
+    *,
+    digests: Dict[Path, str] | None,
+    **options,
+) -> List[Path]:
+    return _targets(_iter_execute(ops, dst, **options), digests)
+
+
+def _iter_execute(
+    ops: Iterable[tuple[int | None, PlannedMove | _PlanError]],
+    dst: Path,
+    *,
+    dry_run: bool,
+    jobs: int,
+    per_device: int | None,
+    verify: bool,
+    hash_cache: HashCache | None,
+    index: DestinationIndex | None,
+    journal: MoveJournal | None,
+    made_dirs: set[Path] | None = None,
+    progress: Progress | None = None,
+) -> Iterator[MoveResult]:
+    if made_dirs is None:
+        made_dirs = set()
+    record = journal is not None and not dry_run
+
+    def collect(
+        op_id: int | None, op: PlannedMove | _PlanError, outcome: _Outcome
+    ) -> MoveResult:
+        result, error, seconds = outcome
+        if isinstance(op, _PlanError):
+            if progress is not None:
+                progress.add("failed")
+            return MoveResult(op.source, None, op.size, seconds, "failed", error=error)
+        if record:
+            if error is None:
+                journal.done(op_id)
+            else:
+                journal.failed(op_id, error)
+        if progress is not None:
+            _count(progress, op, result, error, seconds, dry_run)
+        if index is not None and op.action == "move":
+            if error is not None:
+                index.discard(op.target, op.size)
+            elif not dry_run:
+                index.placed(op.target)
+        if error is not None:
+            return MoveResult(
+                op.source, op.target, op.size, seconds, "failed", error=error
+            )
+        if result is None:
+            return MoveResult(op.source, None, op.size, seconds, _STATUSES[op.action])
+        if not dry_run and result.sha256 is not None and hash_cache is not None:
+            hash_cache.store(result.target, result.target.stat(), result.sha256)
+        return MoveResult(
+            op.source,
+            result.target,
+            op.size,
+            seconds,
+            _STATUSES[op.action],
+            method=result.method,
+            sha256=result.sha256,
+        )
+
+    with contextlib.ExitStack() as stack:
+        scheduler = None
+        if jobs > 1 and not dry_run:
+            scheduler = stack.enter_context(DeviceScheduler(jobs, per_device))
+            dst_dev = dst.stat().st_dev
+        window = jobs * 4
+        pending: deque[
+            tuple[int | None, PlannedMove | _PlanError, Future[_Outcome]]
+        ] = deque()
+        # Moves still running on the pool, by target: a hardlink to one of
+        # them waits until its file is in place.
+        moving: dict[Path, Future[_Outcome]] = {}
+
+        def finish() -> MoveResult:
+            op_id, op, fut = pending.popleft()
+            if isinstance(op, PlannedMove):
+                moving.pop(op.target, None)
+            return collect(op_id, op, fut.result())
+
+        for op_id, op in ops:
+            if isinstance(op, _PlanError):
+                pending.append((op_id, op, completed((None, op.error, 0.0))))
+                continue
+            if record:
+                journal.start(op_id)
+            if scheduler is not None and op.action == "move" and op.device != dst_dev:
+                fut = moving[op.target] = scheduler.submit(
+                    (op.device, dst_dev), _attempt, op, dry_run, verify, made_dirs
+                )
+            else:
+                if op.action == "hardlink" and op.existing in moving:
+                    wait([moving[op.existing]])
+                fut = completed(_attempt(op, dry_run, verify, made_dirs))
+            pending.append((op_id, op, fut))
+            while pending and (len(pending) > window or pending[0][2].done()):
+                yield finish()
+        while pending:
+            yield finish()
+
+
+# (result, error, seconds spent on the operation)
+_Outcome = tuple[TransferResult | None, str | None, float]
+
+
+def _attempt(
+    op: PlannedMove, dry_run: bool, verify: bool, made_dirs: set[Path]
+) -> _Outcome:
+    started = time.monotonic()
+    try:
+        with span(op.action, path=op.source, bytes=op.size):
+            result = _apply(op, dry_run, verify, made_dirs)
+        return result, None, time.monotonic() - started
+    except Exception as e:
+        logger.exception("Error processing %s", op.source)
+        return None, str(e) or type(e).__name__, time.monotonic() - started
+
+
+def _count(
+    progress: Progress,
+    op: PlannedMove,
+    result: TransferResult | None,
+    error: str | None,
+    seconds: float,
+    dry_run: bool,
+) -> None:
+    if error is not None:
+        progress.add("failed")
+    elif op.action != "move":
+        progress.add("duplicates")
+    elif dry_run:
+        progress.add("planned")
+    else:
+        progress.add("moved", nbytes=op.size)
+        progress.device(op.device, op.size, seconds)
+        if result is not None and result.sha256 is not None:
+            progress.add("hashed")
+
+
+def _apply(
+    op: PlannedMove, dry_run: bool, verify: bool, made_dirs: set[Path]
+) -> TransferResult | None:
+    p, target = op.source, op.target
+    prefix = "DRY RUN: " if dry_run else ""
+    if op.action == "move":
+        if dry_run:
+            logger.debug("DRY RUN: move %s -> %s", p, target)
+            return TransferResult(p, target, "dry-run", op.size)
+        logger.debug("Moving %s -> %s", p, target)
+        _make_parent(target, made_dirs)
+        result = transfer_file(p, target, verify=verify, expected=op.sha256)
+        logger.debug("Moved %s via %s (%d bytes)", p, result.method, result.size)
+        return result
+    if op.action == "skip":
+        logger.debug("%sSkip %s (duplicate of %s)", prefix, p, op.existing)
+        return None
+    if op.action == "delete":
+        logger.debug("%sDelete %s (duplicate of %s)", prefix, p, op.existing)
+        if not dry_run:
+            p.unlink()
+        return None
+    # hardlink
+    logger.debug("%sLink %s -> %s (duplicate of %s)", prefix, p, target, op.existing)
+    if not dry_run:
+        if not target.exists():
+            _make_parent(target, made_dirs)
+            os.link(op.existing, target)
+        elif not os.path.samefile(target, op.existing):
+            raise FileExistsError(f"Target exists with other content: {target}")
+        p.unlink()
+    return TransferResult(p, target, "hardlink", op.size)
+
+
+def _make_parent(target: Path, made_dirs: set[Path]) -> None:
+    # Each target directory is created once per run instead of once per file.
+    parent = target.parent
+    if parent not in made_dirs:
+        parent.mkdir(parents=True, exist_ok=True)
+        made_dirs.add(parent)
+
+
+def _reconcile(op: PlannedMove, dry_run: bool) -> tuple[str, str | None]:
+    """Classify an unfinished journal entry as ``redo``, ``done`` or ``fail``."""
+    if op.action == "skip":
+        return "done", None
+    if op.action != "move":
+        return ("redo", None) if os.path.lexists(op.source) else ("done", None)
+
+    partial = partial_path(op.target)
+    if partial.exists():
+        logger.info("Rolling back partial copy %s", partial)
+        if not dry_run:
+            partial.unlink()
+    has_source = os.path.lexists(op.source)
+    has_target = os.path.lexists(op.target)
+    if has_source and not has_target:
+        return "redo", None
+    if has_target and not has_source:
+        return "done", None
+    if has_source and has_target:
+        # The copy was renamed into place but the source was not removed,
+        # or another file took the target name: only the same content
+        # makes the source safe to delete.
+        if _same_content(op.source, op.target):
+            logger.info("Completing move of %s", op.source)
+            if not dry_run:
+                op.source.unlink()
+            return "done", None
+        return "fail", f"both {op.source} and {op.target} exist and differ"
+    return "fail", f"neither {op.source} nor {op.target} exists"
+
+
+def _same_content(source: Path, target: Path) -> bool:
+    if source.stat().st_size != target.stat().st_size:
+        return False
+    return compute_sha256(source) == compute_sha256(target)
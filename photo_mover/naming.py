@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import os
+import string
+import time
+from pathlib import Path
+from typing import Callable
+
+from .walker import walk_files
+
+LAYOUT_FIELDS = ("name", "stem", "ext", "year", "month", "day")
+DATE_FIELDS = frozenset({"year", "month", "day"})
+# Where {year}/{month}/{day} come from: the file mtime, or the capture time
+# read from EXIF/container metadata (falling back to the mtime).
+DATE_SOURCES = ("mtime", "taken")
+COLLISION_POLICIES = ("suffix", "hash")
+DEFAULT_LAYOUT = "{name}"
+
+
+def layout_uses_dates(layout: str) -> bool:
+    """Whether ``layout`` contains any of the date fields."""
+    return any(
+        field in DATE_FIELDS for _, field, _, _ in string.Formatter().parse(layout)
+    )
+
+
+def validate_layout(layout: str) -> None:
+    for _, field, _, _ in string.Formatter().parse(layout):
+        if field is not None and field not in LAYOUT_FIELDS:
+            raise ValueError(
+                f"Unknown layout field {{{field}}} (choose from {LAYOUT_FIELDS})"
+            )
+    parts = Path(layout).parts
+    if not layout or Path(layout).is_absolute() or ".." in parts:
+        raise ValueError(f"Layout must be a relative path template: {layout!r}")
+
+
+class TargetAllocator:
+    """Assigns unique destination paths under ``root``.
+
+    Existing files are listed once at construction; afterwards every
+    allocation is a set lookup, and allocated names are reserved so a dry
+    run produces exactly the same targets as the real run.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        layout: str = DEFAULT_LAYOUT,
+        *,
+        on_collision: str = "suffix",
+    ):
+        validate_layout(layout)
+        if on_collision not in COLLISION_POLICIES:
+            raise ValueError(
+                f"Unknown collision policy: {on_collision!r} "
+                f"(choose from {COLLISION_POLICIES})"
+            )
+        self.root = Path(root)
+        self.layout = layout
+        self.on_collision = on_collision
+        self.uses_dates = layout_uses_dates(layout)
+        self._taken: set[str] = set()
+        self._next_suffix: dict[str, int] = {}
+        if self.root.exists():
+            prefix = len(os.path.join(self.root, ""))
+            for entry in walk_files(self.root, recursive=True):
+                self._taken.add(os.path.normcase(entry.path[prefix:]))
+
+    def render(self, name: str, st: os.stat_result, taken_at: str | None = None) -> str:
+        """Format the layout for ``name``.
+
+        Dates come from ``taken_at`` (ISO ``YYYY-MM-DD...``) when given,
+        otherwise from the local mtime.
+        """
+        stem, dot_ext = os.path.splitext(name)
+        if taken_at is not None:
+            year, month, day = taken_at[:4], taken_at[5:7], taken_at[8:10]
+        else:
+            tm = time.localtime(st.st_mtime)
+            year, month, day = f"{tm.tm_year:04}", f"{tm.tm_mon:02}", f"{tm.tm_mday:02}"
+        return self.layout.format(
+            name=name, stem=stem, ext=dot_ext[1:], year=year, month=month, day=day
+        )
+
+    def allocate(
+        self,
+        name: str,
+        st: os.stat_result,
+        digest: Callable[[], str] | None = None,
+        *,
+        taken_at: str | None = None,
+    ) -> Path:
+        """Reserve and return a free target for a file called ``name``.
+
+        ``digest`` is only called for ``on_collision="hash"`` when the
+        rendered name is already taken.
+        """
+        rel = self.render(name, st, taken_at)
+        if self._reserve(rel):
+            return self.root / rel
+        base, ext = os.path.splitext(rel)
+        if self.on_collision == "hash" and digest is not None:
+            rel = f"{base}_{digest()[:12]}{ext}"
+            if self._reserve(rel):
+                return self.root / rel
+        key = os.path.normcase(rel)
+        n = self._next_suffix.get(key, 1)
+        while not self._reserve(f"{base}_{n}{ext}"):
+            n += 1
+        self._next_suffix[key] = n + 1
+        return self.root / f"{base}_{n}{ext}"
+
+    def _reserve(self, rel: str) -> bool:
+        key = os.path.normcase(rel)
+        if key in self._taken:
+            return False
+        self._taken.add(key)
+        return True
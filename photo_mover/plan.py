@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterator
+
+PLAN_VERSION = 1
+
+
+@dataclass
+class PlannedMove:
+    """One file operation decided by the planning pass of ``move_media``.
+
+    ``action`` is ``"move"``, or for content already in the destination
+    ``"skip"``, ``"hardlink"`` (link ``existing`` to ``target``) or
+    ``"delete"``. ``device`` is the source ``st_dev``.
+    """
+
+    source: Path
+    target: Path | None
+    size: int
+    device: int
+    action: str = "move"
+    existing: Path | None = None
+    sha256: str | None = None
+
+
+@dataclass
+class MovePlan:
+    """A reviewable list of planned moves that can be executed later.
+
+    On disk a plan is a JSON header line followed by one JSON array per
+    operation; source and target paths are stored relative to ``src`` and
+    ``dst`` to keep the file small.
+    """
+
+    src: Path
+    dst: Path
+    ops: list[PlannedMove] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.ops)
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(op.size for op in self.ops if op.action == "move")
+
+    def execution_order(self) -> list[tuple[int, PlannedMove]]:
+        """Operations grouped by source device, then source and target
+        directory, so each device works through one directory at a time.
+
+        Hardlinks come last: their ``existing`` file may be the target of a
+        move in the same plan."""
+        return sorted(
+            enumerate(self.ops),
+            key=lambda item: (
+                item[1].action == "hardlink",
+                item[1].device,
+                str(item[1].source.parent),
+                str(item[1].target.parent if item[1].target else ""),
+                item[1].source.name,
+            ),
+        )
+
+    def target_dirs(self) -> list[Path]:
+        return sorted({op.target.parent for op in self.ops if op.target is not None})
+
+    def save(self, path: Path) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            header = {"v": PLAN_VERSION, "src": str(self.src), "dst": str(self.dst)}
+            f.write(json.dumps(header, ensure_ascii=False) + "\n")
+            for op in self.ops:
+                f.write(json.dumps(self._encode(op), ensure_ascii=False) + "\n")
+
+    @classmethod
+    def load(cls, path: Path) -> MovePlan:
+        with open(path, encoding="utf-8") as f:
+            header = json.loads(f.readline())
+            if header.get("v") != PLAN_VERSION:
+                raise ValueError(f"Unsupported plan version: {header.get('v')}")
+            plan = cls(Path(header["src"]), Path(header["dst"]))
+            for line in f:
+                if line.strip():
+                    plan.ops.append(plan._decode(json.loads(line)))
+        return plan
+
+    def _encode(self, op: PlannedMove) -> list:
+        return [
+            op.action,
+            _rel(op.source, self.src),
+            _rel(op.target, self.dst),
+            op.size,
+            op.device,
+            _rel(op.existing, self.dst),
+            op.sha256,
+        ]
+
+    def _decode(self, row: list) -> PlannedMove:
+        action, source, target, size, device, existing, sha256 = row
+        return PlannedMove(
+            source=self.src / source,
+            target=self.dst / target if target is not None else None,
+            size=size,
+            device=device,
+            action=action,
+            existing=self.dst / existing if existing is not None else None,
+            sha256=sha256,
+        )
+
+    def __iter__(self) -> Iterator[PlannedMove]:
+        return iter(self.ops)
+
+
+def _rel(path: Path | None, root: Path) -> str | None:
+    if path is None:
+        return None
+    return os.path.relpath(path, root)
@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import json
+import sys
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, TextIO
+
+if TYPE_CHECKING:
+    from .filters import FileFilter
+
+# Per-file counters, in display order. ``seen`` is files yielded by the
+# walk, ``planned`` files a dry run would move (no bytes counted),
+# ``duplicates`` files skipped, deleted or linked by --on-duplicate.
+COUNTERS = ("seen", "filtered", "hashed", "planned", "moved", "duplicates", "failed")
+
+# Seconds between status lines on a terminal (redrawn in place) and in
+# logs or pipes (one summary line each).
+TTY_INTERVAL = 0.5
+LOG_INTERVAL = 10.0
+
+
+@dataclass
+class DeviceStats:
+    files: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+
+
+class Progress:
+    """Counters, throughput and ETA for a long scan or move.
+
+    The thread driving the run bumps counters with :meth:`add`; a call may
+    also write a status line to ``stream``, at most once per ``interval``
+    seconds (redrawn in place on a terminal, one line per interval
+    otherwise), so the per-file cost is a dict update and a clock read.
+    ``bytes`` are the bytes hashed by a scan or moved by a move. Files
+    rejected by a :class:`~photo_mover.filters.FileFilter` passed to
+    :meth:`watch` count as ``filtered``. An ETA is shown once the totals are
+    known (see :meth:`expect`).
+    """
+
+    def __init__(
+        self,
+        stream: TextIO | None = None,
+        *,
+        interval: float | None = None,
+        render: bool = True,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.stream = sys.stderr if stream is None else stream
+        self._tty = bool(getattr(self.stream, "isatty", lambda: False)())
+        if interval is None:
+            interval = TTY_INTERVAL if self._tty else LOG_INTERVAL
+        self.interval = interval
+        self.render = render
+        self._clock = clock
+        self.started = clock()
+        self._next_line = self.started + interval
+        self._last_width = 0
+        self._finished = False
+        self.counts = dict.fromkeys(COUNTERS, 0)
+        self.bytes = 0
+        self.total_files: int | None = None
+        self.total_bytes: int | None = None
+        self.devices: dict[int, DeviceStats] = {}
+        self._filters: list[FileFilter] = []
+
+    def watch(self, file_filter: FileFilter) -> None:
+        """Report the files ``file_filter`` rejects as ``filtered``."""
+        self._filters.append(file_filter)
+
+    def expect(self, files: int, nbytes: int) -> None:
+        """Set the totals the ETA is computed against."""
+        self.total_files = files
+        self.total_bytes = nbytes
+
+    def add(self, counter: str, n: int = 1, nbytes: int = 0) -> None:
+        self.counts[counter] += n
+        self.bytes += nbytes
+        if self.render and not self._finished:
+            now = self._clock()
+            if now >= self._next_line:
+                self._next_line = now + self.interval
+                self._write(self.format_line(now), final=False)
+
+    def device(self, dev: int, nbytes: int, seconds: float) -> None:
+        """Record one transfer on device ``dev`` (busy time, not wall time)."""
+        stats = self.devices.setdefault(dev, DeviceStats())
+        stats.files += 1
+        stats.bytes += nbytes
+        stats.seconds += seconds
+
+    @property
+    def filtered(self) -> int:
+        return self.counts["filtered"] + sum(f.rejected for f in self._filters)
+
+    @property
+    def done(self) -> int:
+        """Files a move has finished with, successfully or not."""
+        counts = self.counts
+        return (
+            counts["planned"]
+            + counts["moved"]
+            + counts["duplicates"]
+            + counts["failed"]
+        )
+
+    def elapsed(self, now: float | None = None) -> float:
+        return (self._clock() if now is None else now) - self.started
+
+    def eta(self, now: float | None = None) -> float | None:
+        """Seconds left at the current rate, or None without totals."""
+        elapsed = self.elapsed(now)
+        if elapsed <= 0:
+            return None
+        if self.total_bytes and self.bytes:
+            return (self.total_bytes - self.bytes) / (self.bytes / elapsed)
+        if self.total_files and self.done:
+            return (self.total_files - self.done) / (self.done / elapsed)
+        return None
+
+    def format_line(self, now: float | None = None) -> str:
+        elapsed = max(self.elapsed(now), 1e-9)
+        counts = dict(self.counts, filtered=self.filtered)
+        parts = [f"{counts[name]:,} {name}" for name in COUNTERS if counts[name]]
+        files = max(counts["seen"], self.done)
+        line = (
+            f"{', '.join(parts) or 'starting'} | {_size(self.bytes)} "
+            f"({_size(self.bytes / elapsed)}/s, {files / elapsed:,.0f} files/s)"
+        )
+        if self.total_files is not None:
+            line += f" | {self.done:,}/{self.total_files:,}"
+        eta = self.eta(now)
+        if eta is not None:
+            line += f" | ETA {_duration(eta)}"
+        return line + f" | {_duration(elapsed)}"
+
+    def finish(self) -> None:
+        """Write the final status line (once; later calls do nothing)."""
+        if self.render and not self._finished:
+            self._write(self.format_line(), final=True)
+        self._finished = True
+
+    def clear(self) -> None:
+        """Erase the terminal status line so other output can be printed.
+
+        The line is redrawn with the next update. Does nothing unless the
+        stream is a terminal.
+        """
+        if self.render and self._tty and self._last_width:
+            self.stream.write("\r" + " " * self._last_width + "\r")
+            self.stream.flush()
+            self._last_width = 0
+
+    def summary(self) -> dict:
+        elapsed = self.elapsed()
+        counts = dict(self.counts, filtered=self.filtered)
+        return {
+            **counts,
+            "bytes": self.bytes,
+            "elapsed_s": round(elapsed, 3),
+            "files_per_s": (
+                round(max(counts["seen"], self.done) / elapsed, 1)
+                if elapsed > 0
+                else None
+            ),
+            "bytes_per_s": round(self.bytes / elapsed) if elapsed > 0 else None,
+            "total_files": self.total_files,
+            "total_bytes": self.total_bytes,
+            "devices": {
+                str(dev): {
+                    **asdict(stats),
+                    "seconds": round(stats.seconds, 3),
+                    "bytes_per_s": (
+                        round(stats.bytes / stats.seconds) if stats.seconds else None
+                    ),
+                }
+                for dev, stats in sorted(self.devices.items())
+            },
+        }
+
+    def write_json(self, path: Path, **extra) -> None:
+        """Write :meth:`summary` (plus ``extra`` sections) to ``path``."""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({**self.summary(), **extra}, f, indent=2)
+            f.write("\n")
+
+    def _write(self, line: str, *, final: bool) -> None:
+        if self._tty:
+            pad = " " * max(0, self._last_width - len(line))
+            self._last_width = len(line)
+            self.stream.write("\r" + line + pad + ("\n" if final else ""))
+        else:
+            self.stream.write(line + "\n")
+        self.stream.flush()
+
+
+def _size(n: float) -> str:
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if n < 1024:
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+    return f"{n:.1f} TiB"
+
+
+def _duration(seconds: float) -> str:
+    seconds = int(seconds)
+    return f"{seconds // 3600}:{seconds // 60 % 60:02}:{seconds % 60:02}"
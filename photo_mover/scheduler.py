@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Iterable, TypeVar
+
+T = TypeVar("T")
+
+# A queued job: its future, function and arguments.
+_Job = tuple[Future, Callable[..., object], tuple]
+
+
+class DeviceScheduler:
+    """Thread pool that bounds the number of in-flight jobs per device.
+
+    Each job names the devices (``st_dev``) it touches. Jobs wait in one
+    FIFO queue per set of devices and are handed to the pool only once a
+    slot is free on every one of them, so no pool thread ever sits blocked
+    on a busy device: a backlog for a slow card reader leaves the other
+    threads free for devices that still have idle capacity.
+    """
+
+    def __init__(self, jobs: int, per_device: int | None = None):
+        if jobs < 1:
+            raise ValueError(f"jobs must be >= 1: {jobs}")
+        self._pool = ThreadPoolExecutor(max_workers=jobs)
+        self._jobs = jobs
+        self._limit = per_device or jobs
+        self._queues: dict[tuple[int, ...], deque[_Job]] = {}
+        self._busy: dict[int, int] = {}
+        self._running = 0
+        self._idle = threading.Condition()
+
+    def __enter__(self) -> DeviceScheduler:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        with self._idle:
+            self._idle.wait_for(lambda: not self._queues and not self._running)
+        self._pool.shutdown(wait=True)
+
+    def submit(self, devices: Iterable[int], fn: Callable[..., T], *args) -> Future[T]:
+        fut: Future[T] = Future()
+        key = tuple(sorted(set(devices)))
+        with self._idle:
+            queue = self._queues.get(key)
+            if queue is None:
+                queue = self._queues[key] = deque()
+            queue.append((fut, fn, args))
+            self._dispatch()
+        return fut
+
+    def _dispatch(self) -> None:
+        # Called with the lock held: start every queued job whose devices
+        # all have a free slot, oldest first within each device set.
+        for key, queue in list(self._queues.items()):
+            while (
+                queue
+                and self._running < self._jobs
+                and all(self._busy.get(dev, 0) < self._limit for dev in key)
+            ):
+                job = queue.popleft()
+                for dev in key:
+                    self._busy[dev] = self._busy.get(dev, 0) + 1
+                self._running += 1
+                self._pool.submit(self._run, key, job)
+            if not queue:
+                del self._queues[key]
+
+    def _run(self, devices: tuple[int, ...], job: _Job) -> None:
+        fut, fn, args = job
+        try:
+            if fut.set_running_or_notify_cancel():
+                try:
+                    result = fn(*args)
+                except BaseException as e:
+                    fut.set_exception(e)
+                else:
+                    fut.set_result(result)
+        finally:
+            with self._idle:
+                for dev in devices:
+                    self._busy[dev] -= 1
+                self._running -= 1
+                self._dispatch()
+                self._idle.notify_all()
+
+
+def completed(value: T) -> Future[T]:
+    fut: Future[T] = Future()
+    fut.set_result(value)
+    return fut
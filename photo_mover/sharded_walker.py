@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import heapq
+import logging
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterator, Union
+
+from .async_walker import StatEntry
+from .walker import _list_sorted
+
+if TYPE_CHECKING:
+    from .filters import FileFilter
+
+logger = logging.getLogger(__name__)
+
+# Entries a shard visits before it stops descending and hands its remaining
+# subdirectories back as new shards.
+DEFAULT_SHARD_BUDGET = 20_000
+
+# A walked file as sent back by a worker: (path relative to the root,
+# st_mode, st_ino, st_dev, st_size, st_mtime_ns). A plain str in a shard's
+# rows is a subdirectory left for another shard, at its place in the order.
+FileRow = tuple[str, int, int, int, int, int]
+ShardResult = tuple[list[Union[FileRow, str]], int, list[str]]
+
+
+def walk_files_sharded(
+    root: Path,
+    *,
+    workers: int,
+    file_filter: FileFilter | None = None,
+    budget: int = DEFAULT_SHARD_BUDGET,
+) -> Iterator[StatEntry]:
+    """Recursive :func:`~photo_mover.walker.walk_files` on ``workers`` processes.
+
+    The walk starts as one shard for ``root``. A worker walks its shard
+    depth first until it has visited ``budget`` entries; after that it does
+    not descend any further and returns the remaining subdirectories as new
+    shards, which idle workers pick up. A skewed tree is thus split where it
+    is big, without knowing its shape in advance. Files come back in one
+    batch of plain tuples per shard instead of pickled objects.
+
+    Every shard is a contiguous run of the serial walk order, with the
+    subdirectories it handed off marking where their shards belong, so the
+    shards are spliced back together and entries come out exactly as from
+    the serial walk. Queued shards are submitted in walk order (a heap keyed
+    on path components) and at most ``workers * 4`` shards are submitted or
+    waiting to be consumed, so memory stays bounded when the consumer is
+    slower than the walk.
+
+    The yielded entries carry a partial stat: only mode, inode, device,
+    size and mtime are filled in. Unreadable subdirectories and files that
+    vanish before they are stat'ed are logged and skipped; rejections are
+    added to ``file_filter.rejected``.
+    """
+    if workers < 1:
+        raise ValueError(f"workers must be >= 1: {workers}")
+    if budget < 1:
+        raise ValueError(f"budget must be >= 1: {budget}")
+    pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        walk = _ShardedWalk(pool, str(root), file_filter, budget, workers * 4)
+        yield from walk.entries()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+class _ShardedWalk:
+    def __init__(
+        self,
+        pool: ProcessPoolExecutor,
+        root: str,
+        file_filter: FileFilter | None,
+        budget: int,
+        window: int,
+    ):
+        self.pool = pool
+        self.root = root
+        self.prefix = os.path.join(root, "")
+        self.file_filter = file_filter
+        self.budget = budget
+        self.window = window
+        # Shards not submitted yet, smallest walk position first.
+        self._queue: list[tuple[list[str], str]] = []
+        # Submitted shards not consumed yet; _unexpanded are those whose
+        # handed-off subdirectories have not been queued yet.
+        self._futures: dict[str, Future[ShardResult]] = {}
+        self._unexpanded: set[Future[ShardResult]] = set()
+        self._submitted: set[str] = set()
+
+    def entries(self) -> Iterator[StatEntry]:
+        return self._emit("")
+
+    def _emit(self, rel: str) -> Iterator[StatEntry]:
+        fut = self._futures.get(rel) or self._submit(rel)
+        while not fut.done():
+            done, _ = wait(self._unexpanded, return_when=FIRST_COMPLETED)
+            for f in done:
+                self._expand(f)
+        if fut in self._unexpanded:
+            self._expand(fut)
+        del self._futures[rel]
+        self._fill()
+        rows, rejected, warnings = fut.result()
+        if self.file_filter is not None:
+            self.file_filter.rejected += rejected
+        for warning in warnings:
+            logger.warning("%s", warning)
+        for row in rows:
+            if isinstance(row, str):
+                yield from self._emit(row)
+            else:
+                yield _entry(self.prefix, row)
+
+    def _submit(self, rel: str) -> Future[ShardResult]:
+        self._submitted.add(rel)
+        fut = self.pool.submit(
+            _walk_shard, self.root, rel, self.file_filter, self.budget
+        )
+        self._futures[rel] = fut
+        self._unexpanded.add(fut)
+        return fut
+
+    def _expand(self, fut: Future[ShardResult]) -> None:
+        self._unexpanded.discard(fut)
+        if fut.exception() is not None:
+            return  # raised when the shard is consumed
+        for row in fut.result()[0]:
+            if isinstance(row, str):
+                heapq.heappush(self._queue, (row.split(os.sep), row))
+        self._fill()
+
+    def _fill(self) -> None:
+        # A shard needed right away is submitted by _emit even when the
+        # window is full, so the walk cannot stall on queued shards.
+        while self._queue and len(self._futures) < self.window:
+            _, rel = heapq.heappop(self._queue)
+            if rel not in self._submitted:
+                self._submit(rel)
+
+
+def _walk_shard(
+    root: str, rel: str, file_filter: FileFilter | None, budget: int
+) -> ShardResult:
+    """Walk the shard ``rel`` of ``root`` in a worker process."""
+    prefix = len(os.path.join(root, ""))
+    rows: list[FileRow | str] = []
+    warnings: list[str] = []
+    rejected = 0 if file_filter is None else file_filter.rejected
+    start = os.path.join(root, rel) if rel else root
+    try:
+        stack = [iter(_list_sorted(start))]
+    except OSError as e:
+        if not rel:
+            raise
+        return rows, 0, [f"Cannot list {start}: {e}"]
+    visited = 0
+    while stack:
+        entry = next(stack[-1], None)
+        if entry is None:
+            stack.pop()
+            continue
+        visited += 1
+        if entry.is_dir(follow_symlinks=False):
+            sub = entry.path[prefix:]
+            if file_filter is not None and file_filter.prune(entry.name, sub):
+                continue
+            if visited > budget:
+                rows.append(sub)
+                continue
+            try:
+                stack.append(iter(_list_sorted(entry.path)))
+            except OSError as e:
+                warnings.append(f"Cannot list {entry.path}: {e}")
+            continue
+        if not entry.is_file():
+            continue
+        if file_filter is not None and not file_filter.match_name(
+            entry.name, entry.path[prefix:]
+        ):
+            continue
+        try:
+            st = entry.stat()
+        except OSError as e:
+            warnings.append(f"Cannot stat {entry.path}: {e}")
+            continue
+        if file_filter is not None and file_filter.needs_stat:
+            if not file_filter.match_stat(st):
+                continue
+        rows.append(
+            (
+                entry.path[prefix:],
+                st.st_mode,
+                st.st_ino,
+                st.st_dev,
+                st.st_size,
+                st.st_mtime_ns,
+            )
+        )
+    if file_filter is not None:
+        rejected = file_filter.rejected - rejected
+    return rows, rejected, warnings
+
+
+def _entry(prefix: str, row: FileRow) -> StatEntry:
+    rel, mode, ino, dev, size, mtime_ns = row
+    st = os.stat_result(
+        (mode, ino, dev, 1, 0, 0, size, 0, mtime_ns // 10**9, 0),
+        {"st_mtime": mtime_ns / 1e9, "st_mtime_ns": mtime_ns},
+    )
+    return StatEntry(os.path.basename(rel), prefix + rel, st)
@@ -0,0 +1,254 @@
+from __future__ import annotations
+
+import contextlib
+import heapq
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterator, TextIO, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Events kept for the trace file; later spans still count in the summary.
+DEFAULT_MAX_EVENTS = 1_000_000
+# Slowest per-file spans reported at the end of a traced run.
+DEFAULT_SLOW_FILES = 10
+
+_active: Tracer | None = None
+_NO_SPAN = contextlib.nullcontext()
+
+
+@dataclass
+class SpanStats:
+    count: int = 0
+    seconds: float = 0.0
+    max_seconds: float = 0.0
+
+
+class Tracer:
+    """Collects timed spans from every thread as Chrome trace events.
+
+    Spans are complete (``"ph": "X"``) events with microsecond timestamps
+    relative to the tracer's start, one track per thread; the file written
+    by :meth:`write` opens in Perfetto or ``chrome://tracing``. Only the
+    first ``max_events`` spans are kept as events, but every span counts in
+    :meth:`summary`. Spans with a ``path`` argument are per-file; the
+    ``slow_files`` slowest of them are kept for :meth:`slowest`.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_events: int = DEFAULT_MAX_EVENTS,
+        slow_files: int = DEFAULT_SLOW_FILES,
+    ):
+        self.max_events = max_events
+        self.slow_files = slow_files
+        self.started = time.perf_counter_ns()
+        self.events: list[dict] = []
+        self.dropped = 0
+        self.stats: dict[str, SpanStats] = {}
+        self._slowest: list[tuple[float, str, str]] = []
+        self._threads: dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def span(self, name: str, **args) -> Iterator[None]:
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.perf_counter_ns(), args)
+
+    def record(self, name: str, start_ns: int, end_ns: int, args: dict) -> None:
+        """Add a span that ran from ``start_ns`` to ``end_ns`` (perf_counter_ns)."""
+        seconds = (end_ns - start_ns) / 1e9
+        tid = threading.get_ident()
+        with self._lock:
+            stats = self.stats.get(name)
+            if stats is None:
+                stats = self.stats[name] = SpanStats()
+            stats.count += 1
+            stats.seconds += seconds
+            stats.max_seconds = max(stats.max_seconds, seconds)
+            if "path" in args and self.slow_files:
+                item = (seconds, name, str(args["path"]))
+                if len(self._slowest) < self.slow_files:
+                    heapq.heappush(self._slowest, item)
+                elif item > self._slowest[0]:
+                    heapq.heapreplace(self._slowest, item)
+            if tid not in self._threads:
+                self._threads[tid] = threading.current_thread().name
+            if len(self.events) >= self.max_events:
+                self.dropped += 1
+                return
+            self.events.append(
+                {
+                    "name": name,
+                    "ph": "X",
+                    "ts": (start_ns - self.started) / 1000,
+                    "dur": (end_ns - start_ns) / 1000,
+                    "tid": tid,
+                    "args": {k: str(v) for k, v in args.items()},
+                }
+            )
+
+    def slowest(self) -> list[tuple[float, str, str]]:
+        """``(seconds, span name, path)`` of the slowest files, slowest first."""
+        with self._lock:
+            return sorted(self._slowest, reverse=True)
+
+    def summary(self) -> dict:
+        with self._lock:
+            return {
+                name: {
+                    "count": s.count,
+                    "seconds": round(s.seconds, 6),
+                    "max_seconds": round(s.max_seconds, 6),
+                }
+                for name, s in sorted(self.stats.items())
+            }
+
+    def write(self, output: TextIO) -> None:
+        """Write the trace as Chrome trace-event JSON."""
+        pid = os.getpid()
+        with self._lock:
+            events = [
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": pid,
+                    "tid": tid,
+                    "args": {"name": name},
+                }
+                for tid, name in self._threads.items()
+            ]
+            events += [dict(event, cat="photo_mover", pid=pid) for event in self.events]
+            dropped = self.dropped
+        json.dump(
+            {
+                "traceEvents": events,
+                "displayTimeUnit": "ms",
+                "otherData": {
+                    "dropped_events": dropped,
+                    "summary": self.summary(),
+                    "slowest_files": [
+                        {"seconds": round(s, 6), "span": name, "path": path}
+                        for s, name, path in self.slowest()
+                    ],
+                },
+            },
+            output,
+        )
+        output.write("\n")
+
+
+def span(name: str, **args) -> contextlib.AbstractContextManager:
+    """Time the ``with`` block as span ``name`` on the active tracer.
+
+    Without an active tracer this returns a shared no-op context manager,
+    so a span costs a call and an empty ``with`` (a few hundred ns); use
+    :func:`traced` in loops where even that matters. Pass ``path=`` for
+    per-file spans. Spans in process-pool workers are not recorded.
+    """
+    tracer = _active
+    if tracer is None:
+        return _NO_SPAN
+    return tracer.span(name, **args)
+
+
+def traced(name: str, fn: Callable[..., T]) -> Callable[..., T]:
+    """``fn`` timed as span ``name`` on every call while tracing is active.
+
+    Without an active tracer ``fn`` itself is returned, so per-item calls
+    in a hot loop cost nothing; wrap once before the loop.
+    """
+    tracer = _active
+    if tracer is None:
+        return fn
+
+    def call(*args, **kwargs):
+        start = time.perf_counter_ns()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            tracer.record(name, start, time.perf_counter_ns(), {})
+
+    return call
+
+
+def active() -> Tracer | None:
+    return _active
+
+
+@contextlib.contextmanager
+def tracing(path: Path, **options) -> Iterator[Tracer]:
+    """Trace the ``with`` block and write the trace to ``path`` at the end.
+
+    A summary per span name and the slowest files are logged as well.
+    """
+    global _active
+    if _active is not None:
+        raise RuntimeError("Tracing is already active")
+    tracer = _active = Tracer(**options)
+    try:
+        yield tracer
+    finally:
+        _active = None
+        with open(path, "w") as f:
+            tracer.write(f)
+        for name, s in tracer.summary().items():
+            logger.info(
+                "trace: %s: %d spans, %.3f s total, %.3f s max",
+                name,
+                s["count"],
+                s["seconds"],
+                s["max_seconds"],
+            )
+        for seconds, name, file in tracer.slowest():
+            logger.info("slow file: %.3f s %s %s", seconds, name, file)
+        if tracer.dropped:
+            logger.warning(
+                "trace: %d spans beyond the first %d were not written to %s",
+                tracer.dropped,
+                tracer.max_events,
+                path,
+            )
+
+
+@contextlib.contextmanager
+def profiling(path: Path, *, top: int = 20) -> Iterator[None]:
+    """Run the ``with`` block under cProfile and tracemalloc.
+
+    The profile is saved to ``path`` (pstats format, e.g. for ``snakeviz``);
+    the ``top`` functions by cumulative time, the allocation sites holding
+    the most memory at the end and the peak traced memory are logged.
+    """
+    import cProfile
+    import io
+    import pstats
+    import tracemalloc
+
+    profiler = cProfile.Profile()
+    tracemalloc.start()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        profiler.dump_stats(str(path))
+        text = io.StringIO()
+        pstats.Stats(profiler, stream=text).sort_stats("cumulative").print_stats(top)
+        logger.info("profile written to %s\n%s", path, text.getvalue().rstrip())
+        logger.info("tracemalloc: peak %.1f MiB", peak / (1 << 20))
+        for stat in snapshot.statistics("lineno")[:top]:
+            logger.info("tracemalloc: %s", stat)
@@ -0,0 +1,236 @@
+from __future__ import annotations
+
+import errno
+import hashlib
+import os
+import shutil
+from dataclasses import dataclass
+from pathlib import Path
+
+from .hashing import compute_sha256
+
+# Large enough that a multi-GB video needs only a few hundred syscalls.
+COPY_BUFFER_SIZE = 8 * 1024 * 1024
+
+# errno values meaning "this copy primitive does not work here", as opposed
+# to a real I/O error that should abort the transfer.
+_UNSUPPORTED = {
+    errno.ENOSYS,
+    errno.EXDEV,
+    errno.EINVAL,
+    errno.EOPNOTSUPP,
+    errno.ENOTSUP,
+    errno.EBADF,
+}
+
+
+# errno values of os.link meaning "cannot hardlink here" (no hard link
+# support on the filesystem, or too many links).
+_NO_HARDLINKS = {
+    errno.EPERM,
+    errno.EOPNOTSUPP,
+    errno.ENOTSUP,
+    errno.ENOSYS,
+    errno.EMLINK,
+}
+
+
+class VerificationError(OSError):
+    """The copied data does not match the source or the trusted digest."""
+
+
+@dataclass
+class TransferResult:
+    source: Path
+    target: Path
+    method: str
+    size: int
+    sha256: str | None = None
+
+
+def partial_path(target: Path) -> Path:
+    """Temporary name a cross-device copy is written to before the rename."""
+    return target.with_name(f".{target.name}.partial")
+
+
+def transfer_file(
+    src: Path,
+    target: Path,
+    *,
+    buffer_size: int = COPY_BUFFER_SIZE,
+    verify: bool = False,
+    expected: str | None = None,
+) -> TransferResult:
+    """Move ``src`` to ``target``, letting the kernel copy when possible.
+
+    Tries ``os.rename`` first; across filesystems the data is copied with
+    ``copy_file_range``, ``sendfile`` or a ``readinto`` loop (first one that
+    works) into a partial file, which is fsynced, given the source metadata
+    and linked to ``target`` before the partial file and the source are
+    unlinked. An existing ``target`` is never replaced: FileExistsError is
+    raised instead, also when it appears while the data is being copied.
+
+    With ``verify`` the copy goes through the ``readinto`` loop and hashes
+    the source bytes as they are written. The digest is checked against
+    ``expected`` when given, otherwise against a readback of the written
+    file, before the source is removed; a mismatch raises
+    :class:`VerificationError` and leaves the source in place. A rename
+    cannot be undone that way, so on the same device the source is hashed
+    and checked against ``expected`` before it is renamed.
+    """
+    src = Path(src)
+    target = Path(target)
+    if os.path.lexists(target):
+        raise _exists(target)
+    digest = None
+    if verify and expected is not None and _same_device(src, target.parent):
+        digest = compute_sha256(src)
+        _check(src, digest, expected)
+    try:
+        os.rename(src, target)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+    else:
+        size = target.lstat().st_size
+        if verify and digest is None:
+            # Renaming does not touch the data, so one read of the moved file
+            # is enough to produce the digest.
+            digest = compute_sha256(target)
+        return TransferResult(src, target, "rename", size, digest)
+
+    if src.is_symlink():
+        shutil.move(str(src), str(target))
+        return TransferResult(src, target, "symlink", 0)
+
+    tmp = partial_path(target)
+    digest = None
+    try:
+        with open(src, "rb") as fin, open(tmp, "wb") as fout:
+            size = os.fstat(fin.fileno()).st_size
+            if verify:
+                digest = copy_and_hash(fin, fout, buffer_size=buffer_size)
+                method = "readinto"
+            else:
+                method = copy_data(fin, fout, size, buffer_size=buffer_size)
+            fout.flush()
+            shutil.copystat(src, tmp)
+            os.fsync(fout.fileno())
+            if verify and expected is None:
+                _drop_cache(fout.fileno())
+        if verify:
+            if expected is None:
+                expected = compute_sha256(tmp)
+            _check(src, digest, expected)
+        _install(tmp, target)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    _fsync_dir(target.parent)
+    os.unlink(src)
+    return TransferResult(src, target, method, size, digest)
+
+
+def _install(tmp: Path, target: Path) -> None:
+    # os.replace would silently overwrite a file created at the target
+    # after it was planned; link(2) fails with EEXIST instead.
+    try:
+        os.link(tmp, target, follow_symlinks=False)
+    except OSError as e:
+        if e.errno not in _NO_HARDLINKS:
+            raise
+        if os.path.lexists(target):
+            raise _exists(target) from None
+        os.rename(tmp, target)
+    else:
+        os.unlink(tmp)
+
+
+def _same_device(src: Path, directory: Path) -> bool:
+    try:
+        return os.lstat(src).st_dev == os.stat(directory).st_dev
+    except OSError:
+        return False
+
+
+def _exists(target: Path) -> FileExistsError:
+    return FileExistsError(errno.EEXIST, "Target already exists", str(target))
+
+
+def copy_and_hash(fin, fout, *, buffer_size: int = COPY_BUFFER_SIZE) -> str:
+    """Copy ``fin`` to ``fout`` and return the SHA-256 of the bytes copied."""
+    h = hashlib.sha256()
+    buf = bytearray(buffer_size)
+    view = memoryview(buf)
+    while n := fin.readinto(buf):
+        chunk = view[:n]
+        h.update(chunk)
+        fout.write(chunk)
+    return h.hexdigest()
+
+
+def _check(path: Path, digest: str, expected: str | None) -> None:
+    if expected is not None and digest != expected:
+        raise VerificationError(
+            f"Checksum mismatch for {path}: got {digest}, expected {expected}"
+        )
+
+
+def _drop_cache(fd: int) -> None:
+    # Make the readback come from the device rather than the page cache.
+    if hasattr(os, "posix_fadvise"):
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        except OSError:
+            pass
+
+
+def copy_data(fin, fout, size: int, *, buffer_size: int = COPY_BUFFER_SIZE) -> str:
+    """Copy ``size`` bytes between open files; return the method used."""
+    in_fd, out_fd = fin.fileno(), fout.fileno()
+    if size > 0 and hasattr(os, "copy_file_range"):
+        if _kernel_copy(os.copy_file_range, in_fd, out_fd, size, buffer_size):
+            return "copy_file_range"
+    if size > 0 and hasattr(os, "sendfile"):
+        if _kernel_copy(_sendfile, in_fd, out_fd, size, buffer_size):
+            return "sendfile"
+    buf = bytearray(buffer_size)
+    view = memoryview(buf)
+    while n := fin.readinto(buf):
+        fout.write(view[:n])
+    return "readinto"
+
+
+def _sendfile(in_fd: int, out_fd: int, count: int) -> int:
+    return os.sendfile(out_fd, in_fd, None, count)
+
+
+def _kernel_copy(copy, in_fd: int, out_fd: int, size: int, chunk: int) -> bool:
+    copied = 0
+    while True:
+        try:
+            n = copy(in_fd, out_fd, chunk)
+        except OSError as e:
+            # Only fall back if nothing was written yet; a failure halfway
+            # through is a genuine I/O error.
+            if copied == 0 and e.errno in _UNSUPPORTED:
+                return False
+            raise
+        if n == 0:
+            # copy_file_range can report 0 on filesystems that do not
+            # support it (e.g. some FUSE/procfs files) before any data moved.
+            return copied > 0 or size == 0
+        copied += n
+
+
+def _fsync_dir(path: Path) -> None:
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
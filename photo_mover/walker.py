@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import logging
+import os
+from operator import attrgetter
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterator
+
+from .tracing import span
+
+if TYPE_CHECKING:
+    from .filters import FileFilter
+
+logger = logging.getLogger(__name__)
+
+_by_name = attrgetter("name")
+
+
+def walk_files(
+    root: Path,
+    *,
+    recursive: bool = False,
+    file_filter: FileFilter | None = None,
+    concurrency: int = 1,
+    workers: int = 1,
+) -> Iterator[os.DirEntry]:
+    """Yield ``os.DirEntry`` objects for the files under ``root``.
+
+    Entries come out in the same order as ``sorted(root.rglob("*"))`` but
+    only one directory listing per tree level is held in memory. Directory
+    symlinks are not followed; unreadable subdirectories are logged and
+    skipped. With ``file_filter`` only matching files are yielded and
+    pruned directories are not listed at all.
+
+    With ``concurrency > 1`` the walk is delegated to
+    :func:`~photo_mover.async_walker.walk_files_concurrent`, which keeps that
+    many listings and stats in flight (for network mounts) and yields
+    entries with their stat prefetched, in the same order.
+
+    A recursive walk with ``workers > 1`` is split into shards walked on
+    that many processes (see
+    :func:`~photo_mover.sharded_walker.walk_files_sharded`), again in the
+    same order.
+    """
+    if concurrency > 1 and workers > 1:
+        raise ValueError("concurrency and workers cannot both be > 1")
+    if workers > 1 and recursive:
+        from .sharded_walker import walk_files_sharded
+
+        yield from walk_files_sharded(root, workers=workers, file_filter=file_filter)
+        return
+    if concurrency > 1:
+        from .async_walker import walk_files_concurrent
+
+        yield from walk_files_concurrent(
+            root, recursive=recursive, concurrency=concurrency, file_filter=file_filter
+        )
+        return
+    prefix = len(os.path.join(root, ""))
+    stack = [iter(_list_sorted(root))]
+    while stack:
+        entry = next(stack[-1], None)
+        if entry is None:
+            stack.pop()
+            continue
+        if entry.is_dir(follow_symlinks=False):
+            if recursive and not (
+                file_filter is not None
+                and file_filter.prune(entry.name, entry.path[prefix:])
+            ):
+                try:
+                    stack.append(iter(_list_sorted(entry.path)))
+                except OSError as e:
+                    logger.warning("Cannot list %s: %s", entry.path, e)
+            continue
+        if not entry.is_file():
+            continue
+        if file_filter is not None:
+            if not file_filter.match_name(entry.name, entry.path[prefix:]):
+                continue
+            if file_filter.needs_stat:
+                try:
+                    if not file_filter.match_stat(entry.stat()):
+                        continue
+                except OSError as e:
+                    logger.warning("Cannot stat %s: %s", entry.path, e)
+                    continue
+        yield entry
+
+
+def _list_sorted(path: str | Path) -> list[os.DirEntry]:
+    with span("list", dir=path), os.scandir(path) as it:
+        return sorted(it, key=_by_name)
+
+
+def extension_of(name: str) -> str:
+    """Lower-cased extension without the dot, matching ``Path.suffix``."""
+    return os.path.splitext(name)[1][1:].lower()
@@ -0,0 +1,311 @@
+from __future__ import annotations
+
+import ctypes
+import errno
+import logging
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Iterator
+
+from .mover import BatchMover
+
+logger = logging.getLogger(__name__)
+
+# inotify(7) event bits and flags.
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_DONT_FOLLOW = 0x02000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+# Events watched on every source directory: files finished being written
+# or moved in, and new subdirectories.
+WATCH_MASK = (
+    IN_CLOSE_WRITE
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE_SELF
+    | IN_MOVE_SELF
+    | IN_ONLYDIR
+    | IN_DONT_FOLLOW
+)
+
+DEFAULT_DEBOUNCE = 2.0
+DEFAULT_RECONCILE_INTERVAL = 300.0
+# A steady stream of events still gets a batch moved this often.
+MAX_BATCH_DELAY = 30.0
+# Wake-up interval while waiting, when a ``stop`` callback has to be polled.
+STOP_POLL_INTERVAL = 0.5
+
+_EVENT = struct.Struct("iIII")
+_READ_SIZE = 64 * 1024
+
+
+class Inotify:
+    """Minimal inotify(7) binding through ctypes (Linux only)."""
+
+    def __init__(self):
+        if not sys.platform.startswith("linux"):
+            raise OSError(errno.ENOSYS, "inotify is only available on Linux")
+        libc = ctypes.CDLL(None, use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [
+            ctypes.c_int,
+            ctypes.c_char_p,
+            ctypes.c_uint32,
+        ]
+        libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        self._libc = libc
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise _last_error("inotify_init1")
+        self._poll = select.poll()
+        self._poll.register(self.fd, select.POLLIN)
+
+    def __enter__(self) -> Inotify:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def add_watch(self, path: str | Path, mask: int = WATCH_MASK) -> int:
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            raise _last_error(str(path))
+        return wd
+
+    def rm_watch(self, wd: int) -> None:
+        self._libc.inotify_rm_watch(self.fd, wd)
+
+    def read(self, timeout: float | None = None) -> list[tuple[int, int, str]]:
+        """Wait up to ``timeout`` seconds and return ``(wd, mask, name)`` events."""
+        ms = None if timeout is None else max(0, int(timeout * 1000))
+        if not self._poll.poll(ms):
+            return []
+        events = []
+        while True:
+            try:
+                data = os.read(self.fd, _READ_SIZE)
+            except BlockingIOError:
+                return events
+            pos = 0
+            while pos < len(data):
+                wd, mask, _, length = _EVENT.unpack_from(data, pos)
+                pos += _EVENT.size
+                name = os.fsdecode(data[pos : pos + length].rstrip(b"\0"))
+                pos += length
+                events.append((wd, mask, name))
+
+    def close(self) -> None:
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+def _last_error(context: str) -> OSError:
+    code = ctypes.get_errno()
+    return OSError(code, os.strerror(code), context)
+
+
+def watch_media(
+    src: Path,
+    dst: Path,
+    *,
+    recursive: bool = False,
+    debounce: float = DEFAULT_DEBOUNCE,
+    reconcile_interval: float = DEFAULT_RECONCILE_INTERVAL,
+    on_batch: Callable[[list[Path]], None] | None = None,
+    stop: Callable[[], bool] | None = None,
+    **options,
+) -> None:
+    """Move media from ``src`` to ``dst`` as files arrive, until ``stop()``.
+
+    Everything already in ``src`` is moved first. After that, files are
+    queued when they are closed after writing or moved into ``src`` (Linux
+    inotify; a new subdirectory is watched and scanned as soon as it
+    appears), and moved in one batch once no event has arrived for
+    ``debounce`` seconds (or after :data:`MAX_BATCH_DELAY` under a steady
+    stream). Every ``reconcile_interval`` seconds, and whenever the kernel
+    event queue overflows, ``src`` is walked again to pick up anything
+    missed; scanned files modified within ``debounce`` seconds are left
+    for later. Without inotify only the periodic scans run. While idle the
+    process sleeps in ``poll``.
+
+    ``options`` are passed to :class:`~photo_mover.mover.BatchMover`
+    (``dry_run``, ``layout``, ``on_duplicate`` ...); ``on_batch`` receives
+    the targets of every non-empty batch.
+    """
+    if debounce < 0 or reconcile_interval <= 0:
+        raise ValueError("debounce must be >= 0 and reconcile_interval > 0")
+    src = Path(src)
+    if not src.is_dir():
+        raise FileNotFoundError(f"Source not found: {src}")
+    mover = BatchMover(src, dst, recursive=recursive, **options)
+    try:
+        inotify = Inotify()
+    except OSError as e:
+        logger.warning("inotify unavailable (%s); falling back to periodic scans", e)
+        inotify = None
+    watcher = _Watcher(mover, inotify, debounce, reconcile_interval, on_batch, stop)
+    try:
+        watcher.run()
+    finally:
+        if inotify is not None:
+            inotify.close()
+
+
+class _Watcher:
+    def __init__(
+        self,
+        mover: BatchMover,
+        inotify: Inotify | None,
+        debounce: float,
+        reconcile_interval: float,
+        on_batch: Callable[[list[Path]], None] | None,
+        stop: Callable[[], bool] | None,
+    ):
+        self.mover = mover
+        self.inotify = inotify
+        self.debounce = debounce
+        self.reconcile_interval = reconcile_interval
+        self.on_batch = on_batch
+        self.stop = stop
+        self._dirs: dict[int, str] = {}
+        # path -> True when an event says the file is complete, False when
+        # it was only found by scanning a new directory.
+        self._pending: dict[str, bool] = {}
+        self._first_event = self._last_event = 0.0
+        self._next_reconcile = 0.0
+        self._overflow = False
+
+    def run(self) -> None:
+        if self.inotify is not None:
+            self._watch_tree(str(self.mover.src))
+        self._reconcile()
+        while not (self.stop is not None and self.stop()):
+            events = self._wait(self._timeout())
+            now = time.monotonic()
+            for wd, mask, name in events:
+                self._handle(wd, mask, name, now)
+            if self._pending and (
+                now - self._last_event >= self.debounce
+                or now - self._first_event >= MAX_BATCH_DELAY
+            ):
+                self._flush()
+            if self._overflow or now >= self._next_reconcile:
+                self._reconcile()
+
+    def _timeout(self) -> float:
+        now = time.monotonic()
+        deadline = self._next_reconcile
+        if self._pending:
+            deadline = min(
+                deadline,
+                self._last_event + self.debounce,
+                self._first_event + MAX_BATCH_DELAY,
+            )
+        timeout = max(0.0, deadline - now)
+        if self.stop is not None:
+            timeout = min(timeout, STOP_POLL_INTERVAL)
+        return timeout
+
+    def _wait(self, timeout: float) -> list[tuple[int, int, str]]:
+        if self.inotify is None:
+            time.sleep(timeout)
+            return []
+        return self.inotify.read(timeout)
+
+    def _handle(self, wd: int, mask: int, name: str, now: float) -> None:
+        if mask & IN_Q_OVERFLOW:
+            logger.warning("inotify queue overflowed; rescanning %s", self.mover.src)
+            self._overflow = True
+            return
+        directory = self._dirs.get(wd)
+        if mask & IN_IGNORED:
+            self._dirs.pop(wd, None)
+            return
+        if directory is None:
+            return
+        if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+            logger.warning("Watched directory %s was removed or moved", directory)
+            return
+        path = os.path.join(directory, name)
+        if mask & IN_ISDIR:
+            if self.mover.recursive and not self._pruned(path):
+                self._watch_tree(path)
+                for found in _files_under(path):
+                    self._queue(found, False, now)
+            return
+        if mask & (IN_CLOSE_WRITE | IN_MOVED_TO):
+            self._queue(path, True, now)
+
+    def _queue(self, path: str, complete: bool, now: float) -> None:
+        if not self._pending:
+            self._first_event = now
+        self._last_event = now
+        self._pending[path] = self._pending.get(path, False) or complete
+
+    def _flush(self) -> None:
+        complete = [Path(p) for p, done in self._pending.items() if done]
+        scanned = [Path(p) for p, done in self._pending.items() if not done]
+        self._pending.clear()
+        moved = self.mover.move(complete)
+        if scanned:
+            moved += self.mover.move(scanned, settle=self.debounce)
+        self._report(moved)
+
+    def _reconcile(self) -> None:
+        self._overflow = False
+        self._next_reconcile = time.monotonic() + self.reconcile_interval
+        try:
+            self._report(self.mover.move(settle=self.debounce))
+        except OSError:
+            logger.exception("Rescan of %s failed", self.mover.src)
+
+    def _report(self, moved: list[Path]) -> None:
+        if moved and self.on_batch is not None:
+            self.on_batch(moved)
+
+    def _watch_tree(self, root: str) -> None:
+        stack = [root]
+        while stack:
+            path = stack.pop()
+            try:
+                self._dirs[self.inotify.add_watch(path)] = path
+            except OSError as e:
+                # ENOSPC: fs.inotify.max_user_watches reached; the periodic
+                # scans still cover the directory.
+                logger.warning("Cannot watch %s: %s", path, e)
+                continue
+            if not self.mover.recursive:
+                continue
+            try:
+                with os.scandir(path) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False) and not self._pruned(
+                            entry.path
+                        ):
+                            stack.append(entry.path)
+            except OSError as e:
+                logger.warning("Cannot list %s: %s", path, e)
+
+    def _pruned(self, path: str) -> bool:
+        rel = os.path.relpath(path, self.mover.src)
+        return self.mover.file_filter.prune(os.path.basename(path), rel)
+
+
+def _files_under(root: str) -> Iterator[str]:
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            yield os.path.join(dirpath, name)
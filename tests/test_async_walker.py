@@ -0,0 +1,95 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+from photo_mover.async_walker import awalk_files, walk_files_concurrent
+from photo_mover.csv_exporter import scan_media
+from photo_mover.filters import FileFilter
+from photo_mover.walker import walk_files
+
+
+def create_file(path, content=b"x"):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    return path
+
+
+def make_tree(root):
+    for rel in ["b.jpg", "a/z.jpg", "a/b/c.png", "a.jpg", "c/readme.txt", "c/d/e.mp4"]:
+        create_file(root / rel, rel.encode())
+    (root / "empty").mkdir()
+
+
+def test_same_order_as_walk_files(tmp_path):
+    """逐次版と同じ順序・同じ stat を返す"""
+    make_tree(tmp_path)
+
+    serial = [(e.path, e.stat().st_size) for e in walk_files(tmp_path, recursive=True)]
+    concurrent = [
+        (e.path, e.stat().st_size)
+        for e in walk_files_concurrent(tmp_path, recursive=True, concurrency=4)
+    ]
+
+    assert concurrent == serial
+
+
+def test_async_for_api(tmp_path):
+    """async for で列挙できる（非再帰・フィルタ付き）"""
+    make_tree(tmp_path)
+
+    async def collect():
+        return [
+            e.name
+            async for e in awalk_files(
+                tmp_path, file_filter=FileFilter(extensions=["jpg"])
+            )
+        ]
+
+    assert asyncio.run(collect()) == ["a.jpg", "b.jpg"]
+
+
+def test_stats_are_concurrent(tmp_path, monkeypatch):
+    """stat が並行に発行される（遅延を挿入して確認）"""
+    for i in range(8):
+        create_file(tmp_path / f"{i}.jpg")
+    real_stat = os.stat
+
+    def slow_stat(path, *args, **kwargs):
+        time.sleep(0.1)
+        return real_stat(path, *args, **kwargs)
+
+    monkeypatch.setattr(os, "stat", slow_stat)
+    start = time.perf_counter()
+    entries = list(walk_files_concurrent(tmp_path, concurrency=8))
+    elapsed = time.perf_counter() - start
+
+    assert len(entries) == 8
+    assert elapsed < 0.5
+
+
+def test_early_exit_and_invalid_concurrency(tmp_path):
+    """途中で打ち切っても後始末され、concurrency < 1 はエラー"""
+    make_tree(tmp_path)
+    it = walk_files_concurrent(tmp_path, recursive=True, concurrency=2)
+    assert next(it).name == "c.png"
+    it.close()
+
+    with pytest.raises(ValueError):
+        list(walk_files_concurrent(tmp_path, concurrency=0))
+
+
+def test_scan_media_io_concurrency(tmp_path):
+    """scan_media の結果は io_concurrency によらず同じ"""
+    make_tree(tmp_path)
+
+    serial = list(scan_media(tmp_path, recursive=True, extensions=["jpg", "png"]))
+    concurrent = list(
+        scan_media(
+            tmp_path, recursive=True, extensions=["jpg", "png"], io_concurrency=4
+        )
+    )
+
+    assert concurrent == serial
+    assert [r.filename for r in serial] == ["c.png", "z.jpg", "a.jpg", "b.jpg"]
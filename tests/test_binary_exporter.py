@@ -0,0 +1,157 @@
+import dataclasses
+import hashlib
+import io
+
+import pytest
+
+from photo_mover.binary_exporter import (
+    iter_batches,
+    read_binary,
+    read_records,
+    write_binary,
+    write_records,
+)
+from photo_mover.csv_exporter import MediaFileInfo, scan_media
+
+
+def create_file(path, content=b"x"):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    return path
+
+
+def sample(n, with_hash=True):
+    return [
+        MediaFileInfo(
+            filename=f"写真_{i}.jpg",
+            extension="jpg",
+            relative_path=f"d{i % 3}/写真_{i}.jpg",
+            size_bytes=2**40 + i,
+            sha256=(
+                hashlib.sha256(str(i).encode()).hexdigest()
+                if with_hash and i % 2
+                else None
+            ),
+        )
+        for i in range(n)
+    ]
+
+
+def test_binary_round_trip_with_hash():
+    """バイナリ形式で書き出したレコードをそのまま読み戻せる"""
+    records = sample(10)
+    buf = io.BytesIO()
+
+    write_binary(records, buf, include_hash=True, batch_rows=3)
+    buf.seek(0)
+
+    assert list(read_binary(buf)) == records
+
+
+def test_binary_round_trip_without_hash():
+    """ハッシュ列なしでも往復できる"""
+    records = sample(5, with_hash=False)
+    buf = io.BytesIO()
+
+    write_binary(records, buf)
+    buf.seek(0)
+
+    assert list(read_binary(buf)) == records
+
+
+def test_binary_stores_raw_digests():
+    """ダイジェストは 16 進文字列ではなく 32 バイトで格納される"""
+    records = sample(100)
+    with_hash, without_hash = io.BytesIO(), io.BytesIO()
+
+    write_binary(records, with_hash, include_hash=True)
+    write_binary(records, without_hash)
+
+    assert len(with_hash.getvalue()) - len(without_hash.getvalue()) == 100 * 33
+
+
+def test_binary_empty_and_truncated():
+    """空のリストは読めて、途中で切れたファイルはエラーになる"""
+    buf = io.BytesIO()
+    write_binary([], buf)
+    assert list(read_binary(io.BytesIO(buf.getvalue()))) == []
+
+    buf = io.BytesIO()
+    write_binary(sample(4), buf, include_hash=True)
+    with pytest.raises(ValueError):
+        list(read_binary(io.BytesIO(buf.getvalue()[:-10])))
+    with pytest.raises(ValueError):
+        list(read_binary(io.BytesIO(b"PK\x03\x04....")))
+
+
+@pytest.mark.parametrize("fmt", ["binary", "arrow"])
+def test_rejects_non_sha256_digests(fmt):
+    """SHA-256 以外のダイジェストは壊れたファイルを書かずに ValueError"""
+    if fmt == "arrow":
+        pytest.importorskip("pyarrow")
+    records = sample(2)
+    records[1] = dataclasses.replace(
+        records[1], sha256=hashlib.blake2b(b"x").hexdigest()
+    )
+
+    with pytest.raises(ValueError, match="Not a SHA-256 digest"):
+        write_records(records, io.BytesIO(), format=fmt, include_hash=True)
+
+
+def test_binary_writes_batches_while_scanning():
+    """全件を溜めずにバッチ単位で書き出す"""
+    buf = io.BytesIO()
+    sizes = []
+
+    def records():
+        for info in sample(7):
+            sizes.append(len(buf.getvalue()))
+            yield info
+
+    write_binary(records(), buf, batch_rows=2)
+
+    assert sizes[2] > sizes[0]
+    assert sizes[6] > sizes[4]
+
+
+def test_iter_batches():
+    """指定行数ごとに分割する"""
+    assert [len(b) for b in iter_batches(range(5), 2)] == [2, 2, 1]
+    with pytest.raises(ValueError):
+        list(iter_batches([], 0))
+
+
+def test_read_records_from_scan(tmp_path):
+    """scan_media の結果をファイル経由で読み戻す（形式は自動判定）"""
+    src = tmp_path / "src"
+    create_file(src / "a.jpg", b"a")
+    create_file(src / "sub" / "b.png", b"bb")
+    out = tmp_path / "listing.bin"
+
+    with open(out, "wb") as f:
+        write_records(
+            scan_media(src, recursive=True, include_hash=True), f, include_hash=True
+        )
+
+    assert list(read_records(out)) == list(
+        scan_media(src, recursive=True, include_hash=True)
+    )
+
+
+@pytest.mark.parametrize("fmt", ["arrow", "parquet"])
+def test_arrow_round_trip(tmp_path, fmt):
+    """pyarrow がある場合は Arrow IPC / Parquet でも往復できる"""
+    pytest.importorskip("pyarrow")
+    records = sample(10)
+    out = tmp_path / f"listing.{fmt}"
+
+    with open(out, "wb") as f:
+        write_records(records, f, format=fmt, include_hash=True, batch_rows=4)
+
+    assert list(read_records(out)) == records
+
+
+def test_unknown_format():
+    """未知の形式は ValueError"""
+    with pytest.raises(ValueError):
+        write_records([], io.BytesIO(), format="xml")
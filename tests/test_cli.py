@@ -1,3 +1,6 @@
+import hashlib
+import json
+import sys
 from pathlib import Path
 
 import pytest
@@ -83,3 +86,476 @@ def test_cli_csv_with_extensions(tmp_path, capsys):
     lines = captured.out.strip().split("\n")
     assert len(lines) == 3  # header + 2 data rows
     assert "b.png" not in captured.out
+
+
+def test_cli_csv_hash_workers(tmp_path, capsys):
+    """--hash-workers で並列ハッシュしても出力は同じ"""
+    src = tmp_path / "photos"
+    create_file(src / "a.jpg", b"1")
+    create_file(src / "b.jpg", b"2")
+
+    main(["--src", str(src), "--csv", "--csv-include-hash"])
+    serial = capsys.readouterr().out
+    main(["--src", str(src), "--csv", "--csv-include-hash", "--hash-workers", "3"])
+    parallel = capsys.readouterr().out
+
+    assert parallel == serial
+
+
+def test_cli_invalid_hash_workers(tmp_path):
+    """--hash-workers 0 はエラー"""
+    src = tmp_path / "photos"
+    src.mkdir()
+
+    with pytest.raises(SystemExit):
+        main(["--src", str(src), "--csv", "--csv-include-hash", "--hash-workers", "0"])
+
+
+def test_cli_hash_cache(tmp_path, capsys):
+    """--hash-cache 指定時も出力は変わらずキャッシュファイルが作られる"""
+    src = tmp_path / "photos"
+    create_file(src / "a.jpg", b"1")
+    db = tmp_path / "cache.db"
+
+    main(["--src", str(src), "--csv", "--csv-include-hash", "--hash-cache", str(db)])
+    first = capsys.readouterr().out
+    main(["--src", str(src), "--csv", "--csv-include-hash", "--hash-cache", str(db)])
+    second = capsys.readouterr().out
+
+    assert db.exists()
+    assert first == second
+
+
+def test_cli_hash_cache_requires_hash(tmp_path):
+    """--csv-include-hash なしで --hash-cache はエラー"""
+    src = tmp_path / "photos"
+    src.mkdir()
+
+    with pytest.raises(SystemExit):
+        main(["--src", str(src), "--csv", "--hash-cache", str(tmp_path / "c.db")])
+
+
+def test_cli_csv_stream(tmp_path, capsys):
+    """--stream でも出力内容は同じ"""
+    src = tmp_path / "photos"
+    create_file(src / "a.jpg", b"1")
+    create_file(src / "sub" / "b.jpg", b"2")
+
+    main(["--src", str(src), "--csv", "--recursive"])
+    normal = capsys.readouterr().out
+    main(["--src", str(src), "--csv", "--recursive", "--stream"])
+    streamed = capsys.readouterr().out
+
+    assert streamed == normal
+
+
+def test_cli_stream_requires_csv(tmp_path):
+    """--csv なしで --stream はエラー"""
+    with pytest.raises(SystemExit):
+        main(["--src", str(tmp_path), "--dst", str(tmp_path / "d"), "--stream"])
+
+
+def test_cli_find_duplicates(tmp_path, capsys):
+    """--find-duplicates で重複グループを出力する (--dst 不要)"""
+    src = tmp_path / "photos"
+    create_file(src / "a.jpg", b"same")
+    create_file(src / "b.jpg", b"same")
+    create_file(src / "c.jpg", b"diff")
+
+    main(["--src", str(src), "--find-duplicates", "--duplicates-format", "json"])
+
+    captured = capsys.readouterr()
+    assert '"a.jpg"' in captured.out
+    assert '"c.jpg"' not in captured.out
+
+
+def test_cli_moves_files(tmp_path, capsys):
+    """--dry-run なしではファイルが実際に --dst へ移動される"""
+    src = tmp_path / "photos"
+    dst = tmp_path / "dst"
+    create_file(src / "a.jpg", b"1")
+
+    main(
+        [
+            "--src",
+            str(src),
+            "--dst",
+            str(dst),
+            "--jobs",
+            "2",
+            "--layout",
+            "{ext}/{name}",
+        ]
+    )
+
+    assert (dst / "jpg" / "a.jpg").read_bytes() == b"1"
+    assert not (src / "a.jpg").exists()
+    assert "Moved files:" in capsys.readouterr().out
+
+
+def test_cli_dry_run_moves_nothing(tmp_path, capsys):
+    """--dry-run では何も移動しない"""
+    src = tmp_path / "photos"
+    dst = tmp_path / "dst"
+    create_file(src / "a.jpg", b"1")
+
+    main(["--src", str(src), "--dst", str(dst), "--dry-run"])
+
+    assert (src / "a.jpg").exists()
+    assert not (dst / "a.jpg").exists()
+    assert "Dry run: files that would be moved:" in capsys.readouterr().out
+
+
+def test_cli_resume_dry_run_journal(tmp_path, capsys):
+    """dry run で作ったジャーナルを --resume で実行できる"""
+    src = tmp_path / "photos"
+    dst = tmp_path / "dst"
+    create_file(src / "a.jpg", b"1")
+    journal = tmp_path / "move.journal"
+
+    main(["--src", str(src), "--dst", str(dst), "--dry-run", "--journal", str(journal)])
+    assert not (dst / "a.jpg").exists()
+
+    main(["--resume", str(journal)])
+
+    assert (dst / "a.jpg").exists()
+    assert "Moved files:" in capsys.readouterr().out
+
+
+def test_cli_journal_run_moves_and_resume_is_noop(tmp_path, capsys):
+    """--dry-run なしの --journal 実行は移動まで行い、--resume は何もしない"""
+    src = tmp_path / "photos"
+    dst = tmp_path / "dst"
+    create_file(src / "a.jpg", b"1")
+    journal = tmp_path / "move.journal"
+
+    main(["--src", str(src), "--dst", str(dst), "--journal", str(journal)])
+    assert (dst / "a.jpg").read_bytes() == b"1"
+    assert not (src / "a.jpg").exists()
+    capsys.readouterr()
+
+    create_file(src / "a.jpg", b"2")
+    main(["--resume", str(journal)])
+
+    assert (src / "a.jpg").read_bytes() == b"2"
+    assert (dst / "a.jpg").read_bytes() == b"1"
+    assert str(dst / "a.jpg") not in capsys.readouterr().out
+
+
+def test_cli_src_required_without_resume(tmp_path):
+    """--resume なしでは --src が必須"""
+    with pytest.raises(SystemExit):
+        main(["--dst", str(tmp_path)])
+
+
+def test_cli_plan_out_and_execute(tmp_path, capsys):
+    """--plan-out で計画を書き出し、--execute で適用する"""
+    src = tmp_path / "photos"
+    dst = tmp_path / "dst"
+    create_file(src / "a.jpg", b"1")
+    plan = tmp_path / "plan.jsonl"
+
+    main(["--src", str(src), "--dst", str(dst), "--plan-out", str(plan)])
+    assert "1 operations" in capsys.readouterr().out
+    assert not (dst / "a.jpg").exists()
+
+    main(["--execute", str(plan)])
+
+    assert (dst / "a.jpg").exists()
+    assert not (src / "a.jpg").exists()
+
+
+def test_cli_binary_format(tmp_path, capsysbinary):
+    """--format binary はバイナリ形式で標準出力に書き出す"""
+    import io
+
+    from photo_mover.binary_exporter import read_binary
+
+    src = tmp_path / "photos"
+    create_file(src / "a.jpg", b"1")
+    create_file(src / "sub" / "b.jpg", b"2")
+
+    main(
+        [
+            "--src",
+            str(src),
+            "--csv",
+            "--recursive",
+            "--csv-include-hash",
+            "--format",
+            "binary",
+        ]
+    )
+    records = list(read_binary(io.BytesIO(capsysbinary.readouterr().out)))
+
+    assert [r.filename for r in records] == ["a.jpg", "b.jpg"]
+    assert records[0].sha256 is not None
+
+
+def test_cli_format_requires_csv(tmp_path):
+    """--csv なしで --format はエラー"""
+    with pytest.raises(SystemExit):
+        main(["--src", str(tmp_path), "--dst", str(tmp_path), "--format", "binary"])
+
+
+def test_cli_incremental(tmp_path, capsys):
+    """--incremental は初回に全件、2 回目は変更分のみを出力する"""
+    src = tmp_path / "photos"
+    create_file(src / "a.jpg", b"1")
+    snapshot = tmp_path / "snap.json"
+
+    main(["--src", str(src), "--csv", "--incremental", str(snapshot)])
+    first = capsys.readouterr().out
+    create_file(src / "b.jpg", b"2")
+    main(["--src", str(src), "--csv", "--incremental", str(snapshot)])
+    second = capsys.readouterr().out
+
+    assert "added,a.jpg" in first
+    assert snapshot.exists()
+    assert "a.jpg" not in second
+    assert "added,b.jpg" in second
+
+
+def test_cli_incremental_requires_csv_format(tmp_path):
+    """--incremental は --format csv 以外とは併用できない"""
+    with pytest.raises(SystemExit):
+        main(
+            [
+                "--src",
+                str(tmp_path),
+                "--csv",
+                "--format",
+                "binary",
+                "--incremental",
+                str(tmp_path / "s"),
+            ]
+        )
+
+
+def test_cli_filters(tmp_path, capsys):
+    """--include / --exclude / --min-size でファイルを絞り込む"""
+    src = tmp_path / "photos"
+    create_file(src / "IMG_1.jpg", b"12345")
+    create_file(src / "IMG_2.jpg", b"1")
+    create_file(src / "DSC_3.jpg", b"12345")
+    create_file(src / "trash" / "IMG_4.jpg", b"12345")
+
+    main(
+        [
+            "--src",
+            str(src),
+            "--csv",
+            "--recursive",
+            "--include",
+            "img_*",
+            "--exclude",
+            "trash",
+            "--min-size",
+            "2",
+        ]
+    )
+    out = capsys.readouterr().out
+
+    assert "IMG_1.jpg" in out
+    assert "IMG_2.jpg" not in out
+    assert "DSC_3.jpg" not in out
+    assert "IMG_4.jpg" not in out
+
+
+def test_cli_filters_move_keep_default_extensions(tmp_path, capsys):
+    """移動時にフィルタを指定しても既定の拡張子制限は維持される"""
+    src = tmp_path / "src"
+    create_file(src / "a.jpg", b"12345")
+    create_file(src / "notes.txt", b"12345")
+
+    main(["--src", str(src), "--dst", str(tmp_path / "dst"), "--min-size", "1"])
+    out = capsys.readouterr().out
+
+    assert "a.jpg" in out
+    assert "notes.txt" not in out
+
+
+def test_cli_invalid_size(tmp_path):
+    """不正なサイズ指定はエラー"""
+    with pytest.raises(SystemExit):
+        main(["--src", str(tmp_path), "--csv", "--min-size", "big"])
+
+
+def test_cli_csv_include_metadata(tmp_path, capsys):
+    """--csv-include-metadata で撮影日時と画素数のカラムが追加される"""
+    src = tmp_path / "photos"
+    create_file(src / "a.txt", b"not media")
+
+    main(["--src", str(src), "--csv", "--csv-include-metadata"])
+
+    lines = capsys.readouterr().out.strip().split("\n")
+    assert lines[0].endswith("size_bytes,taken_at,width,height")
+    assert lines[1] == "a.txt,txt,a.txt,9,,,"
+
+
+def test_cli_csv_include_metadata_requires_csv(tmp_path):
+    """--csv なしで --csv-include-metadata はエラー"""
+    src = tmp_path / "photos"
+    src.mkdir()
+
+    with pytest.raises(SystemExit):
+        main(
+            [
+                "--src",
+                str(src),
+                "--dst",
+                str(tmp_path / "dst"),
+                "--csv-include-metadata",
+            ]
+        )
+
+
+def test_cli_stats_json(tmp_path, capsys):
+    """--stats-json で実行後に集計 JSON を書き出す"""
+    src = tmp_path / "photos"
+    create_file(src / "a.jpg", b"photo data")
+    create_file(src / "b.txt", b"text")
+    stats = tmp_path / "stats.json"
+
+    main(
+        [
+            "--src",
+            str(src),
+            "--csv",
+            "--csv-include-hash",
+            "--extensions",
+            "jpg",
+            "--no-progress",
+            "--stats-json",
+            str(stats),
+        ]
+    )
+
+    captured = capsys.readouterr()
+    assert captured.err == ""
+    data = json.loads(stats.read_text())
+    assert (data["seen"], data["hashed"], data["bytes"]) == (1, 1, 10)
+
+
+def test_cli_no_progress_line_with_listing_on_terminal(tmp_path, capsys, monkeypatch):
+    """一覧を端末に出力するときは進捗行を表示しない"""
+    src = tmp_path / "photos"
+    create_file(src / "a.jpg")
+
+    main(["--src", str(src), "--csv"])
+    assert "1 seen" in capsys.readouterr().err
+
+    monkeypatch.setattr(sys.stdout, "isatty", lambda: True)
+    main(["--src", str(src), "--csv"])
+    captured = capsys.readouterr()
+    assert captured.err == ""
+    assert "a.jpg" in captured.out
+
+
+def test_cli_dry_run_progress_counts_planned(tmp_path, capsys):
+    """dry run では移動件数・転送量ではなく planned を数える"""
+    src = tmp_path / "photos"
+    create_file(src / "a.jpg", b"photo data")
+    stats = tmp_path / "stats.json"
+
+    main(
+        ["--src", str(src), "--dst", str(tmp_path / "dst"), "--dry-run"]
+        + ["--no-progress", "--stats-json", str(stats)]
+    )
+
+    data = json.loads(stats.read_text())
+    assert (data["planned"], data["moved"], data["bytes"]) == (1, 0, 0)
+
+
+def test_cli_watch_rejects_listing_modes(tmp_path):
+    """--watch は --csv などと併用できない"""
+    src = tmp_path / "photos"
+    src.mkdir()
+
+    with pytest.raises(SystemExit):
+        main(["--src", str(src), "--csv", "--watch"])
+    with pytest.raises(SystemExit):
+        main(
+            [
+                "--src",
+                str(src),
+                "--dst",
+                str(tmp_path / "d"),
+                "--watch",
+                "--journal",
+                "j",
+            ]
+        )
+
+
+def test_cli_watch_moves_files(tmp_path, capsys, monkeypatch):
+    """--watch は --dry-run なしなら実際にファイルを移動する"""
+    import photo_mover.watch as watch
+
+    src = tmp_path / "photos"
+    create_file(src / "a.jpg")
+    dst = tmp_path / "library"
+    watch_media = watch.watch_media
+
+    def watch_once(*args, on_batch, **kwargs):
+        batches = []
+
+        def report(moved):
+            batches.append(moved)
+            on_batch(moved)
+
+        watch_media(*args, on_batch=report, stop=lambda: bool(batches), **kwargs)
+
+    monkeypatch.setattr(watch, "watch_media", watch_once)
+
+    main(["--src", str(src), "--dst", str(dst), "--watch", "--watch-debounce", "0"])
+
+    assert not (src / "a.jpg").exists()
+    assert (dst / "a.jpg").exists()
+    assert str(dst / "a.jpg") in capsys.readouterr().out
+
+
+def test_cli_hash_algo(tmp_path, capsys):
+    """--hash-algo で CSV のハッシュ列名とダイジェストが切り替わる"""
+    src = tmp_path / "photos"
+    create_file(src / "a.jpg", b"12345")
+
+    main(["--src", str(src), "--csv", "--csv-include-hash", "--hash-algo", "blake2b"])
+    header, row = capsys.readouterr().out.splitlines()
+
+    assert header.endswith(",blake2b")
+    assert row.endswith(hashlib.blake2b(b"12345").hexdigest())
+
+
+def test_cli_hash_mmap(tmp_path, capsys):
+    """--hash-mmap でもダイジェストは同じで、ハッシュを計算しないモードではエラー"""
+    src = tmp_path / "photos"
+    create_file(src / "a.jpg", b"12345")
+
+    main(["--src", str(src), "--csv", "--csv-include-hash", "--hash-mmap"])
+    assert (
+        capsys.readouterr()
+        .out.splitlines()[1]
+        .endswith(hashlib.sha256(b"12345").hexdigest())
+    )
+    with pytest.raises(SystemExit):
+        main(["--src", str(src), "--csv", "--hash-mmap"])
+
+
+def test_cli_hash_algo_requires_hashing(tmp_path):
+    """ハッシュを計算しないモードや SHA-256 固定の形式では --hash-algo はエラー"""
+    with pytest.raises(SystemExit):
+        main(["--src", str(tmp_path), "--csv", "--hash-algo", "blake2b"])
+    with pytest.raises(SystemExit):
+        main(
+            [
+                "--src",
+                str(tmp_path),
+                "--csv",
+                "--csv-include-hash",
+                "--format",
+                "binary",
+                "--hash-algo",
+                "blake2b",
+            ]
+        )
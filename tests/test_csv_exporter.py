@@ -1,13 +1,16 @@
 import csv
 import hashlib
 import io
+import os
 from pathlib import Path
 
 import pytest
 
+from photo_mover import hashing
 from photo_mover.csv_exporter import (
     MediaFileInfo,
     compute_sha256,
+    read_csv,
     scan_media,
     write_csv,
 )
@@ -347,3 +350,104 @@ def test_csv_end_to_end_with_hash(tmp_path):
 
     assert len(rows) == 1
     assert rows[0]["sha256"] == hashlib.sha256(content).hexdigest()
+
+
+# --- Phase 5: Streaming tests ---
+
+
+class FlushCountingIO(io.StringIO):
+    def __init__(self):
+        super().__init__()
+        self.flushes = 0
+
+    def flush(self):
+        self.flushes += 1
+        super().flush()
+
+
+def test_write_csv_flushes_first_row_before_scan_finishes():
+    """flush_every 指定時は最初の行が次のレコード生成前にフラッシュされる"""
+    output = FlushCountingIO()
+    seen_before_second = []
+
+    def records():
+        yield MediaFileInfo("a.jpg", "jpg", "a.jpg", 1)
+        seen_before_second.append((output.flushes, output.getvalue()))
+        yield MediaFileInfo("b.jpg", "jpg", "b.jpg", 2)
+
+    write_csv(records(), output, flush_every=100)
+
+    flushes, text = seen_before_second[0]
+    assert flushes == 1
+    assert "a.jpg" in text
+    assert output.flushes == 2  # 最初の行 + 終了時
+
+
+def test_write_csv_flush_every_rows():
+    """flush_every 行ごとにフラッシュされる"""
+    output = FlushCountingIO()
+    records = [MediaFileInfo(f"{i}.jpg", "jpg", f"{i}.jpg", i) for i in range(10)]
+
+    write_csv(records, output, flush_every=4)
+
+    assert output.flushes == 1 + 2 + 1  # 1行目, 4行目, 8行目, 終了時
+
+
+def test_scan_media_yields_before_walking_whole_tree(tmp_path, monkeypatch):
+    """最初のレコードは他のディレクトリを一覧する前に返される"""
+    src = tmp_path / "photos"
+    for d in range(5):
+        create_file(src / f"d{d}" / "a.jpg")
+    listed = []
+    real_scandir = os.scandir
+    monkeypatch.setattr(
+        "photo_mover.walker.os.scandir",
+        lambda path: listed.append(str(path)) or real_scandir(path),
+    )
+
+    it = scan_media(src, recursive=True)
+    first = next(it)
+
+    assert first.relative_path == str(Path("d0") / "a.jpg")
+    assert listed == [str(src), str(src / "d0")]
+    assert len(list(it)) == 4
+
+
+def test_write_csv_hash_column_named_after_algo():
+    """ハッシュ列はアルゴリズム名になり、read_csv で読み戻せる"""
+    out = io.StringIO()
+    record = MediaFileInfo("a.jpg", "jpg", "a.jpg", 3, "ab12")
+
+    write_csv([record], out, include_hash=True, hash_algo="blake2b")
+
+    assert out.getvalue().splitlines()[0] == (
+        "filename,extension,relative_path,size_bytes,blake2b"
+    )
+    out.seek(0)
+    assert list(read_csv(out)) == [record]
+
+
+def test_read_csv_unregistered_hash_algo(tmp_path, monkeypatch):
+    """register_hash で追加したアルゴリズムの一覧は、登録なしでも読み戻せる"""
+    monkeypatch.setattr(hashing, "HASH_ALGORITHMS", dict(hashing.HASH_ALGORITHMS))
+    hashing.register_hash("md5", hashlib.md5)
+    src = tmp_path / "photos"
+    src.mkdir()
+    (src / "a.jpg").write_bytes(b"abc")
+    out = io.StringIO()
+    write_csv(
+        scan_media(src, include_hash=True, hash_algo="md5"),
+        out,
+        include_hash=True,
+        hash_algo="md5",
+    )
+    del hashing.HASH_ALGORITHMS["md5"]
+
+    out.seek(0)
+    (record,) = read_csv(out)
+    assert record.sha256 == hashlib.md5(b"abc").hexdigest()
+    out.seek(0)
+    with pytest.raises(ValueError, match="md5"):
+        list(read_csv(out, hash_algo="sha256"))
+    with pytest.raises(ValueError):
+        list(read_csv(io.StringIO("filename,extension,relative_path,size_bytes,x-y\n")))
@@ -0,0 +1,74 @@
+from pathlib import Path
+
+from photo_mover import dest_index
+from photo_mover.dest_index import DestinationIndex
+from photo_mover.hash_cache import HashCache
+
+
+def create_file(path: Path, content: bytes = b"x") -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    return path
+
+
+def test_find_matches_content_anywhere_in_destination(tmp_path):
+    """移動先のどこかに同じ内容があれば見つかる"""
+    dst = tmp_path / "library"
+    existing = create_file(dst / "2024" / "old_name.jpg", b"photo")
+    create_file(dst / "other.jpg", b"PHOTO")
+    new = create_file(tmp_path / "card" / "IMG_1.jpg", b"photo")
+
+    index = DestinationIndex(dst)
+
+    assert len(index) == 2
+    assert index.find(new, new.stat()) == existing
+
+
+def test_find_does_not_hash_unique_sizes(tmp_path, monkeypatch):
+    """サイズが一致しなければハッシュ計算しない"""
+    dst = tmp_path / "library"
+    create_file(dst / "a.jpg", b"1")
+    new = create_file(tmp_path / "card" / "b.jpg", b"22")
+    calls = []
+    monkeypatch.setattr(dest_index, "compute_sha256", lambda p: calls.append(p))
+
+    index = DestinationIndex(dst)
+
+    assert index.find(new, new.stat()) is None
+    assert calls == []
+
+
+def test_index_add_and_cache(tmp_path):
+    """追加したファイルも検索対象になり、ハッシュはキャッシュに保存される"""
+    dst = tmp_path / "library"
+    dst.mkdir()
+    a = create_file(tmp_path / "card" / "a.jpg", b"same")
+    b = create_file(tmp_path / "card" / "b.jpg", b"same")
+
+    with HashCache(tmp_path / "cache.db") as cache:
+        index = DestinationIndex(dst, hash_cache=cache)
+        index.add(a, 4)
+        assert index.find(b, b.stat()) == a
+        assert cache.stored == 2
+
+
+def test_index_planned_target(tmp_path):
+    """まだ存在しない移動先は移動元から読み、移動後は移動先から読む"""
+    dst = tmp_path / "library"
+    dst.mkdir()
+    a = create_file(tmp_path / "card" / "a.jpg", b"same")
+    b = create_file(tmp_path / "card" / "b.jpg", b"same")
+    c = create_file(tmp_path / "card" / "c.jpg", b"same")
+    target = dst / "a.jpg"
+
+    index = DestinationIndex(dst)
+    index.add(target, 4, source=a)
+    assert index.find(b, b.stat()) == target
+
+    a.rename(target)
+    index = DestinationIndex(tmp_path / "empty")
+    index.add(target, 4, source=a)
+    assert index.find(c, c.stat()) == target
+
+    index.discard(target, 4)
+    assert index.find(c, c.stat()) is None
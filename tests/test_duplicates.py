@@ -0,0 +1,127 @@
+import hashlib
+import io
+import json
+from pathlib import Path
+
+from photo_mover.csv_exporter import scan_media
+from photo_mover.duplicates import (
+    DuplicateStats,
+    find_duplicates,
+    partial_hash,
+    write_duplicates_csv,
+    write_duplicates_json,
+)
+
+
+def create_file(path: Path, content: bytes = b"x") -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    return path
+
+
+def test_partial_hash_small_file_is_full_hash(tmp_path):
+    """2ブロック以下のファイルは部分ハッシュ = 全体ハッシュ"""
+    content = b"abc" * 100
+    f = create_file(tmp_path / "a.jpg", content)
+
+    assert (
+        partial_hash(f, len(content), block=256) == hashlib.sha256(content).hexdigest()
+    )
+
+
+def test_find_duplicates_funnel(tmp_path):
+    """サイズ→部分ハッシュ→全体ハッシュの順に候補を絞り込む"""
+    src = tmp_path / "photos"
+    big = b"A" * 1000 + b"middle" + b"B" * 1000
+    create_file(src / "a.jpg", big)
+    create_file(src / "sub" / "a_copy.jpg", big)
+    create_file(src / "mid_differs.jpg", b"A" * 1000 + b"MIDDLE" + b"B" * 1000)
+    create_file(src / "end_differs.jpg", b"A" * 1000 + b"middle" + b"C" * 1000)
+    create_file(src / "unique_size.jpg", b"lonely")
+    create_file(src / "s1.png", b"small")
+    create_file(src / "s2.png", b"small")
+    stats = DuplicateStats()
+
+    groups = find_duplicates(
+        scan_media(src, recursive=True), src, stats=stats, block=256
+    )
+
+    assert [[f.relative_path for f in g.files] for g in groups] == [
+        ["a.jpg", str(Path("sub") / "a_copy.jpg")],
+        ["s1.png", "s2.png"],
+    ]
+    assert groups[0].sha256 == hashlib.sha256(big).hexdigest()
+    assert groups[1].sha256 == hashlib.sha256(b"small").hexdigest()
+    assert stats.files == 7
+    assert stats.unique_size == 1
+    assert stats.unique_partial == 1  # end_differs
+    assert stats.unique_full == 1  # mid_differs
+    assert stats.duplicates == 2
+
+
+def test_find_duplicates_skips_reading_unique_sizes(tmp_path):
+    """サイズが一意のファイルは読み込まない"""
+    src = tmp_path / "photos"
+    create_file(src / "a.jpg", b"1")
+    create_file(src / "b.jpg", b"22")
+    stats = DuplicateStats()
+
+    assert find_duplicates(scan_media(src), src, stats=stats) == []
+    assert stats.bytes_read == 0
+
+
+def test_find_duplicates_skips_unreadable_files(tmp_path):
+    """スキャン後に消えたファイルは数えて飛ばし、残りの重複は検出する"""
+    src = tmp_path / "photos"
+    big = b"A" * 1000
+    create_file(src / "a.jpg", big)
+    create_file(src / "b.jpg", big)
+    create_file(src / "c.jpg", big)
+    create_file(src / "s1.png", b"small")
+    create_file(src / "s2.png", b"small")
+    records = list(scan_media(src))
+    (src / "c.jpg").unlink()
+    (src / "s2.png").unlink()
+    stats = DuplicateStats()
+
+    groups = find_duplicates(records, src, stats=stats, block=256)
+
+    assert [[f.relative_path for f in g.files] for g in groups] == [["a.jpg", "b.jpg"]]
+    assert stats.unreadable == 2
+
+
+def test_write_duplicates_csv_and_json(tmp_path):
+    """CSV/JSON 形式で重複グループを出力する"""
+    src = tmp_path / "photos"
+    create_file(src / "a.jpg", b"same")
+    create_file(src / "b.jpg", b"same")
+    groups = find_duplicates(scan_media(src), src)
+
+    out = io.StringIO()
+    write_duplicates_csv(groups, out)
+    lines = out.getvalue().splitlines()
+    assert lines[0] == "group,sha256,size_bytes,relative_path"
+    assert len(lines) == 3
+
+    out = io.StringIO()
+    write_duplicates_json(groups, out)
+    data = json.loads(out.getvalue())
+    assert data[0]["files"] == ["a.jpg", "b.jpg"]
+    assert data[0]["size_bytes"] == 4
+
+
+def test_find_duplicates_hash_algo(tmp_path):
+    """hash_algo を指定すると両ステージでそのアルゴリズムを使い、列名にもなる"""
+    src = tmp_path / "photos"
+    big = b"A" * 1000 + b"middle" + b"B" * 1000
+    create_file(src / "a.jpg", big)
+    create_file(src / "b.jpg", big)
+    create_file(src / "c.jpg", b"A" * 1000 + b"MIDDLE" + b"B" * 1000)
+
+    groups = find_duplicates(scan_media(src), src, block=256, hash_algo="blake2b")
+    out = io.StringIO()
+    write_duplicates_csv(groups, out, hash_algo="blake2b")
+
+    [group] = groups
+    assert group.sha256 == hashlib.blake2b(big).hexdigest()
+    assert out.getvalue().splitlines()[0] == "group,blake2b,size_bytes,relative_path"
@@ -0,0 +1,120 @@
+import os
+import time
+
+import pytest
+
+from photo_mover.csv_exporter import scan_media
+from photo_mover.filters import FileFilter, parse_newer_than, parse_size
+from photo_mover.walker import walk_files
+
+
+def create_file(path, content=b"x"):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    return path
+
+
+def stat_of(size, mtime=0):
+    return os.stat_result(
+        (0o100644, 0, 0, 1, 0, 0, size, mtime, mtime, mtime),
+        {"st_mtime_ns": mtime * 10**9},
+    )
+
+
+def test_extension_and_globs():
+    """拡張子・include・exclude を組み合わせて判定する（大文字小文字は無視）"""
+    f = FileFilter(
+        extensions=["jpg", "png"], include=["IMG_*", "DCIM/*"], exclude=["*_edit.*"]
+    )
+
+    assert f.match_name("img_0001.JPG", "img_0001.JPG")
+    assert not f.match_name("img_0001.mov", "img_0001.mov")
+    assert not f.match_name("IMG_0001_edit.jpg", "IMG_0001_edit.jpg")
+    assert f.match_name("photo.png", os.path.join("DCIM", "100", "photo.png"))
+    assert not f.match_name("photo.png", "photo.png")
+
+
+def test_size_and_mtime():
+    """サイズ・更新日時の条件は stat で判定する"""
+    f = FileFilter(min_size=10, max_size=100, newer_than=1000)
+
+    assert f.needs_stat
+    assert f.match_stat(stat_of(50, 2000))
+    assert not f.match_stat(stat_of(5, 2000))
+    assert not f.match_stat(stat_of(500, 2000))
+    assert not f.match_stat(stat_of(50, 1000))
+    assert not FileFilter(extensions=["jpg"]).needs_stat
+
+
+def test_prune_dirs():
+    """既定の除外ディレクトリと exclude パターンに一致するディレクトリは辿らない"""
+    f = FileFilter(exclude=["tmp", "a/b"])
+
+    assert f.prune("@eaDir", "@eaDir")
+    assert f.prune(".git", os.path.join("x", ".git"))
+    assert f.prune("tmp", "tmp")
+    assert f.prune("b", os.path.join("a", "b"))
+    assert not f.prune("photos", "photos")
+    assert not FileFilter(prune_dirs=()).prune(".git", ".git")
+
+
+@pytest.mark.parametrize("concurrency", [1, 4])
+def test_walk_never_lists_pruned_dirs(tmp_path, monkeypatch, concurrency):
+    """除外されたディレクトリは列挙自体を行わない"""
+    create_file(tmp_path / "a.jpg")
+    create_file(tmp_path / "@eaDir" / "a.jpg" / "SYNOFILE_THUMB_M.jpg")
+    create_file(tmp_path / "skip" / "b.jpg")
+    create_file(tmp_path / "keep" / "c.jpg", b"big content")
+    listed = []
+    real_scandir = os.scandir
+    monkeypatch.setattr(
+        os, "scandir", lambda p: listed.append(str(p)) or real_scandir(p)
+    )
+
+    names = [
+        e.name
+        for e in walk_files(
+            tmp_path,
+            recursive=True,
+            file_filter=FileFilter(exclude=["skip"], min_size=2),
+            concurrency=concurrency,
+        )
+    ]
+
+    assert names == ["c.jpg"]
+    assert sorted(listed) == sorted([str(tmp_path), str(tmp_path / "keep")])
+
+
+def test_scan_media_file_filter(tmp_path):
+    """scan_media に FileFilter を渡せる（extensions との併用はエラー）"""
+    create_file(tmp_path / "a.jpg", b"1")
+    create_file(tmp_path / ".thumbnails" / "t.jpg")
+    create_file(tmp_path / "b.jpg", b"12345")
+
+    records = list(
+        scan_media(tmp_path, recursive=True, file_filter=FileFilter(min_size=3))
+    )
+    assert [r.filename for r in records] == ["b.jpg"]
+    assert [r.filename for r in scan_media(tmp_path, recursive=True)] == [
+        "a.jpg",
+        "b.jpg",
+    ]
+    with pytest.raises(ValueError):
+        list(scan_media(tmp_path, extensions=["jpg"], file_filter=FileFilter()))
+
+
+def test_parse_size_and_newer_than():
+    """サイズと日時の文字列を解釈する"""
+    assert parse_size("500") == 500
+    assert parse_size("10K") == 10240
+    assert parse_size("1.5g") == 1536 * 1024**2
+    assert parse_size("2MiB") == 2 * 1024**2
+    with pytest.raises(ValueError):
+        parse_size("ten")
+
+    assert parse_newer_than("7d", now=1_000_000) == 1_000_000 - 7 * 86400
+    assert parse_newer_than("2024-01-31") == time.mktime(
+        (2024, 1, 31, 0, 0, 0, 0, 0, -1)
+    )
+    with pytest.raises(ValueError):
+        parse_newer_than("yesterday")
@@ -0,0 +1,120 @@
+import hashlib
+import os
+from pathlib import Path
+
+from photo_mover import hashing
+from photo_mover.csv_exporter import scan_media
+from photo_mover.hash_cache import HashCache
+
+
+def create_file(path: Path, content: bytes = b"x") -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    return path
+
+
+def test_cache_hit_and_miss(tmp_path):
+    """size/mtime/inode が一致すればヒット、変われば再計算"""
+    f = create_file(tmp_path / "a.jpg", b"one")
+    with HashCache(tmp_path / "cache.db") as cache:
+        assert cache.lookup(f, f.stat()) is None
+        cache.store(f, f.stat(), "digest")
+        assert cache.lookup(f, f.stat()) == "digest"
+
+        st = f.stat()
+        os.utime(f, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        assert cache.lookup(f, f.stat()) is None
+
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 2
+
+
+def test_cache_persists_between_runs(tmp_path):
+    """キャッシュは別インスタンスでも再利用される"""
+    f = create_file(tmp_path / "a.jpg", b"one")
+    with HashCache(tmp_path / "cache.db") as cache:
+        cache.store(f, f.stat(), "digest")
+    with HashCache(tmp_path / "cache.db") as cache:
+        assert cache.lookup(f, f.stat()) == "digest"
+
+
+def test_scan_media_skips_reads_on_hit(tmp_path, monkeypatch):
+    """2回目のスキャンではファイルを読まない"""
+    src = tmp_path / "photos"
+    create_file(src / "a.jpg", b"photo a")
+    create_file(src / "sub" / "b.jpg", b"photo b")
+    db = tmp_path / "cache.db"
+
+    with HashCache(db) as cache:
+        first = list(
+            scan_media(src, recursive=True, include_hash=True, hash_cache=cache)
+        )
+
+    calls = []
+    real = hashing.compute_sha256
+    monkeypatch.setattr(
+        "photo_mover.csv_exporter.compute_sha256",
+        lambda *a: calls.append(a) or real(*a),
+    )
+    with HashCache(db) as cache:
+        second = list(
+            scan_media(src, recursive=True, include_hash=True, hash_cache=cache)
+        )
+        assert cache.stats()["hits"] == 2
+
+    assert calls == []
+    assert second == first
+    assert first[0].sha256 == hashlib.sha256(b"photo a").hexdigest()
+
+
+def test_scan_media_parallel_with_cache(tmp_path):
+    """並列ハッシュでもキャッシュヒットと計算結果が混在して順序どおり返る"""
+    src = tmp_path / "photos"
+    for i in range(6):
+        create_file(src / f"{i}.jpg", bytes([i]) * 10)
+    db = tmp_path / "cache.db"
+    with HashCache(db) as cache:
+        list(scan_media(src, include_hash=True, hash_cache=cache))
+    create_file(src / "3.jpg", b"changed")
+
+    with HashCache(db) as cache:
+        records = list(
+            scan_media(src, include_hash=True, hash_cache=cache, hash_workers=3)
+        )
+        assert cache.stats()["hits"] == 5
+        assert cache.stats()["misses"] == 1
+
+    assert [r.filename for r in records] == [f"{i}.jpg" for i in range(6)]
+    assert records[3].sha256 == hashlib.sha256(b"changed").hexdigest()
+
+
+def test_prune_removes_deleted_files(tmp_path):
+    """削除されたファイルのエントリはスキャン後に除去される"""
+    src = tmp_path / "photos"
+    create_file(src / "a.jpg", b"a")
+    gone = create_file(src / "b.jpg", b"b")
+    db = tmp_path / "cache.db"
+    with HashCache(db) as cache:
+        list(scan_media(src, include_hash=True, hash_cache=cache))
+    gone.unlink()
+
+    with HashCache(db) as cache:
+        list(scan_media(src, include_hash=True, hash_cache=cache))
+        assert cache.stats()["pruned"] == 1
+
+
+def test_cache_keeps_digests_per_algorithm(tmp_path):
+    """アルゴリズムごとに別々のダイジェストを保持する"""
+    f = create_file(tmp_path / "a.jpg", b"one")
+    with HashCache(tmp_path / "cache.db") as cache:
+        cache.store(f, f.stat(), "sha")
+        cache.store(f, f.stat(), "blake", "blake2b")
+
+        assert cache.lookup(f, f.stat()) == "sha"
+        assert cache.lookup(f, f.stat(), "blake2b") == "blake"
+        assert cache.lookup(f, f.stat(), "xxh3_128") is None
+
+        f.unlink()
+        assert cache.prune(tmp_path) == 0
+    with HashCache(tmp_path / "cache.db") as cache:
+        assert cache.prune(tmp_path) == 1
@@ -0,0 +1,150 @@
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from photo_mover import hashing
+from photo_mover.csv_exporter import scan_media
+from photo_mover.hashing import (
+    available_hash_algos,
+    compute_sha256,
+    hash_file,
+    iter_map,
+    make_executor,
+    new_hash,
+    register_hash,
+)
+
+
+def create_file(path: Path, content: bytes = b"x") -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    return path
+
+
+def test_compute_sha256_small_chunks(tmp_path):
+    """チャンクサイズを変えても同じハッシュになる"""
+    f = create_file(tmp_path / "a.bin", b"0123456789" * 1000)
+
+    expected = hashlib.sha256(f.read_bytes()).hexdigest()
+    assert compute_sha256(f, chunk_size=7) == expected
+    assert compute_sha256(f, chunk_size=1 << 20) == expected
+
+
+def test_iter_map_preserves_order(tmp_path):
+    """並列ハッシュでも入力順で結果が返り、引数が None の項目は None になる"""
+    paths = [
+        create_file(tmp_path / f"{i}.bin", bytes([i]) * (i + 1)) for i in range(20)
+    ]
+    jobs = ((p.name, None if i == 5 else (p, "sha256")) for i, p in enumerate(paths))
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(iter_map(jobs, hash_file, pool, window=3))
+
+    assert [tag for tag, _ in results] == [p.name for p in paths]
+    for i, ((_, digest), p) in enumerate(zip(results, paths)):
+        if i == 5:
+            assert digest is None
+        else:
+            assert digest == hashlib.sha256(p.read_bytes()).hexdigest()
+
+
+def test_make_executor_rejects_unknown_kind():
+    """未知のエグゼキュータ種別はValueError"""
+    with pytest.raises(ValueError):
+        make_executor("fiber", 2)
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_scan_media_parallel_matches_serial(tmp_path, executor):
+    """hash_workers>1 でも直列と同じ順序・ハッシュになる"""
+    src = tmp_path / "photos"
+    for i in range(12):
+        create_file(src / f"d{i % 3}" / f"{i:02}.jpg", str(i).encode() * 50)
+
+    serial = list(scan_media(src, recursive=True, include_hash=True))
+    parallel = list(
+        scan_media(
+            src,
+            recursive=True,
+            include_hash=True,
+            hash_workers=4,
+            hash_executor=executor,
+        )
+    )
+
+    assert parallel == serial
+
+
+def test_scan_media_invalid_hash_workers(tmp_path):
+    """hash_workers が 0 以下ならValueError"""
+    with pytest.raises(ValueError):
+        list(scan_media(tmp_path, include_hash=True, hash_workers=0))
+
+
+@pytest.mark.parametrize("algo", ["sha256", "blake2b"])
+@pytest.mark.parametrize("threshold", [1 << 30, 1000])
+def test_hash_file_read_and_mmap_paths(tmp_path, monkeypatch, algo, threshold):
+    """readinto と mmap のどちらの経路でも hashlib と同じダイジェストになる"""
+    monkeypatch.setattr(hashing, "MMAP_THRESHOLD", threshold)
+    content = bytes(range(256)) * 40
+    f = create_file(tmp_path / "a.bin", content)
+
+    expected = hashlib.new(algo, content).hexdigest()
+    assert hash_file(f, algo, chunk_size=1000, use_mmap=True) == expected
+    assert hash_file(f, algo, chunk_size=1 << 20, use_mmap=True) == expected
+    assert hash_file(create_file(tmp_path / "empty.bin", b""), algo, use_mmap=True) == (
+        hashlib.new(algo).hexdigest()
+    )
+
+
+def test_hash_file_maps_only_when_asked(tmp_path, monkeypatch):
+    """mmap は use_mmap を指定したときだけ使う (移動・検証は readinto)"""
+    monkeypatch.setattr(hashing, "MMAP_THRESHOLD", 10)
+    mapped = []
+    real_map = hashing._map
+    monkeypatch.setattr(hashing, "_map", lambda fd: mapped.append(fd) or real_map(fd))
+    f = create_file(tmp_path / "a.bin", b"x" * 100)
+
+    assert compute_sha256(f) == hashlib.sha256(b"x" * 100).hexdigest()
+    assert mapped == []
+    hash_file(f, use_mmap=True)
+    assert len(mapped) == 1
+
+
+def test_hash_algorithm_registry(monkeypatch):
+    """未知のアルゴリズムや未インストールのパッケージは ValueError"""
+    monkeypatch.setattr(hashing, "HASH_ALGORITHMS", dict(hashing.HASH_ALGORITHMS))
+
+    def missing():
+        raise ModuleNotFoundError("No module named 'fasthash'", name="fasthash")
+
+    register_hash("fasthash", missing)
+    register_hash("md5", hashlib.md5)
+
+    with pytest.raises(ValueError, match="Unknown"):
+        new_hash("crc")
+    with pytest.raises(ValueError, match="fasthash package"):
+        new_hash("fasthash")
+    assert "fasthash" not in available_hash_algos()
+    assert {"sha256", "blake2b", "md5"} <= set(available_hash_algos())
+    with pytest.raises(ValueError):
+        register_hash("sha-1", hashlib.sha1)
+
+
+def test_scan_media_hash_algo(tmp_path):
+    """hash_algo で選んだアルゴリズムのダイジェストが並列でも同じく返る"""
+    src = tmp_path / "photos"
+    for i in range(6):
+        create_file(src / f"{i}.jpg", str(i).encode() * 100)
+
+    serial = list(scan_media(src, include_hash=True, hash_algo="blake2b"))
+    parallel = list(
+        scan_media(src, include_hash=True, hash_algo="blake2b", hash_workers=3)
+    )
+
+    assert serial == parallel
+    for info in serial:
+        content = (src / info.filename).read_bytes()
+        assert info.sha256 == hashlib.blake2b(content).hexdigest()
@@ -0,0 +1,203 @@
+import io
+import os
+import time
+
+import pytest
+
+from photo_mover import incremental
+from photo_mover.csv_exporter import read_csv, scan_media, write_csv
+from photo_mover.incremental import Snapshot, scan_changes, write_changes_csv
+
+
+def create_file(path, content=b"x"):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    return path
+
+
+def age_tree(root, seconds=100):
+    """ディレクトリとファイルの mtime を過去にずらす（粒度の競合を避ける）"""
+    past = time.time() - seconds
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            os.utime(os.path.join(dirpath, name), (past, past))
+        os.utime(dirpath, (past, past))
+
+
+def changes(src, previous, **kwargs):
+    current = Snapshot()
+    result = [
+        (c.kind, c.info.relative_path)
+        for c in scan_changes(src, previous, recursive=True, current=current, **kwargs)
+    ]
+    return result, current
+
+
+def make_tree(tmp_path):
+    src = tmp_path / "src"
+    create_file(src / "a.jpg", b"a")
+    create_file(src / "d1" / "b.jpg", b"bb")
+    create_file(src / "d1" / "c.jpg", b"cc")
+    create_file(src / "d2" / "deep" / "e.mp4", b"eee")
+    age_tree(src)
+    return src
+
+
+def test_first_scan_reports_everything_added_in_scan_order(tmp_path):
+    """スナップショットなしでは全ファイルが added（scan_media と同じ順序）"""
+    src = make_tree(tmp_path)
+
+    result, current = changes(src, None)
+
+    expected = [r.relative_path for r in scan_media(src, recursive=True)]
+    assert result == [("added", p) for p in expected]
+    assert len(current) == 4
+
+
+def test_unchanged_tree_lists_no_directories(tmp_path, monkeypatch):
+    """変更がなければ何も出力せず、ディレクトリの再列挙もしない"""
+    src = make_tree(tmp_path)
+    _, snapshot = changes(src, None)
+    listed = []
+    real_scandir = os.scandir
+    monkeypatch.setattr(
+        incremental.os, "scandir", lambda p: listed.append(p) or real_scandir(p)
+    )
+
+    result, current = changes(src, snapshot)
+
+    assert result == []
+    assert listed == []
+    assert len(current) == 4
+
+
+def test_added_removed_modified(tmp_path):
+    """追加・削除・変更（置き換え）を検出する"""
+    src = make_tree(tmp_path)
+    _, snapshot = changes(src, None)
+
+    create_file(src / "d1" / "new.jpg", b"n")
+    (src / "d1" / "b.jpg").unlink()
+    create_file(src / "tmp.part", b"changed!")
+    os.replace(src / "tmp.part", src / "a.jpg")
+    result, _ = changes(src, snapshot)
+
+    assert result == [
+        ("modified", "a.jpg"),
+        ("removed", os.path.join("d1", "b.jpg")),
+        ("added", os.path.join("d1", "new.jpg")),
+    ]
+
+
+def test_removed_subtree(tmp_path):
+    """削除されたディレクトリ配下のファイルは removed"""
+    src = make_tree(tmp_path)
+    _, snapshot = changes(src, None)
+
+    (src / "d2" / "deep" / "e.mp4").unlink()
+    (src / "d2" / "deep").rmdir()
+    result, current = changes(src, snapshot)
+
+    assert result == [("removed", os.path.join("d2", "deep", "e.mp4"))]
+    assert os.path.join("d2", "deep") not in current.dirs
+
+
+def test_extension_filter_and_hash(tmp_path):
+    """拡張子フィルタは出力に適用され、追加ファイルはハッシュされる"""
+    src = make_tree(tmp_path)
+
+    found = list(
+        scan_changes(src, recursive=True, extensions=["mp4"], include_hash=True)
+    )
+
+    assert [c.info.filename for c in found] == ["e.mp4"]
+    assert found[0].info.sha256 is not None
+
+
+def test_snapshot_save_and_load(tmp_path):
+    """スナップショットを保存・読み込みしても差分結果は同じ"""
+    src = make_tree(tmp_path)
+    _, snapshot = changes(src, None)
+    path = tmp_path / "snap.json"
+    snapshot.save(path)
+
+    loaded = Snapshot.load(path)
+
+    assert loaded.dirs == snapshot.dirs
+    assert loaded.taken_ns == snapshot.taken_ns
+    assert changes(src, loaded)[0] == []
+
+
+def test_csv_listing_as_baseline(tmp_path):
+    """以前の CSV 出力をベースラインとして使える（サイズで比較）"""
+    src = make_tree(tmp_path)
+    listing = tmp_path / "listing.csv"
+    with open(listing, "w", newline="", encoding="utf-8") as f:
+        write_csv(scan_media(src, recursive=True), f)
+    create_file(src / "d1" / "c.jpg", b"longer")
+    create_file(src / "z.jpg", b"z")
+
+    result, current = changes(src, Snapshot.load(listing))
+
+    assert result == [("modified", os.path.join("d1", "c.jpg")), ("added", "z.jpg")]
+    assert all(s.mtime_ns is not None for s in current.dirs[""].files.values())
+
+
+def test_default_prune_dirs_match_scan_media(tmp_path):
+    """scan_media と同じく既定の除外ディレクトリは対象外"""
+    src = make_tree(tmp_path)
+    create_file(src / ".thumbnails" / "t.jpg")
+    create_file(src / "d1" / "@eaDir" / "u.jpg")
+    age_tree(src)
+    listing = tmp_path / "listing.csv"
+    with open(listing, "w", newline="", encoding="utf-8") as f:
+        write_csv(scan_media(src, recursive=True), f)
+
+    result, _ = changes(src, None)
+
+    expected = [r.relative_path for r in scan_media(src, recursive=True)]
+    assert result == [("added", p) for p in expected]
+    assert changes(src, Snapshot.load(listing))[0] == []
+
+
+def test_pruned_dir_in_old_snapshot_is_removed(tmp_path):
+    """除外前のスナップショットにある除外ディレクトリのファイルは removed になる"""
+    src = make_tree(tmp_path)
+    create_file(src / ".thumbnails" / "t.jpg")
+    age_tree(src)
+    _, snapshot = changes(src, None, prune_dirs=())
+
+    result, current = changes(src, snapshot)
+
+    assert result == [("removed", os.path.join(".thumbnails", "t.jpg"))]
+    assert changes(src, current)[0] == []
+
+
+def test_read_csv_round_trip():
+    """write_csv の出力を read_csv で読み戻せる"""
+    records = list(
+        read_csv(
+            io.StringIO(
+                "filename,extension,relative_path,size_bytes\na.jpg,jpg,a.jpg,3\n"
+            )
+        )
+    )
+    assert records[0].size_bytes == 3
+    with pytest.raises(ValueError):
+        list(read_csv(io.StringIO("x,y\n")))
+
+
+def test_write_changes_csv():
+    """change カラムを先頭に付けて出力する"""
+    src_changes = [
+        incremental.MediaChange(
+            "added", incremental.MediaFileInfo("a.jpg", "jpg", "a.jpg", 1, "ab")
+        )
+    ]
+    out = io.StringIO()
+    write_changes_csv(src_changes, out, include_hash=True)
+
+    assert out.getvalue() == (
+        "change,filename,extension,relative_path,size_bytes,sha256\n"
+        "added,a.jpg,jpg,a.jpg,1,ab\n"
+    )
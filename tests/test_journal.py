@@ -0,0 +1,161 @@
+from pathlib import Path
+
+import pytest
+
+from photo_mover import mover
+from photo_mover.journal import MoveJournal, PlannedMove, load_journal
+from photo_mover.mover import move_media, resume_moves
+from photo_mover.transfer import partial_path
+
+
+def create_file(path: Path, content: bytes = b"x") -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    return path
+
+
+def write_plan(journal: Path, dst: Path, ops) -> None:
+    with MoveJournal(journal) as log:
+        log.begin(dst)
+        log.record_plan(ops)
+
+
+def test_journal_records_plan_and_progress(tmp_path):
+    """計画全体と各ファイルの完了がジャーナルに記録される"""
+    src = tmp_path / "src"
+    dst = tmp_path / "dst"
+    create_file(src / "a.jpg")
+    create_file(src / "b.jpg")
+    journal = tmp_path / "move.journal"
+
+    moved = move_media(src, dst, dry_run=False, journal=journal)
+
+    state = load_journal(journal)
+    assert state.complete
+    assert state.dst == dst
+    assert [op.target for op in state.ops] == moved
+    assert state.status == {0: "done", 1: "done"}
+    assert list(state.pending()) == []
+
+
+def test_resume_after_interruption(tmp_path, monkeypatch):
+    """中断されたランを再スキャンせずに再開できる"""
+    src = tmp_path / "src"
+    dst = tmp_path / "dst"
+    for name in ["a.jpg", "b.jpg", "c.jpg"]:
+        create_file(src / name, name.encode())
+    journal = tmp_path / "move.journal"
+    real_transfer = mover.transfer_file
+
+    def crash_on_b(p, target, **kwargs):
+        if p.name == "b.jpg":
+            raise KeyboardInterrupt
+        return real_transfer(p, target, **kwargs)
+
+    monkeypatch.setattr(mover, "transfer_file", crash_on_b)
+    with pytest.raises(KeyboardInterrupt):
+        move_media(src, dst, dry_run=False, journal=journal)
+    monkeypatch.setattr(mover, "transfer_file", real_transfer)
+    monkeypatch.setattr(mover, "walk_files", None)  # 再開時は走査しない
+
+    moved = resume_moves(journal, dry_run=False)
+
+    assert moved == [dst / "b.jpg", dst / "c.jpg"]
+    assert sorted(p.name for p in dst.iterdir()) == ["a.jpg", "b.jpg", "c.jpg"]
+    assert list(load_journal(journal).pending()) == []
+
+
+def test_resume_rolls_back_partial_copy(tmp_path):
+    """途中までのコピーは削除してやり直す"""
+    src = create_file(tmp_path / "src" / "a.mov", b"full content")
+    target = tmp_path / "dst" / "a.mov"
+    create_file(partial_path(target), b"full")
+    journal = tmp_path / "move.journal"
+    write_plan(journal, target.parent, [PlannedMove(src, target, 12, 0)])
+
+    moved = resume_moves(journal, dry_run=False)
+
+    assert moved == [target]
+    assert target.read_bytes() == b"full content"
+    assert not partial_path(target).exists()
+    assert not src.exists()
+
+
+def test_resume_completes_renamed_copy(tmp_path):
+    """配置済みでソースが残っている場合はソース削除で完了させる"""
+    src = create_file(tmp_path / "src" / "a.mov", b"content")
+    target = create_file(tmp_path / "dst" / "a.mov", b"content")
+    journal = tmp_path / "move.journal"
+    write_plan(journal, target.parent, [PlannedMove(src, target, 7, 0)])
+
+    assert resume_moves(journal, dry_run=False) == []
+    assert not src.exists()
+    assert load_journal(journal).status == {0: "done"}
+
+
+def test_resume_keeps_source_when_target_differs(tmp_path):
+    """同じサイズでも内容が違うファイルが移動先にあればソースを消さない"""
+    src = create_file(tmp_path / "src" / "a.mov", b"content")
+    target = create_file(tmp_path / "dst" / "a.mov", b"CONTENT")
+    journal = tmp_path / "move.journal"
+    write_plan(journal, target.parent, [PlannedMove(src, target, 7, 0)])
+
+    assert resume_moves(journal, dry_run=False) == []
+    assert src.read_bytes() == b"content"
+    assert target.read_bytes() == b"CONTENT"
+    assert load_journal(journal).status == {0: "fail"}
+
+
+def test_journal_hardlink_duplicates_within_source(tmp_path):
+    """ジャーナル付きでも取り込み内の重複は移動済みのファイルへリンクされる"""
+    src = tmp_path / "src"
+    dst = tmp_path / "dst"
+    create_file(src / "a.jpg", b"same")
+    create_file(src / "b.jpg", b"same")
+    journal = tmp_path / "move.journal"
+
+    moved = move_media(
+        src, dst, dry_run=False, journal=journal, on_duplicate="hardlink"
+    )
+
+    assert moved == [dst / "a.jpg", dst / "b.jpg"]
+    assert list(src.iterdir()) == []
+    assert (dst / "a.jpg").samefile(dst / "b.jpg")
+    assert load_journal(journal).status == {0: "done", 1: "done"}
+
+
+def test_resume_dry_run_changes_nothing(tmp_path):
+    """dry run の再開ではファイルもジャーナルも変更しない"""
+    src = create_file(tmp_path / "src" / "a.mov", b"content")
+    target = tmp_path / "dst" / "a.mov"
+    create_file(partial_path(target), b"con")
+    journal = tmp_path / "move.journal"
+    write_plan(journal, target.parent, [PlannedMove(src, target, 7, 0)])
+    before = journal.read_bytes()
+
+    assert resume_moves(journal, dry_run=True) == [target]
+    assert src.exists()
+    assert partial_path(target).exists()
+    assert journal.read_bytes() == before
+
+
+def test_load_journal_ignores_torn_last_line(tmp_path):
+    """クラッシュで途切れた最終行は無視する"""
+    journal = tmp_path / "move.journal"
+    write_plan(journal, tmp_path, [PlannedMove(tmp_path / "a", tmp_path / "b", 1, 0)])
+    with open(journal, "a") as f:
+        f.write('{"op": "do')
+
+    state = load_journal(journal)
+    assert state.complete
+    assert len(state.ops) == 1
+
+
+def test_resume_requires_complete_plan(tmp_path):
+    """計画が書き終わっていないジャーナルからは再開できない"""
+    journal = tmp_path / "move.journal"
+    with MoveJournal(journal) as log:
+        log.begin(tmp_path)
+
+    with pytest.raises(ValueError):
+        resume_moves(journal)
@@ -0,0 +1,81 @@
+import hashlib
+import os
+from dataclasses import FrozenInstanceError
+
+import pytest
+
+from photo_mover.csv_exporter import MediaFileInfo, scan_media
+from photo_mover.media_table import MediaTable
+
+
+def create_file(path, content=b"x"):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    return path
+
+
+def test_media_file_info_is_frozen_and_slotted():
+    """MediaFileInfo は __dict__ を持たず、変更できない"""
+    info = MediaFileInfo("a.jpg", "jpg", "a.jpg", 1)
+    assert not hasattr(info, "__dict__")
+    with pytest.raises(FrozenInstanceError):
+        info.size_bytes = 2
+
+
+def test_table_round_trips_scan_results(tmp_path):
+    """scan_media の結果を格納し、同じレコードとして取り出せる"""
+    src = tmp_path / "src"
+    create_file(src / "a.jpg", b"aaa")
+    create_file(src / "sub" / "b.PNG", b"bb")
+    create_file(src / "sub" / "写真.jpg", b"c")
+
+    records = list(scan_media(src, recursive=True, include_hash=True))
+    table = MediaTable(records)
+
+    assert len(table) == 3
+    assert list(table) == records
+    assert table[-1] == records[-1]
+    assert table.digest(0) == hashlib.sha256(b"aaa").digest()
+    with pytest.raises(IndexError):
+        table[3]
+
+
+def test_table_without_digest():
+    """ハッシュなしのレコードは sha256=None のまま"""
+    table = MediaTable([MediaFileInfo("a.jpg", "jpg", os.path.join("d", "a.jpg"), 5)])
+
+    assert table[0].sha256 is None
+    assert table.digest(0) is None
+    assert table[0].relative_path == os.path.join("d", "a.jpg")
+
+
+def test_table_keeps_metadata():
+    """撮影日時と画素数も保持する"""
+    records = [
+        MediaFileInfo("a.jpg", "jpg", "a.jpg", 1, None, "2023-07-14T09:30:00", 40, 30),
+        MediaFileInfo("b.mp4", "mp4", "b.mp4", 2),
+        MediaFileInfo("c.png", "png", "c.png", 3, None, None, 800, 600),
+    ]
+
+    assert list(MediaTable(records)) == records
+
+
+def test_table_aggregations():
+    """拡張子ごとの件数・合計サイズを集計できる"""
+    table = MediaTable(
+        [
+            MediaFileInfo("a.jpg", "jpg", "a.jpg", 10),
+            MediaFileInfo("b.mp4", "mp4", "b.mp4", 100),
+            MediaFileInfo("c.jpg", "jpg", "c.jpg", 5),
+        ]
+    )
+
+    assert table.total_size() == 115
+    assert table.count_by_extension() == {"jpg": 2, "mp4": 1}
+    assert table.size_by_extension() == {"jpg": 15, "mp4": 100}
+
+
+def test_table_rejects_inconsistent_record():
+    """relative_path が filename で終わらないレコードは拒否する"""
+    with pytest.raises(ValueError):
+        MediaTable([MediaFileInfo("a.jpg", "jpg", "b.jpg", 1)])
@@ -0,0 +1,229 @@
+import io
+import struct
+import time
+from pathlib import Path
+
+from photo_mover.binary_exporter import read_binary, write_binary
+from photo_mover.csv_exporter import read_csv, scan_media, write_csv
+from photo_mover.hash_cache import HashCache
+from photo_mover.metadata import HEADER_BYTES, MediaMetadata, read_metadata
+
+
+def create_file(path: Path, content: bytes = b"x") -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    return path
+
+
+def tiff(taken: str = "2023:07:14 09:30:00", width: int = 4032, height: int = 3024):
+    """IFD0 -> Exif IFD (DateTimeOriginal, PixelX/YDimension) のリトルエンディアン TIFF"""
+    date = taken.encode() + b"\0"
+    ifd0 = 8
+    exif_ifd = ifd0 + 2 + 12 + 4
+    date_at = exif_ifd + 2 + 3 * 12 + 4
+    out = b"II*\0" + struct.pack("<I", ifd0)
+    out += struct.pack("<H", 1) + struct.pack("<HHII", 0x8769, 4, 1, exif_ifd)
+    out += struct.pack("<I", 0)
+    out += struct.pack("<H", 3)
+    out += struct.pack("<HHII", 0x9003, 2, len(date), date_at)
+    out += struct.pack("<HHIHH", 0xA002, 3, 1, width, 0)
+    out += struct.pack("<HHII", 0xA003, 4, 1, height)
+    out += struct.pack("<I", 0)
+    return out + date
+
+
+def jpeg(exif: bytes, width: int = 640, height: int = 480) -> bytes:
+    app1 = b"Exif\0\0" + exif
+    sof = struct.pack(">BHHB", 8, height, width, 3) + b"\x01\x22\x00" * 3
+    return (
+        b"\xff\xd8"
+        + b"\xff\xe1"
+        + struct.pack(">H", len(app1) + 2)
+        + app1
+        + b"\xff\xc0"
+        + struct.pack(">H", len(sof) + 2)
+        + sof
+        + b"\xff\xda\x00\x02"
+        + b"\x00" * 32
+        + b"\xff\xd9"
+    )
+
+
+def png_chunk(kind: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + kind + data + b"\0\0\0\0"
+
+
+def box(kind: bytes, payload: bytes) -> bytes:
+    return struct.pack(">I", len(payload) + 8) + kind + payload
+
+
+def full_box(kind: bytes, version: int, payload: bytes) -> bytes:
+    return box(kind, bytes([version, 0, 0, 0]) + payload)
+
+
+def mp4(created: int, width: int, height: int, padding: int = 0) -> bytes:
+    """moov をファイル末尾に置いた MP4"""
+    mvhd = full_box(b"mvhd", 0, struct.pack(">II", created, created) + b"\0" * 88)
+    tkhd = full_box(
+        b"tkhd",
+        0,
+        b"\0" * 72 + struct.pack(">II", width << 16, height << 16),
+    )
+    moov = box(b"moov", mvhd + box(b"trak", tkhd))
+    return box(b"ftyp", b"isom\0\0\0\0isom") + box(b"mdat", b"\0" * padding) + moov
+
+
+def heic(exif: bytes, width: int, height: int) -> bytes:
+    """プライマリ画像 (item 1) と mdat 内の Exif アイテム (item 2) を持つ HEIC"""
+    ftyp = box(b"ftyp", b"heic\0\0\0\0mif1heic")
+    pitm = full_box(b"pitm", 0, struct.pack(">H", 1))
+    infe_image = full_box(b"infe", 2, struct.pack(">HH4s", 1, 0, b"hvc1") + b"\0")
+    infe_exif = full_box(b"infe", 2, struct.pack(">HH4s", 2, 0, b"Exif") + b"\0")
+    iinf = full_box(b"iinf", 0, struct.pack(">H", 2) + infe_image + infe_exif)
+    ispe = full_box(b"ispe", 0, struct.pack(">II", width, height))
+    ipco = box(b"ipco", box(b"hvcC", b"\0" * 4) + ispe)
+    ipma = full_box(
+        b"ipma", 0, struct.pack(">I", 1) + struct.pack(">HB", 1, 2) + bytes([1, 2])
+    )
+    iprp = box(b"iprp", ipco + ipma)
+    item = struct.pack(">I", 6) + b"Exif\0\0" + exif
+
+    def iloc(offset: int) -> bytes:
+        return full_box(
+            b"iloc",
+            0,
+            bytes([0x44, 0x00])
+            + struct.pack(">H", 1)
+            + struct.pack(">HHH", 2, 0, 1)
+            + struct.pack(">II", offset, len(item)),
+        )
+
+    meta_size = len(full_box(b"meta", 0, pitm + iinf + iloc(0) + iprp))
+    offset = len(ftyp) + meta_size + 8
+    meta = full_box(b"meta", 0, pitm + iinf + iloc(offset) + iprp)
+    return ftyp + meta + box(b"mdat", item)
+
+
+def test_read_metadata_jpeg(tmp_path):
+    """JPEG は EXIF から撮影日時、SOF から画素数を読む"""
+    path = create_file(tmp_path / "a.jpg", jpeg(tiff(), 640, 480))
+
+    assert read_metadata(path) == MediaMetadata("2023-07-14T09:30:00", 640, 480)
+
+
+def test_read_metadata_png(tmp_path):
+    """PNG は IHDR の画素数と eXIf の撮影日時を読む"""
+    ihdr = struct.pack(">IIBBBBB", 800, 600, 8, 2, 0, 0, 0)
+    data = (
+        b"\x89PNG\r\n\x1a\n"
+        + png_chunk(b"IHDR", ihdr)
+        + png_chunk(b"eXIf", tiff("2020:01:02 03:04:05"))
+        + png_chunk(b"IEND", b"")
+    )
+    path = create_file(tmp_path / "a.png", data)
+
+    assert read_metadata(path) == MediaMetadata("2020-01-02T03:04:05", 800, 600)
+
+
+def test_read_metadata_mp4_moov_at_end(tmp_path):
+    """moov が先頭の読み込み範囲外にある MP4 も追加の読み込みで解析する"""
+    created = 1_700_000_000
+    data = mp4(created + 2082844800, 1920, 1080, padding=HEADER_BYTES * 2)
+    path = create_file(tmp_path / "a.mp4", data)
+
+    expected = time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(created))
+    assert read_metadata(path) == MediaMetadata(expected, 1920, 1080)
+
+
+def test_read_metadata_mp4_time_out_of_range(tmp_path):
+    """範囲外の作成日時 (64 ビットの mvhd) は無視し、例外にしない"""
+    mvhd = full_box(b"mvhd", 1, struct.pack(">QQ", 2**63, 2**63) + b"\0" * 96)
+    moov = box(b"moov", mvhd)
+    path = create_file(tmp_path / "a.mp4", box(b"ftyp", b"isom\0\0\0\0isom") + moov)
+
+    assert read_metadata(path) == MediaMetadata()
+
+
+def test_read_metadata_heic(tmp_path):
+    """HEIC はプライマリアイテムの ispe と Exif アイテムを読む"""
+    path = create_file(
+        tmp_path / "a.heic", heic(tiff("2019:05:06 07:08:09"), 4032, 3024)
+    )
+
+    assert read_metadata(path) == MediaMetadata("2019-05-06T07:08:09", 4032, 3024)
+
+
+def test_read_metadata_unknown_or_broken(tmp_path):
+    """未知の形式や壊れたヘッダーは空のメタデータになる"""
+    text = create_file(tmp_path / "a.txt", b"hello")
+    broken = create_file(tmp_path / "b.jpg", jpeg(tiff())[:20])
+
+    assert read_metadata(text) == MediaMetadata()
+    assert read_metadata(broken).width is None
+
+
+def test_scan_media_include_metadata_uses_cache(tmp_path, monkeypatch):
+    """メタデータは2回目のスキャンでキャッシュから読む"""
+    src = tmp_path / "photos"
+    create_file(src / "a.jpg", jpeg(tiff(), 640, 480))
+    create_file(src / "b.txt", b"not media")
+    db = tmp_path / "cache.db"
+
+    with HashCache(db) as cache:
+        first = list(scan_media(src, include_metadata=True, hash_cache=cache))
+
+    calls = []
+    monkeypatch.setattr(
+        "photo_mover.csv_exporter.read_metadata", lambda p: calls.append(p)
+    )
+    with HashCache(db) as cache:
+        second = list(scan_media(src, include_metadata=True, hash_cache=cache))
+
+    assert calls == []
+    assert second == first
+    assert (first[0].taken_at, first[0].width, first[0].height) == (
+        "2023-07-14T09:30:00",
+        640,
+        480,
+    )
+    assert first[1].taken_at is None and first[1].width is None
+
+
+def test_scan_media_metadata_with_hash_on_process_pool(tmp_path):
+    """ハッシュとメタデータはプロセスプールでも同じ結果になる"""
+    src = tmp_path / "photos"
+    for i in range(4):
+        create_file(src / f"{i}.jpg", jpeg(tiff(), 100 + i, 50))
+
+    serial = list(scan_media(src, include_hash=True, include_metadata=True))
+    pooled = list(
+        scan_media(
+            src,
+            include_hash=True,
+            include_metadata=True,
+            hash_workers=2,
+            hash_executor="process",
+        )
+    )
+
+    assert pooled == serial
+    assert [r.width for r in serial] == [100, 101, 102, 103]
+
+
+def test_metadata_columns_round_trip(tmp_path):
+    """メタデータ列は CSV とバイナリ形式で往復できる"""
+    src = tmp_path / "photos"
+    create_file(src / "a.jpg", jpeg(tiff(), 640, 480))
+    create_file(src / "b.txt", b"not media")
+    records = list(scan_media(src, include_hash=True, include_metadata=True))
+
+    text = io.StringIO()
+    write_csv(records, text, include_hash=True, include_metadata=True)
+    assert text.getvalue().splitlines()[0].endswith("sha256,taken_at,width,height")
+    text.seek(0)
+    assert list(read_csv(text)) == records
+
+    buf = io.BytesIO()
+    write_binary(records, buf, include_hash=True, include_metadata=True)
+    buf.seek(0)
+    assert list(read_binary(buf)) == records
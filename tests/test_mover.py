@@ -1,7 +1,17 @@
+import errno
+import hashlib
 from pathlib import Path
+import os
 import tempfile
+import time
 import shutil
-from photo_mover.mover import move_media
+
+import pytest
+
+from photo_mover import mover
+from photo_mover.hash_cache import HashCache
+from photo_mover.metadata import MediaMetadata
+from photo_mover.mover import iter_moves, move_media
 
 
 def touch(path: Path):
@@ -33,3 +43,322 @@ def test_dry_run(tmp_path):
     moved = move_media(src, dst, recursive=False, dry_run=True)
     assert len(moved) == 1
     assert not (dst / "f.png").exists()
+
+
+def test_move_recursive_flattens(tmp_path):
+    src = tmp_path / "src3"
+    dst = tmp_path / "dst3"
+    touch(src / "a.jpg")
+    touch(src / "sub" / "b.mov")
+    touch(src / "sub" / "notes.txt")
+
+    moved = move_media(src, dst, recursive=True, dry_run=False)
+    assert moved == [dst / "a.jpg", dst / "b.mov"]
+    assert (dst / "b.mov").exists()
+    assert (src / "sub" / "notes.txt").exists()
+
+
+def test_move_parallel_same_device(tmp_path):
+    src = tmp_path / "src4"
+    dst = tmp_path / "dst4"
+    for i in range(10):
+        touch(src / f"{i}.jpg")
+
+    moved = move_media(src, dst, dry_run=False, jobs=4)
+    assert moved == [dst / f"{i}.jpg" for i in range(10)]
+    assert all(p.exists() for p in moved)
+
+
+def test_move_parallel_cross_device(tmp_path, monkeypatch):
+    src = tmp_path / "src5"
+    dst = tmp_path / "dst5"
+    for i in range(10):
+        touch(src / f"{i:02}.jpg")
+    touch(src / "bad.jpg")
+    dst.mkdir()
+
+    real_stat = os.stat
+
+    def fake_stat(path, *args, **kwargs):
+        st = real_stat(path, *args, **kwargs)
+        if str(path) == str(dst):
+            fields = list(st)
+            fields[2] = st.st_dev + 1  # st_dev
+            return os.stat_result(fields)
+        return st
+
+    real_transfer = mover.transfer_file
+
+    def flaky_transfer(s, d, **kwargs):
+        if s.name == "bad.jpg":
+            raise OSError("unplugged")
+        return real_transfer(s, d, **kwargs)
+
+    monkeypatch.setattr(os, "stat", fake_stat)
+    monkeypatch.setattr(mover, "transfer_file", flaky_transfer)
+
+    moved = move_media(src, dst, dry_run=False, jobs=3, per_device=2)
+    assert moved == [dst / f"{i:02}.jpg" for i in range(10)]
+    assert (src / "bad.jpg").exists()
+
+
+def test_move_verify_returns_digests(tmp_path):
+    src = tmp_path / "src6"
+    dst = tmp_path / "dst6"
+    touch(src / "a.jpg")
+    digests = {}
+
+    moved = move_media(src, dst, dry_run=False, verify=True, digests=digests)
+    assert moved == [dst / "a.jpg"]
+    assert digests == {dst / "a.jpg": hashlib.sha256(b"x").hexdigest()}
+
+
+def test_move_verify_mismatch_keeps_source(tmp_path, monkeypatch):
+    src = tmp_path / "src7"
+    dst = tmp_path / "dst7"
+    touch(src / "a.jpg")
+    monkeypatch.setattr(os, "rename", _exdev)
+
+    with HashCache(tmp_path / "cache.db") as cache:
+        cache.store(src / "a.jpg", (src / "a.jpg").stat(), "0" * 64)
+        moved = move_media(src, dst, dry_run=False, verify=True, hash_cache=cache)
+
+    assert moved == []
+    assert (src / "a.jpg").exists()
+    assert not (dst / "a.jpg").exists()
+
+
+def _exdev(*args):
+    raise OSError(errno.EXDEV, "cross-device link")
+
+
+def _library(tmp_path):
+    src = tmp_path / "card"
+    dst = tmp_path / "library"
+    (dst / "2023").mkdir(parents=True)
+    (dst / "2023" / "old.jpg").write_bytes(b"already imported")
+    (src).mkdir()
+    (src / "IMG_1.jpg").write_bytes(b"already imported")
+    (src / "IMG_2.jpg").write_bytes(b"new photo")
+    return src, dst
+
+
+def test_move_on_duplicate_skip(tmp_path):
+    src, dst = _library(tmp_path)
+
+    dry = move_media(src, dst, dry_run=True, on_duplicate="skip")
+    moved = move_media(src, dst, dry_run=False, on_duplicate="skip")
+    assert moved == dry == [dst / "IMG_2.jpg"]
+    assert (src / "IMG_1.jpg").exists()
+    assert not (dst / "IMG_1.jpg").exists()
+
+
+def test_move_on_duplicate_hardlink(tmp_path):
+    src, dst = _library(tmp_path)
+
+    moved = move_media(src, dst, dry_run=False, on_duplicate="hardlink")
+    assert moved == [dst / "IMG_1.jpg", dst / "IMG_2.jpg"]
+    assert not (src / "IMG_1.jpg").exists()
+    assert os.path.samefile(dst / "IMG_1.jpg", dst / "2023" / "old.jpg")
+
+
+def test_move_on_duplicate_delete(tmp_path):
+    src, dst = _library(tmp_path)
+
+    moved = move_media(src, dst, dry_run=False, on_duplicate="delete")
+    assert moved == [dst / "IMG_2.jpg"]
+    assert not (src / "IMG_1.jpg").exists()
+    assert not (dst / "IMG_1.jpg").exists()
+
+
+def test_move_on_duplicate_within_source(tmp_path):
+    src = tmp_path / "card2"
+    dst = tmp_path / "library2"
+    touch(src / "a.jpg")
+    touch(src / "b.jpg")
+
+    dry = move_media(src, dst, dry_run=True, on_duplicate="skip")
+    moved = move_media(src, dst, dry_run=False, on_duplicate="skip")
+    assert moved == dry == [dst / "a.jpg"]
+    assert (src / "b.jpg").exists()
+
+
+def test_move_on_duplicate_hardlink_within_source_planned(tmp_path):
+    """取り込み内の重複は、先に計画したファイルの移動先へリンクする"""
+    src = tmp_path / "card3"
+    dst = tmp_path / "library3"
+    touch(src / "a.jpg")
+    touch(src / "b.jpg")
+
+    plan = mover.build_plan(src, dst, on_duplicate="hardlink")
+    assert plan.ops[1].existing == dst / "a.jpg"
+
+    moved = mover.execute_plan(plan, dry_run=False)
+    assert moved == [dst / "a.jpg", dst / "b.jpg"]
+    assert not (src / "a.jpg").exists() and not (src / "b.jpg").exists()
+    assert os.path.samefile(dst / "a.jpg", dst / "b.jpg")
+
+
+def test_move_flatten_collision_is_suffixed(tmp_path):
+    src = tmp_path / "src8"
+    dst = tmp_path / "dst8"
+    (src / "a").mkdir(parents=True)
+    (src / "b").mkdir(parents=True)
+    (src / "a" / "IMG_0001.jpg").write_bytes(b"first")
+    (src / "b" / "IMG_0001.jpg").write_bytes(b"second")
+
+    dry = move_media(src, dst, recursive=True, dry_run=True)
+    moved = move_media(src, dst, recursive=True, dry_run=False)
+    assert moved == dry == [dst / "IMG_0001.jpg", dst / "IMG_0001_1.jpg"]
+    assert (dst / "IMG_0001.jpg").read_bytes() == b"first"
+    assert (dst / "IMG_0001_1.jpg").read_bytes() == b"second"
+
+
+def test_move_layout(tmp_path):
+    src = tmp_path / "src9"
+    dst = tmp_path / "dst9"
+    touch(src / "a.jpg")
+    os.utime(src / "a.jpg", (1_600_000_000, 1_600_000_000))
+    year = time.strftime("%Y", time.localtime(1_600_000_000))
+
+    moved = move_media(src, dst, dry_run=False, layout="{year}/{ext}/{name}")
+    assert moved == [dst / year / "jpg" / "a.jpg"]
+    assert moved[0].exists()
+
+
+def test_move_io_concurrency(tmp_path):
+    src = tmp_path / "src10"
+    dst = tmp_path / "dst10"
+    touch(src / "a.jpg")
+    touch(src / "sub" / "b.mov")
+    touch(src / "sub" / "deeper" / "c.png")
+
+    dry = move_media(src, dst, recursive=True, dry_run=True)
+    moved = move_media(src, dst, recursive=True, dry_run=False, io_concurrency=4)
+    assert moved == dry == [dst / "a.jpg", dst / "b.mov", dst / "c.png"]
+
+
+def test_move_layout_date_taken(tmp_path, monkeypatch):
+    src = tmp_path / "src11"
+    dst = tmp_path / "dst11"
+    touch(src / "a.jpg")
+    touch(src / "b.jpg")
+    taken = {"a.jpg": MediaMetadata("2019-05-06T07:08:09"), "b.jpg": MediaMetadata()}
+    monkeypatch.setattr(mover, "read_metadata", lambda p: taken[p.name])
+    mtime_year = time.strftime("%Y", time.localtime((src / "b.jpg").stat().st_mtime))
+
+    moved = move_media(
+        src, dst, dry_run=False, layout="{year}/{name}", layout_date="taken"
+    )
+    assert moved == [dst / "2019" / "a.jpg", dst / mtime_year / "b.jpg"]
+
+
+def test_move_layout_date_reads_metadata_only_for_date_layouts(tmp_path, monkeypatch):
+    src = tmp_path / "src12"
+    dst = tmp_path / "dst12"
+    touch(src / "a.jpg")
+    monkeypatch.setattr(mover, "read_metadata", lambda p: 1 / 0)
+
+    moved = move_media(
+        src, dst, dry_run=False, layout="{ext}/{name}", layout_date="taken"
+    )
+    assert moved == [dst / "jpg" / "a.jpg"]
+
+
+def test_iter_moves_yields_results(tmp_path, monkeypatch):
+    src = tmp_path / "src13"
+    dst = tmp_path / "dst13"
+    (src / "a.jpg").parent.mkdir(parents=True)
+    (src / "a.jpg").write_bytes(b"aaaa")
+    (src / "b.jpg").write_bytes(b"dup")
+    (src / "c.jpg").write_bytes(b"cc")
+    dst.mkdir()
+    (dst / "old.jpg").write_bytes(b"dup")
+    transfer = mover.transfer_file
+
+    def failing(p, target, **kwargs):
+        if p.name == "c.jpg":
+            raise OSError("disk full")
+        return transfer(p, target, **kwargs)
+
+    monkeypatch.setattr(mover, "transfer_file", failing)
+
+    results = {
+        r.source.name: r
+        for r in iter_moves(src, dst, dry_run=False, on_duplicate="skip")
+    }
+
+    a, b, c = results["a.jpg"], results["b.jpg"], results["c.jpg"]
+    assert (a.status, a.target, a.size, a.method) == (
+        "moved",
+        dst / "a.jpg",
+        4,
+        "rename",
+    )
+    assert a.placed and a.seconds >= 0 and a.error is None
+    assert (b.status, b.target, b.placed) == ("skipped", None, False)
+    assert (c.status, c.error, c.placed) == ("failed", "disk full", False)
+    assert (src / "c.jpg").exists()
+
+
+@pytest.mark.parametrize("journaled", [False, True])
+def test_iter_moves_reports_planning_errors(tmp_path, monkeypatch, journaled):
+    """計画段階で失敗したファイルも failed として結果に出る"""
+    src = tmp_path / "src"
+    dst = tmp_path / "dst"
+    for name in ["a.jpg", "b.jpg", "c.jpg"]:
+        touch(src / name)
+
+    def read(p):
+        if p.name == "b.jpg":
+            raise PermissionError(errno.EACCES, "Permission denied", str(p))
+        return MediaMetadata("2019-05-06T07:08:09")
+
+    monkeypatch.setattr(mover, "read_metadata", read)
+    journal = tmp_path / "moves.journal" if journaled else None
+
+    results = list(
+        iter_moves(
+            src,
+            dst,
+            dry_run=False,
+            layout="{year}/{name}",
+            layout_date="taken",
+            journal=journal,
+        )
+    )
+
+    assert [(r.source.name, r.status) for r in results] == [
+        ("a.jpg", "moved"),
+        ("b.jpg", "failed"),
+        ("c.jpg", "moved"),
+    ]
+    b = results[1]
+    assert (b.target, b.size, b.placed) == (None, 1, False)
+    assert "Permission denied" in b.error
+    assert (src / "b.jpg").exists()
+    if journaled:
+        ops = mover.load_journal(journal).ops
+        assert [op.source.name for op in ops] == ["a.jpg", "c.jpg"]
+
+
+def test_iter_moves_is_lazy(tmp_path):
+    src = tmp_path / "src14"
+    dst = tmp_path / "dst14"
+    touch(src / "a.jpg")
+    touch(src / "b.jpg")
+
+    results = iter_moves(src, dst, dry_run=False)
+    assert not dst.exists()
+
+    first = next(results)
+    assert first.target.exists()
+    assert len(list(src.iterdir())) == 1
+
+    assert [r.status for r in results] == ["moved"]
+    assert not list(src.iterdir())
+
+
+def test_iter_moves_checks_options_on_call(tmp_path):
+    with pytest.raises(ValueError):
+        iter_moves(tmp_path / "missing", tmp_path / "dst", jobs=0)
@@ -0,0 +1,79 @@
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from photo_mover.naming import TargetAllocator, validate_layout
+
+
+def create_file(path: Path, content: bytes = b"x") -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    return path
+
+
+def test_allocate_suffixes_existing_and_reserved_names(tmp_path):
+    """既存・割り当て済みの名前には連番を付ける"""
+    dst = tmp_path / "dst"
+    create_file(dst / "IMG_0001.jpg")
+    src = create_file(tmp_path / "src" / "IMG_0001.jpg")
+    allocator = TargetAllocator(dst)
+
+    st = src.stat()
+    assert allocator.allocate("IMG_0001.jpg", st) == dst / "IMG_0001_1.jpg"
+    assert allocator.allocate("IMG_0001.jpg", st) == dst / "IMG_0001_2.jpg"
+    assert allocator.allocate("IMG_0002.jpg", st) == dst / "IMG_0002.jpg"
+
+
+def test_allocate_hash_collision(tmp_path):
+    """hash 方式では内容ハッシュを名前に付ける"""
+    dst = tmp_path / "dst"
+    create_file(dst / "a.jpg")
+    src = create_file(tmp_path / "src" / "a.jpg")
+    allocator = TargetAllocator(dst, on_collision="hash")
+
+    target = allocator.allocate("a.jpg", src.stat(), lambda: "0123456789abcdef")
+
+    assert target == dst / "a_0123456789ab.jpg"
+
+
+def test_allocate_layout_uses_mtime(tmp_path):
+    """レイアウトテンプレートの日付は mtime から決まる"""
+    src = create_file(tmp_path / "src" / "a.JPG")
+    ts = time.mktime((2021, 3, 4, 12, 0, 0, 0, 0, -1))
+    os.utime(src, (ts, ts))
+    allocator = TargetAllocator(tmp_path / "dst", "{year}/{month}/{day}/{stem}.{ext}")
+
+    target = allocator.allocate("a.JPG", src.stat())
+
+    assert target == tmp_path / "dst" / "2021" / "03" / "04" / "a.JPG"
+
+
+def test_allocator_sees_nested_existing_files(tmp_path):
+    """サブディレクトリの既存ファイルも衝突判定に含める"""
+    dst = tmp_path / "dst"
+    create_file(dst / "2021" / "a.jpg")
+    src = create_file(tmp_path / "src" / "a.jpg")
+    allocator = TargetAllocator(dst, "2021/{name}")
+
+    assert allocator.allocate("a.jpg", src.stat()) == dst / "2021" / "a_1.jpg"
+
+
+@pytest.mark.parametrize("layout", ["{camera}/{name}", "/abs/{name}", "../{name}", ""])
+def test_validate_layout_rejects(layout):
+    """未知のフィールドや絶対パス・親ディレクトリ参照はエラー"""
+    with pytest.raises(ValueError):
+        validate_layout(layout)
+
+
+def test_allocate_layout_uses_taken_at(tmp_path):
+    """taken_at を渡すとレイアウトの日付は撮影日時から決まる"""
+    src = create_file(tmp_path / "src" / "a.jpg")
+    allocator = TargetAllocator(tmp_path / "dst", "{year}/{month}/{day}/{name}")
+
+    target = allocator.allocate("a.jpg", src.stat(), taken_at="2019-05-06T07:08:09")
+
+    assert allocator.uses_dates
+    assert target == tmp_path / "dst" / "2019" / "05" / "06" / "a.jpg"
+    assert not TargetAllocator(tmp_path / "dst", "{ext}/{name}").uses_dates
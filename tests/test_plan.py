@@ -0,0 +1,100 @@
+from pathlib import Path
+
+from photo_mover import mover
+from photo_mover.mover import build_plan, execute_plan, move_media
+from photo_mover.plan import MovePlan, PlannedMove
+
+
+def create_file(path: Path, content: bytes = b"x") -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    return path
+
+
+def test_build_plan_matches_dry_run(tmp_path):
+    """計画のターゲットは dry run の結果と一致し、何も変更しない"""
+    src = tmp_path / "src"
+    dst = tmp_path / "dst"
+    create_file(src / "a" / "IMG.jpg", b"1")
+    create_file(src / "b" / "IMG.jpg", b"22")
+
+    plan = build_plan(src, dst, recursive=True)
+    assert not dst.exists()
+
+    assert [op.target for op in plan] == move_media(src, dst, recursive=True)
+    assert plan.total_bytes == 3
+
+
+def test_plan_roundtrip(tmp_path):
+    """保存した計画を読み込むと同じ内容になる"""
+    src = tmp_path / "src"
+    dst = tmp_path / "dst"
+    plan = MovePlan(
+        src,
+        dst,
+        [
+            PlannedMove(src / "a.jpg", dst / "2024" / "a.jpg", 10, 5, sha256="ab"),
+            PlannedMove(src / "b.jpg", None, 3, 5, "skip", dst / "old.jpg"),
+        ],
+    )
+    path = tmp_path / "plan.jsonl"
+
+    plan.save(path)
+
+    assert MovePlan.load(path) == plan
+    assert str(src) not in path.read_text().split("\n", 1)[1]
+
+
+def test_execution_order_groups_by_device_and_directory(tmp_path):
+    """実行順はデバイス→ディレクトリ順にまとめられる"""
+    ops = [
+        PlannedMove(Path("/s/b/1.jpg"), Path("/d/1.jpg"), 1, 2),
+        PlannedMove(Path("/s/a/2.jpg"), Path("/d/2.jpg"), 1, 1),
+        PlannedMove(Path("/s/a/3.jpg"), Path("/d/3.jpg"), 1, 2),
+    ]
+    plan = MovePlan(Path("/s"), Path("/d"), ops)
+
+    assert [i for i, _ in plan.execution_order()] == [1, 2, 0]
+
+
+def test_execution_order_links_after_moves(tmp_path):
+    """ハードリンクは同じ計画の移動より後に実行される"""
+    ops = [
+        PlannedMove(Path("/s/b.jpg"), Path("/d/b.jpg"), 1, 1, "move"),
+        PlannedMove(
+            Path("/s/a.jpg"), Path("/d/a.jpg"), 1, 1, "hardlink", Path("/d/b.jpg")
+        ),
+    ]
+    plan = MovePlan(Path("/s"), Path("/d"), ops)
+
+    assert [i for i, _ in plan.execution_order()] == [0, 1]
+
+
+def test_execute_plan_keeps_target_created_after_planning(tmp_path):
+    """計画後に作られたファイルは上書きせず、その操作は失敗にする"""
+    src = tmp_path / "src"
+    dst = tmp_path / "dst"
+    create_file(src / "a.jpg", b"planned")
+    plan = build_plan(src, dst)
+    create_file(dst / "a.jpg", b"arrived later")
+
+    assert execute_plan(plan, dry_run=False) == []
+    assert (src / "a.jpg").read_bytes() == b"planned"
+    assert (dst / "a.jpg").read_bytes() == b"arrived later"
+
+
+def test_execute_plan_without_rescan(tmp_path, monkeypatch):
+    """計画の実行ではソースを再走査せず、ディレクトリは一括作成する"""
+    src = tmp_path / "src"
+    dst = tmp_path / "dst"
+    create_file(src / "a.jpg", b"1")
+    create_file(src / "b.jpg", b"2")
+    plan_path = tmp_path / "plan.jsonl"
+    build_plan(src, dst, layout="{ext}/{name}").save(plan_path)
+    monkeypatch.setattr(mover, "walk_files", None)
+
+    moved = execute_plan(MovePlan.load(plan_path), dry_run=False)
+
+    assert moved == [dst / "jpg" / "a.jpg", dst / "jpg" / "b.jpg"]
+    assert all(p.exists() for p in moved)
+    assert not (src / "a.jpg").exists()
@@ -0,0 +1,139 @@
+import io
+import json
+from pathlib import Path
+
+from photo_mover.csv_exporter import scan_media
+from photo_mover.filters import FileFilter
+from photo_mover.mover import build_plan, execute_plan, move_media
+from photo_mover.progress import Progress
+
+
+def create_file(path: Path, content: bytes = b"x") -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    return path
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_progress_lines_are_rate_limited():
+    """進捗行は interval ごとに 1 回だけ出力される"""
+    clock = FakeClock()
+    out = io.StringIO()
+    progress = Progress(out, interval=1.0, clock=clock)
+
+    for _ in range(10):
+        clock.now += 0.25
+        progress.add("seen")
+    progress.finish()
+    progress.finish()
+
+    lines = out.getvalue().splitlines()
+    assert len(lines) == 3
+    assert lines[0].startswith("4 seen")
+    assert lines[-1].startswith("10 seen")
+
+
+def test_progress_eta_from_expected_bytes():
+    """総量が分かっていればバイト数の進み具合から ETA を計算する"""
+    clock = FakeClock()
+    progress = Progress(io.StringIO(), render=False, clock=clock)
+    progress.expect(4, 400)
+
+    clock.now += 10
+    progress.add("moved", nbytes=100)
+
+    assert progress.eta() == 30
+    assert "1/4" in progress.format_line()
+    assert "ETA 0:00:30" in progress.format_line()
+
+
+def test_scan_media_counts_seen_filtered_hashed(tmp_path):
+    """スキャンは見つけた・除外した・ハッシュ計算したファイル数を数える"""
+    src = tmp_path / "photos"
+    create_file(src / "a.jpg", b"12345")
+    create_file(src / "b.jpg", b"123")
+    create_file(src / "c.txt", b"no")
+    progress = Progress(io.StringIO(), render=False)
+
+    records = list(
+        scan_media(
+            src,
+            include_hash=True,
+            file_filter=FileFilter(extensions=["jpg"]),
+            progress=progress,
+        )
+    )
+
+    assert len(records) == 2
+    summary = progress.summary()
+    assert (summary["seen"], summary["filtered"], summary["hashed"]) == (2, 1, 2)
+    assert summary["bytes"] == 8
+
+
+def test_move_counts_and_device_stats(tmp_path):
+    """移動は移動・重複・失敗件数とデバイスごとの転送量を数える"""
+    src = tmp_path / "src"
+    dst = tmp_path / "dst"
+    create_file(src / "a.jpg", b"aaaa")
+    create_file(src / "b.jpg", b"dup")
+    create_file(dst / "old.jpg", b"dup")
+    progress = Progress(io.StringIO(), render=False)
+
+    move_media(src, dst, dry_run=False, on_duplicate="skip", progress=progress)
+
+    summary = progress.summary()
+    assert (summary["seen"], summary["moved"], summary["duplicates"]) == (2, 1, 1)
+    assert summary["bytes"] == 4
+    [device] = summary["devices"].values()
+    assert (device["files"], device["bytes"]) == (1, 4)
+
+
+def test_execute_plan_sets_totals(tmp_path):
+    """計画の実行では総件数・総バイト数が ETA 用に設定される"""
+    src = tmp_path / "src"
+    create_file(src / "a.jpg", b"aaaa")
+    create_file(src / "b.jpg", b"bb")
+    plan = build_plan(src, tmp_path / "dst")
+    progress = Progress(io.StringIO(), render=False)
+
+    execute_plan(plan, dry_run=False, progress=progress)
+
+    assert (progress.total_files, progress.total_bytes) == (2, 6)
+    assert progress.done == 2
+
+
+def test_write_json(tmp_path):
+    """write_json は集計と追加セクションを書き出す"""
+    progress = Progress(io.StringIO(), render=False)
+    progress.add("seen", 3)
+
+    progress.write_json(tmp_path / "stats.json", hash_cache={"hits": 1})
+
+    data = json.loads((tmp_path / "stats.json").read_text())
+    assert data["seen"] == 3
+    assert data["hash_cache"] == {"hits": 1}
+
+
+class FakeTTY(io.StringIO):
+    def isatty(self):
+        return True
+
+
+def test_clear_erases_status_line():
+    """clear は端末上の進捗行を消し、次の更新で再描画する"""
+    out = FakeTTY()
+    progress = Progress(out, interval=0)
+    progress.add("seen")
+
+    line = out.getvalue()
+    progress.clear()
+    progress.clear()
+
+    assert out.getvalue() == line + "\r" + " " * (len(line) - 1) + "\r"
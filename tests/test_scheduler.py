@@ -0,0 +1,62 @@
+import threading
+import time
+
+import pytest
+
+from photo_mover.scheduler import DeviceScheduler
+
+
+def test_scheduler_limits_in_flight_per_device():
+    """デバイスごとの同時実行数が per_device を超えない"""
+    lock = threading.Lock()
+    running = {1: 0, 2: 0}
+    peak = {1: 0, 2: 0}
+
+    def job(dev):
+        with lock:
+            running[dev] += 1
+            peak[dev] = max(peak[dev], running[dev])
+        time.sleep(0.01)
+        with lock:
+            running[dev] -= 1
+        return dev
+
+    with DeviceScheduler(jobs=6, per_device=2) as scheduler:
+        futures = [scheduler.submit([dev], job, dev) for dev in [1, 2] * 6]
+        results = [f.result() for f in futures]
+
+    assert results == [1, 2] * 6
+    assert peak[1] <= 2
+    assert peak[2] <= 2
+
+
+def test_scheduler_backlog_does_not_starve_other_devices():
+    """埋まったデバイスの待ち行列がスレッドを塞がず、他のデバイスのジョブが進む"""
+    release = threading.Event()
+
+    with DeviceScheduler(jobs=2, per_device=1) as scheduler:
+        slow = [scheduler.submit([1], release.wait, 5) for _ in range(3)]
+        fast = scheduler.submit([2], lambda: "done")
+        assert fast.result(timeout=5) == "done"
+        assert not any(f.done() for f in slow[1:])
+        release.set()
+
+    assert all(f.result() for f in slow)
+
+
+def test_scheduler_propagates_exceptions():
+    """ジョブの例外は Future から取得できる"""
+
+    def boom():
+        raise RuntimeError("boom")
+
+    with DeviceScheduler(jobs=2) as scheduler:
+        fut = scheduler.submit([1, 2], boom)
+        with pytest.raises(RuntimeError):
+            fut.result()
+
+
+def test_scheduler_rejects_zero_jobs():
+    """jobs が 0 以下ならValueError"""
+    with pytest.raises(ValueError):
+        DeviceScheduler(jobs=0)
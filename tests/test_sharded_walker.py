@@ -0,0 +1,76 @@
+import io
+
+import pytest
+
+from photo_mover.csv_exporter import scan_media, write_csv
+from photo_mover.filters import FileFilter
+from photo_mover.sharded_walker import walk_files_sharded
+from photo_mover.walker import walk_files
+
+
+def create_file(path, content=b"x"):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    return path
+
+
+def make_tree(root):
+    for rel in ["b.jpg", "a/z.jpg", "a/b/c.png", "a.jpg", "c/readme.txt", "c/d/e.mp4"]:
+        create_file(root / rel, rel.encode())
+    for i in range(5):
+        for j in range(4):
+            create_file(root / "big" / f"d{i}" / f"{j}.jpg", b"y" * (i + j))
+    create_file(root / "a" / ".git" / "x.jpg")
+    (root / "empty").mkdir()
+
+
+def entries(walk):
+    return [(e.name, e.path, e.stat().st_size, e.stat().st_mtime_ns) for e in walk]
+
+
+@pytest.mark.parametrize("budget", [1, 3, 1000])
+def test_same_order_as_walk_files(tmp_path, budget):
+    """シャードの分割のされ方によらず逐次版と同じ順序・同じ stat を返す"""
+    make_tree(tmp_path)
+    serial_filter = FileFilter(extensions=["jpg", "png", "mp4"])
+    sharded_filter = FileFilter(extensions=["jpg", "png", "mp4"])
+
+    serial = entries(walk_files(tmp_path, recursive=True, file_filter=serial_filter))
+    sharded = entries(
+        walk_files_sharded(
+            tmp_path, workers=2, file_filter=sharded_filter, budget=budget
+        )
+    )
+
+    assert sharded == serial
+    assert all(".git" not in path for _, path, _, _ in sharded)
+    assert sharded_filter.rejected == serial_filter.rejected == 1
+
+
+def test_scan_media_csv_is_identical(tmp_path):
+    """walk_workers を指定しても CSV 出力はバイト単位で同一"""
+    make_tree(tmp_path)
+
+    def listing(**kwargs):
+        out = io.StringIO()
+        write_csv(scan_media(tmp_path, recursive=True, **kwargs), out)
+        return out.getvalue()
+
+    assert listing(walk_workers=3) == listing()
+
+
+def test_stop_early(tmp_path):
+    """途中で列挙をやめてもワーカーが片付けられる"""
+    make_tree(tmp_path)
+
+    walk = walk_files_sharded(tmp_path, workers=2, budget=1)
+    first = next(walk)
+    walk.close()
+
+    assert first.path == next(walk_files(tmp_path, recursive=True)).path
+
+
+def test_missing_root_raises(tmp_path):
+    """存在しないルートは逐次版と同じく OSError"""
+    with pytest.raises(FileNotFoundError):
+        list(walk_files_sharded(tmp_path / "missing", workers=2))
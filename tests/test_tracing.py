@@ -0,0 +1,99 @@
+import io
+import json
+import pstats
+from pathlib import Path
+
+import pytest
+
+from photo_mover import tracing
+from photo_mover.__main__ import main
+from photo_mover.csv_exporter import scan_media, write_csv
+from photo_mover.mover import move_media
+from photo_mover.tracing import Tracer, profiling, span, traced
+
+
+def create_file(path: Path, content: bytes = b"x") -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    return path
+
+
+def test_disabled_spans_are_no_ops():
+    """トレース無効時は共有の no-op を返し、traced は関数をそのまま返す"""
+    assert tracing.active() is None
+    assert span("hash", path="a") is span("stat")
+    assert traced("csv.write", print) is print
+
+
+def test_scan_and_csv_spans(tmp_path):
+    """スキャンと CSV 出力の各フェーズが Chrome trace に記録される"""
+    src = tmp_path / "photos"
+    create_file(src / "a.jpg", b"a" * 1000)
+    create_file(src / "sub" / "b.jpg", b"b")
+    trace = tmp_path / "trace.json"
+
+    with tracing.tracing(trace):
+        write_csv(scan_media(src, recursive=True, include_hash=True), io.StringIO())
+
+    data = json.loads(trace.read_text())
+    events = [e for e in data["traceEvents"] if e["ph"] == "X"]
+    assert {e["name"] for e in events} == {"list", "stat", "hash", "csv.write"}
+    assert all(e["dur"] >= 0 and e["cat"] == "photo_mover" for e in events)
+    assert data["otherData"]["summary"]["hash"]["count"] == 2
+    slowest = data["otherData"]["slowest_files"]
+    assert {s["path"] for s in slowest} == {
+        str(src / "a.jpg"),
+        str(src / "sub" / "b.jpg"),
+    }
+    assert tracing.active() is None
+
+
+def test_move_spans(tmp_path):
+    """移動は操作ごとに move スパンを記録する"""
+    src = tmp_path / "src"
+    create_file(src / "a.jpg")
+    trace = tmp_path / "trace.json"
+
+    with tracing.tracing(trace) as tracer:
+        move_media(src, tmp_path / "dst", dry_run=False)
+
+    assert tracer.summary()["move"]["count"] == 1
+    assert tracer.slowest()[0][2] == str(src / "a.jpg")
+
+
+def test_tracer_limits_events_and_slow_files():
+    """イベント数の上限を超えたスパンも集計され、遅いファイルは上位 N 件だけ残る"""
+    tracer = Tracer(max_events=2, slow_files=2)
+    for i, ms in enumerate([5, 1, 9, 3]):
+        tracer.record("hash", 0, ms * 1_000_000, {"path": f"{i}.jpg"})
+
+    assert len(tracer.events) == 2 and tracer.dropped == 2
+    assert tracer.summary()["hash"]["count"] == 4
+    assert [path for _, _, path in tracer.slowest()] == ["2.jpg", "0.jpg"]
+
+
+def test_nested_tracing_is_rejected(tmp_path):
+    """トレースの入れ子はエラー"""
+    with tracing.tracing(tmp_path / "t.json"):
+        with pytest.raises(RuntimeError):
+            with tracing.tracing(tmp_path / "u.json"):
+                pass
+
+
+def test_profiling_writes_pstats(tmp_path):
+    """cProfile の結果が pstats 形式で保存される"""
+    with profiling(tmp_path / "run.prof"):
+        sum(range(1000))
+
+    assert pstats.Stats(str(tmp_path / "run.prof")).total_calls > 0
+
+
+def test_cli_trace(tmp_path, capsys):
+    """--trace でトレースファイルを書き出す"""
+    src = tmp_path / "photos"
+    create_file(src / "a.jpg")
+
+    main(["--src", str(src), "--csv", "--trace", str(tmp_path / "trace.json")])
+
+    data = json.loads((tmp_path / "trace.json").read_text())
+    assert any(e["name"] == "csv.write" for e in data["traceEvents"])
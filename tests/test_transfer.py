@@ -0,0 +1,210 @@
+import errno
+import hashlib
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+
+from photo_mover.transfer import VerificationError, partial_path, transfer_file
+
+
+def create_file(path: Path, content: bytes = b"x") -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    return path
+
+
+def raise_errno(code):
+    def fn(*args, **kwargs):
+        raise OSError(code, os.strerror(code))
+
+    return fn
+
+
+@pytest.fixture
+def cross_device(monkeypatch):
+    """os.rename が EXDEV を返す (別ファイルシステム) 状況を再現"""
+    monkeypatch.setattr(os, "rename", raise_errno(errno.EXDEV))
+    return monkeypatch
+
+
+def test_transfer_same_filesystem_renames(tmp_path):
+    """同一ファイルシステムでは rename される"""
+    src = create_file(tmp_path / "a.mov", b"video")
+    target = tmp_path / "out" / "a.mov"
+    target.parent.mkdir()
+
+    result = transfer_file(src, target)
+
+    assert result.method == "rename"
+    assert result.size == 5
+    assert target.read_bytes() == b"video"
+    assert not src.exists()
+
+
+def test_transfer_cross_device_copies_and_preserves_mtime(tmp_path, cross_device):
+    """別デバイスではコピー後にメタデータを保持してソースを削除する"""
+    content = os.urandom(300_000)
+    src = create_file(tmp_path / "a.mov", content)
+    os.utime(src, (1_000_000_000, 1_000_000_000))
+    target = tmp_path / "b.mov"
+
+    result = transfer_file(src, target, buffer_size=65536)
+
+    assert result.method in {"copy_file_range", "sendfile", "readinto"}
+    assert target.read_bytes() == content
+    assert target.stat().st_mtime == 1_000_000_000
+    assert not src.exists()
+    assert not partial_path(target).exists()
+
+
+@pytest.mark.parametrize(
+    "disabled,expected",
+    [
+        (["copy_file_range"], "sendfile"),
+        (["copy_file_range", "sendfile"], "readinto"),
+    ],
+)
+def test_transfer_falls_back(tmp_path, cross_device, disabled, expected):
+    """カーネルコピーが使えない場合は次の方式にフォールバックする"""
+    for name in disabled:
+        if hasattr(os, name):
+            cross_device.setattr(os, name, raise_errno(errno.ENOSYS))
+    if expected == "sendfile" and not hasattr(os, "sendfile"):
+        pytest.skip("sendfile unsupported")
+    content = b"0123456789" * 10_000
+    src = create_file(tmp_path / "a.mp4", content)
+    target = tmp_path / "b.mp4"
+
+    result = transfer_file(src, target, buffer_size=4096)
+
+    assert result.method == expected
+    assert target.read_bytes() == content
+
+
+def test_transfer_failure_keeps_source(tmp_path, cross_device):
+    """コピー中のエラーではソースを残し、一時ファイルを削除する"""
+    for name in ("copy_file_range", "sendfile"):
+        if hasattr(os, name):
+            cross_device.setattr(os, name, raise_errno(errno.EIO))
+    src = create_file(tmp_path / "a.mov", b"data")
+    target = tmp_path / "b.mov"
+
+    with pytest.raises(OSError):
+        transfer_file(src, target)
+
+    assert src.read_bytes() == b"data"
+    assert not target.exists()
+    assert not partial_path(target).exists()
+
+
+def test_transfer_empty_file(tmp_path, cross_device):
+    """空ファイルもコピーできる"""
+    src = create_file(tmp_path / "empty.jpg", b"")
+    target = tmp_path / "out.jpg"
+
+    transfer_file(src, target)
+
+    assert target.read_bytes() == b""
+    assert not src.exists()
+
+
+def test_transfer_verify_cross_device(tmp_path, cross_device):
+    """verify 時はコピーしながらハッシュを計算し読み戻しで照合する"""
+    content = os.urandom(100_000)
+    src = create_file(tmp_path / "a.mov", content)
+    target = tmp_path / "b.mov"
+
+    result = transfer_file(src, target, verify=True, buffer_size=4096)
+
+    assert result.sha256 == hashlib.sha256(content).hexdigest()
+    assert target.read_bytes() == content
+    assert not src.exists()
+
+
+def test_transfer_verify_trusted_digest_mismatch(tmp_path, cross_device):
+    """信頼済みダイジェストと一致しなければソースを残して失敗する"""
+    src = create_file(tmp_path / "a.mov", b"data")
+    target = tmp_path / "b.mov"
+
+    with pytest.raises(VerificationError):
+        transfer_file(src, target, verify=True, expected="0" * 64)
+
+    assert src.exists()
+    assert not target.exists()
+    assert not partial_path(target).exists()
+
+
+def test_transfer_verify_rename_trusted_digest_mismatch(tmp_path):
+    """同一デバイスでも信頼済みダイジェストと一致しなければ rename せずに失敗する"""
+    src = create_file(tmp_path / "a.mov", b"data")
+    target = tmp_path / "b.mov"
+
+    with pytest.raises(VerificationError):
+        transfer_file(src, target, verify=True, expected="0" * 64)
+
+    assert src.read_bytes() == b"data"
+    assert not target.exists()
+
+
+def test_transfer_verify_detects_corrupt_write(tmp_path, cross_device):
+    """書き込み内容が壊れていれば読み戻し照合で検出する"""
+    src = create_file(tmp_path / "a.mov", b"data")
+    target = tmp_path / "b.mov"
+    real_copystat = shutil.copystat
+
+    def corrupt_then_copystat(s, d):
+        with open(d, "r+b") as f:
+            f.write(b"X")
+        real_copystat(s, d)
+
+    cross_device.setattr(shutil, "copystat", corrupt_then_copystat)
+
+    with pytest.raises(VerificationError):
+        transfer_file(src, target, verify=True)
+
+    assert src.exists()
+
+
+def test_transfer_verify_rename(tmp_path):
+    """同一ファイルシステムでも verify ならダイジェストを返す"""
+    src = create_file(tmp_path / "a.mov", b"data")
+    target = tmp_path / "b.mov"
+
+    result = transfer_file(src, target, verify=True)
+
+    assert result.method == "rename"
+    assert result.sha256 == hashlib.sha256(b"data").hexdigest()
+
+
+def test_transfer_never_replaces_target(tmp_path):
+    """既存のターゲットは上書きせず FileExistsError"""
+    src = create_file(tmp_path / "a.mov", b"new")
+    target = create_file(tmp_path / "b.mov", b"old")
+
+    with pytest.raises(FileExistsError):
+        transfer_file(src, target)
+
+    assert src.read_bytes() == b"new"
+    assert target.read_bytes() == b"old"
+
+
+def test_transfer_target_created_during_copy(tmp_path, cross_device):
+    """コピー中にターゲットが作られても上書きせず、ソースを残す"""
+    src = create_file(tmp_path / "a.mov", b"new")
+    target = tmp_path / "b.mov"
+    real_copystat = shutil.copystat
+
+    def create_target_then_copystat(s, d):
+        create_file(target, b"other")
+        real_copystat(s, d)
+
+    cross_device.setattr(shutil, "copystat", create_target_then_copystat)
+
+    with pytest.raises(FileExistsError):
+        transfer_file(src, target)
+
+    assert src.read_bytes() == b"new"
+    assert target.read_bytes() == b"other"
+    assert not partial_path(target).exists()
@@ -0,0 +1,58 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from photo_mover.walker import extension_of, walk_files
+
+
+def create_file(path: Path, content: bytes = b"x") -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    return path
+
+
+def test_walk_files_matches_sorted_rglob(tmp_path):
+    """再帰時の順序が sorted(rglob) と一致する"""
+    for rel in ["b.jpg", "a/z.jpg", "a/b/c.png", "a.jpg", "ab/x.mp4", "a-b/y.gif"]:
+        create_file(tmp_path / rel)
+
+    expected = [str(p) for p in sorted(tmp_path.rglob("*")) if p.is_file()]
+    actual = [e.path for e in walk_files(tmp_path, recursive=True)]
+
+    assert actual == expected
+
+
+def test_walk_files_non_recursive(tmp_path):
+    """非再帰ではトップレベルのファイルのみ"""
+    create_file(tmp_path / "a.jpg")
+    create_file(tmp_path / "sub" / "b.jpg")
+
+    assert [e.name for e in walk_files(tmp_path)] == ["a.jpg"]
+
+
+@pytest.mark.skipif(not hasattr(os, "symlink"), reason="symlink unsupported")
+def test_walk_files_does_not_follow_dir_symlinks(tmp_path):
+    """ディレクトリへのシンボリックリンクはたどらない"""
+    create_file(tmp_path / "real" / "a.jpg")
+    (tmp_path / "link").symlink_to(tmp_path / "real", target_is_directory=True)
+
+    names = [e.path for e in walk_files(tmp_path, recursive=True)]
+
+    assert names == [str(tmp_path / "real" / "a.jpg")]
+
+
+def test_walk_files_missing_root(tmp_path):
+    """存在しないルートは OSError"""
+    with pytest.raises(FileNotFoundError):
+        list(walk_files(tmp_path / "missing"))
+
+
+@pytest.mark.parametrize(
+    "name,ext",
+    [("a.JPG", "jpg"), ("a.tar.gz", "gz"), (".hidden", ""), ("noext", "")],
+)
+def test_extension_of(name, ext):
+    """拡張子は Path.suffix と同じ規則で小文字化される"""
+    assert extension_of(name) == ext
+    assert extension_of(name) == Path(name).suffix.lstrip(".").lower()
@@ -0,0 +1,156 @@
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from photo_mover.mover import BatchMover
+from photo_mover.watch import IN_CLOSE_WRITE, Inotify, watch_media
+
+linux_only = pytest.mark.skipif(
+    not sys.platform.startswith("linux"), reason="inotify is Linux only"
+)
+
+
+def create_file(path: Path, content: bytes = b"x") -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    return path
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.01)
+
+
+class Watching:
+    """watch_media を別スレッドで動かし、バッチを記録する"""
+
+    def __init__(self, src, dst, **kwargs):
+        self.batches = []
+        self.done = threading.Event()
+        self.thread = threading.Thread(
+            target=watch_media,
+            args=(src, dst),
+            kwargs=dict(
+                debounce=0.05,
+                on_batch=self.batches.append,
+                stop=self.done.is_set,
+                dry_run=False,
+                **kwargs,
+            ),
+        )
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.done.set()
+        self.thread.join(5)
+
+    @property
+    def moved(self):
+        return [p for batch in self.batches for p in batch]
+
+
+@linux_only
+def test_inotify_reports_close_write(tmp_path):
+    """書き込み後のクローズが IN_CLOSE_WRITE として届く"""
+    with Inotify() as inotify:
+        wd = inotify.add_watch(tmp_path)
+        create_file(tmp_path / "a.jpg")
+
+        events = inotify.read(timeout=1.0)
+
+    assert (wd, "a.jpg") in [(w, n) for w, m, n in events if m & IN_CLOSE_WRITE]
+
+
+def test_batch_mover_filters_paths(tmp_path):
+    """BatchMover は対象外・存在しない・サブディレクトリのパスを無視する"""
+    src = tmp_path / "src"
+    dst = tmp_path / "dst"
+    a = create_file(src / "a.jpg")
+    txt = create_file(src / "b.txt")
+    nested = create_file(src / "sub" / "c.jpg")
+    mover = BatchMover(src, dst, dry_run=False)
+
+    moved = mover.move([a, txt, nested, src / "gone.jpg", tmp_path / "x.jpg"])
+
+    assert moved == [dst / "a.jpg"]
+    assert nested.exists() and txt.exists()
+
+
+def test_batch_mover_skips_unstatable_paths(tmp_path):
+    """stat できないパス（親がファイルになった等）は記録して飛ばし、他は移動する"""
+    src = tmp_path / "src"
+    dst = tmp_path / "dst"
+    create_file(src / "sub", b"not a directory")
+    a = create_file(src / "a.jpg")
+    mover = BatchMover(src, dst, dry_run=False, recursive=True)
+
+    moved = mover.move([src / "sub" / "a.jpg", a])
+
+    assert moved == [dst / "a.jpg"]
+
+
+def test_batch_mover_keeps_reservations_between_batches(tmp_path):
+    """バッチ間でも割り当て済みの名前は再利用しない"""
+    src = tmp_path / "src"
+    dst = tmp_path / "dst"
+    mover = BatchMover(src, dst, dry_run=False)
+
+    create_file(src / "a.jpg", b"first")
+    assert mover.move([src / "a.jpg"]) == [dst / "a.jpg"]
+    create_file(src / "a.jpg", b"second")
+    assert mover.move([src / "a.jpg"]) == [dst / "a_1.jpg"]
+
+
+def test_batch_mover_dry_run_plans_each_source_once(tmp_path):
+    """ドライランでは同じファイルを 2 回計画しない"""
+    src = tmp_path / "src"
+    mover = BatchMover(src, tmp_path / "dst", dry_run=True)
+    create_file(src / "a.jpg")
+
+    assert len(mover.move()) == 1
+    assert mover.move([src / "a.jpg"]) == []
+
+
+@linux_only
+def test_watch_moves_existing_then_new_files(tmp_path):
+    """起動時に既存ファイルを移動し、その後は新しいファイルを移動する"""
+    src = tmp_path / "src"
+    dst = tmp_path / "dst"
+    create_file(src / "old.jpg")
+    old = time.time() - 60
+    os.utime(src / "old.jpg", (old, old))
+
+    with Watching(src, dst) as watching:
+        wait_for(lambda: watching.moved == [dst / "old.jpg"])
+        create_file(src / "new.jpg")
+        create_file(src / "notes.txt")
+        wait_for(lambda: len(watching.moved) == 2)
+
+    assert watching.moved == [dst / "old.jpg", dst / "new.jpg"]
+    assert (src / "notes.txt").exists()
+
+
+@linux_only
+def test_watch_recursive_picks_up_new_directories(tmp_path):
+    """再帰モードでは新しく作られたディレクトリも監視する"""
+    src = tmp_path / "src"
+    dst = tmp_path / "dst"
+    src.mkdir()
+
+    with Watching(src, dst, recursive=True) as watching:
+        time.sleep(0.1)
+        create_file(src / "day1" / "a.jpg")
+        create_file(src / "day1" / "deeper" / "b.jpg")
+        wait_for(lambda: len(watching.moved) == 2)
+
+    assert sorted(watching.moved) == [dst / "a.jpg", dst / "b.jpg"]